@@ -134,6 +134,36 @@ STATICFILES_DIRS = [
 ]
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Archivos subidos (importaciones encoladas)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Importaciones sobre este tamaño (bytes) se procesan con `manage.py procesar_trabajos`
+IMPORTACION_UMBRAL_ASINCRONO = int(os.environ.get('IMPORTACION_UMBRAL_ASINCRONO', 2 * 1024 * 1024))
+
+# Caché de respuestas de los endpoints de lectura (cache_respuestas.py). Por defecto en
+# memoria del proceso; para compartirla entre workers, p. ej.
+# CACHE_RESPUESTAS_BACKEND=django.core.cache.backends.redis.RedisCache y
+# CACHE_RESPUESTAS_LOCATION=redis://localhost:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'respuestas': {
+        'BACKEND': os.environ.get('CACHE_RESPUESTAS_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_RESPUESTAS_LOCATION', 'smashpoint-respuestas'),
+    },
+}
+# Segundos que vive una respuesta; una escritura la invalida antes al cambiar la versión
+CACHE_RESPUESTAS_TTL = int(os.environ.get('CACHE_RESPUESTAS_TTL', 3600))
+# Respuestas en streaming más grandes que esto no se guardan
+CACHE_RESPUESTAS_MAX_BYTES = int(os.environ.get('CACHE_RESPUESTAS_MAX_BYTES', 1024 * 1024))
+
+# /api/sync/: margen sobre el token (debe superar la transacción de escritura más larga,
+# ver sincronizacion.py) y días que se guardan los tombstones de filas borradas
+SINCRONIZACION_MARGEN_SEGUNDOS = int(os.environ.get('SINCRONIZACION_MARGEN_SEGUNDOS', 60))
+SINCRONIZACION_RETENCION_DIAS = int(os.environ.get('SINCRONIZACION_RETENCION_DIAS', 30))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -141,7 +171,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # DRF Settings
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Keyset: ?cursor= y ?limit= (tope 500); cada ViewSet define orden_keyset
+    'DEFAULT_PAGINATION_CLASS': 'smashpointApp.paginacion.PaginacionKeyset',
     'PAGE_SIZE': 10,
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny'
@@ -165,3 +196,5 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:19006",  # Expo/React Native
     "https://smashpoint-7ofo.onrender.com",
 ]
+# Cabeceras de paginación por cursor visibles para clientes web
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor', 'Link']
@@ -21,7 +21,7 @@ from smashpointApp import mobile_views
 from rest_framework.routers import DefaultRouter
 from smashpointApp.api import (
     JugadorViewSet, TorneoViewSet, ResultadoViewSet,
-    RankingViewSet, PartidoViewSet, InscripcionViewSet
+    RankingViewSet, PartidoViewSet, InscripcionViewSet, snapshot_completo, estadisticas_cache
 )
 
 router = DefaultRouter()
@@ -45,6 +45,8 @@ urlpatterns = [
     path('jugadores/editar/<int:id>/', views.editar_jugador, name='editar_jugador'),
     path('jugadores/eliminar/<int:id>/', views.eliminar_jugador, name='eliminar_jugador'),
     path('jugadores/importar/excel/', views.importar_jugadores_excel, name='importar_jugadores_excel'),
+    path('trabajos/<int:trabajo_id>/', views.detalle_trabajo, name='detalle_trabajo'),
+    path('trabajos/<int:trabajo_id>/estado/', views.estado_trabajo, name='estado_trabajo'),
 
     # Torneos
     path('torneos/', views.lista_torneos, name='lista_torneos'),
@@ -58,12 +60,14 @@ urlpatterns = [
     # Inscripciones
     path('torneos/<int:torneo_id>/inscripciones/', views.lista_inscripciones, name='lista_inscripciones'),
     path('torneos/<int:torneo_id>/inscribir/', views.inscribir_jugador, name='inscribir_jugador'),
+    path('torneos/<int:torneo_id>/credenciales/', views.credenciales_torneo, name='credenciales_torneo'),
 
     # Partidos / Fixture
     path('torneos/<int:torneo_id>/fixture/generar/', views.generar_fixture, name='generar_fixture'),
     path('torneos/<int:torneo_id>/partidos/', views.lista_partidos, name='lista_partidos'),
     path('partidos/editar/<int:partido_id>/', views.editar_partido, name='editar_partido'),
     path('torneos/<int:torneo_id>/ronda/siguiente/', views.generar_ronda_siguiente, name='generar_ronda_siguiente'),
+    path('torneos/<int:torneo_id>/partidos/programar/', views.programar_partidos, name='programar_partidos'),
     # Grupos y Bracket
     path('torneos/<int:torneo_id>/grupos/generar/', views.generar_grupos, name='generar_grupos'),
     path('torneos/<int:torneo_id>/grupos/', views.lista_grupos, name='lista_grupos'),
@@ -85,6 +89,7 @@ urlpatterns = [
     path('import/jugadores/', views.import_jugadores_csv, name='import_jugadores_csv'),
     path('export/ranking/pdf/', views.export_ranking_pdf, name='export_ranking_pdf'),
     path('export/ranking/excel/', views.export_ranking_excel, name='export_ranking_excel'),
+    path('export/torneos/<int:torneo_id>/excel/', views.export_torneo_excel, name='export_torneo_excel'),
 
     # API JSON (Legacy)
     path('api/jugadores/', views.api_jugadores, name='api_jugadores'),
@@ -96,12 +101,17 @@ urlpatterns = [
     path('api/tournaments/<int:tournament_id>/', mobile_views.mobile_tournament_detail, name='mobile_tournament_detail'),
     path('api/tournaments/<int:tournament_id>/matches/', mobile_views.mobile_tournament_matches, name='mobile_tournament_matches'),
     path('api/tournaments/<int:tournament_id>/players/', mobile_views.mobile_tournament_players, name='mobile_tournament_players'),
+    path('api/tournaments/<int:tournament_id>/bundle/', mobile_views.mobile_tournament_bundle, name='mobile_tournament_bundle'),
     path('api/players/', mobile_views.mobile_players, name='mobile_players'),
     path('api/results/', mobile_views.mobile_results, name='mobile_results'),
     path('api/matches/finish/', mobile_views.mobile_finish_match, name='mobile_finish_match'),
+    path('api/matches/finish/batch/', mobile_views.mobile_finish_batch, name='mobile_finish_batch'),
+    path('api/sync/', mobile_views.mobile_sync, name='mobile_sync'),
 
     # Offline
     path('offline/', views.offline, name='offline'),
     # API V2 (DRF)
+    path('api/v2/snapshot/', snapshot_completo, name='api_snapshot'),
+    path('api/v2/cache/', estadisticas_cache, name='api_cache'),
     path('api/v2/', include(router.urls)),
 ]
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Jugador, Torneo, Resultado, Inscripcion, Partido, Ranking, Grupo
+from .models import Jugador, Torneo, Resultado, Inscripcion, Partido, Ranking, Grupo, RankingEvent, TrabajoImportacion
 
 @admin.register(Jugador)
 class JugadorAdmin(admin.ModelAdmin):
@@ -25,7 +25,7 @@ class InscripcionAdmin(admin.ModelAdmin):
 
 @admin.register(Partido)
 class PartidoAdmin(admin.ModelAdmin):
-	list_display = ('id','torneo','etapa','grupo','ronda','jugador_a','jugador_b','ganador','best_of','sets_a','sets_b')
+	list_display = ('id','torneo','etapa','grupo','ronda','turno','mesa','jugador_a','jugador_b','ganador','best_of','sets_a','sets_b')
 	list_filter = ('torneo','ronda','etapa','grupo')
 	search_fields = ('jugador_a__nombre','jugador_b__nombre')
 
@@ -43,3 +43,15 @@ class GrupoAdmin(admin.ModelAdmin):
 class RankingAdmin(admin.ModelAdmin):
 	list_display = ('jugador','puntos','actualizado_en')
 	search_fields = ('jugador__nombre','jugador__apellido')
+
+@admin.register(RankingEvent)
+class RankingEventAdmin(admin.ModelAdmin):
+	list_display = ('jugador','partido','etapa','puntos','creado_en')
+	list_filter = ('etapa',)
+	search_fields = ('jugador__nombre','jugador__apellido')
+
+@admin.register(TrabajoImportacion)
+class TrabajoImportacionAdmin(admin.ModelAdmin):
+	list_display = ('id','tipo','estado','filas_procesadas','creados','actualizados','rechazados','creado_en','terminado_en')
+	list_filter = ('tipo','estado')
+	readonly_fields = ('filas_procesadas','creados','actualizados','rechazados','reporte','error','iniciado_en','terminado_en')
@@ -1,5 +1,13 @@
-from rest_framework import viewsets, mixins
-from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
+from rest_framework import viewsets, mixins, status
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action, api_view, permission_classes, renderer_classes
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from . import cache_respuestas, inscripciones, snapshot
 from .permissions import WritePermissionByModelPerm
 from .models import Jugador, Torneo, Resultado, Ranking, Partido, Inscripcion
 from .serializers import (
@@ -7,34 +15,122 @@ from .serializers import (
     RankingSerializer, PartidoSerializer, InscripcionSerializer
 )
 
-class ReadOnlyModelViewSet(mixins.ListModelMixin,
+VERDADEROS = ('1', 'true', 'si', 'sí')
+
+
+class FiltrosMixin:
+    """Filtros por query string declarados en `filtros = {parametro: (lookup, ...)}`.
+
+    Varios lookups para un mismo parámetro se combinan con OR (ej. ?jugador= en partidos).
+    Los lookups __isnull reciben el valor como booleano. Un valor que no calza con el
+    tipo del campo responde 400 en vez de 500.
+    """
+    filtros = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for parametro, lookups in self.filtros.items():
+            valor = self.request.query_params.get(parametro)
+            if valor in (None, ''):
+                continue
+            condicion = Q()
+            for lookup in lookups:
+                condicion |= Q(**{lookup: valor.lower() in VERDADEROS if lookup.endswith('__isnull') else valor})
+            try:
+                queryset = queryset.filter(condicion)
+            except (ValueError, DjangoValidationError):
+                raise ValidationError({parametro: f'Valor inválido: {valor}'})
+        return queryset
+
+
+class ReadOnlyModelViewSet(FiltrosMixin,
+                           mixins.ListModelMixin,
                            mixins.RetrieveModelMixin,
                            viewsets.GenericViewSet):
     permission_classes = [AllowAny]
 
-class JugadorViewSet(viewsets.ModelViewSet):
+class JugadorViewSet(FiltrosMixin, viewsets.ModelViewSet):
     queryset = Jugador.objects.all().order_by('id')
     serializer_class = JugadorSerializer
     permission_classes = [WritePermissionByModelPerm]
+    orden_keyset = ('id',)
+    filtros = {'categoria': ('categoria',)}
 
-class TorneoViewSet(viewsets.ModelViewSet):
+class TorneoViewSet(FiltrosMixin, viewsets.ModelViewSet):
     queryset = Torneo.objects.all().order_by('-fecha')
     serializer_class = TorneoSerializer
     permission_classes = [WritePermissionByModelPerm]
+    orden_keyset = ('-fecha', '-id')
+    filtros = {'estado': ('estado',), 'categoria': ('categoria',)}
 
-class ResultadoViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def inscribir(self, request, pk=None):
+        """Inscripción masiva: {"jugadores": [ids], "permitirEspera": bool}."""
+        if not request.user.has_perm('smashpointApp.add_inscripcion'):
+            return Response({'detail': 'Sin permiso para inscribir jugadores.'}, status=status.HTTP_403_FORBIDDEN)
+        torneo = self.get_object()
+        ids = request.data.get('jugadores') or []
+        if not isinstance(ids, list):
+            return Response({'detail': 'jugadores debe ser una lista de ids.'}, status=status.HTTP_400_BAD_REQUEST)
+        reporte = inscripciones.inscribir_jugadores(torneo, ids, permitir_espera=bool(request.data.get('permitir_espera')))
+        cuerpo = {clave: [j.id for j in valor] for clave, valor in reporte.items()
+                  if clave not in ('inexistentes', 'cupos_disponibles')}
+        cuerpo['inexistentes'] = reporte['inexistentes']
+        cuerpo['cupos_disponibles'] = reporte['cupos_disponibles']
+        codigo = status.HTTP_409_CONFLICT if reporte['sin_cupo'] else status.HTTP_200_OK
+        return Response(cuerpo, status=codigo)
+
+class ResultadoViewSet(FiltrosMixin, viewsets.ModelViewSet):
     queryset = Resultado.objects.select_related('torneo','jugador1','jugador2').all().order_by('-id')
     serializer_class = ResultadoSerializer
     permission_classes = [WritePermissionByModelPerm]
+    orden_keyset = ('-id',)
+    filtros = {'torneo': ('torneo_id',), 'jugador': ('jugador1_id', 'jugador2_id')}
 
 class RankingViewSet(ReadOnlyModelViewSet):
     queryset = Ranking.objects.select_related('jugador').order_by('-puntos')
     serializer_class = RankingSerializer
+    orden_keyset = ('-puntos', 'id')
+    filtros = {'categoria': ('jugador__categoria',)}
 
 class PartidoViewSet(ReadOnlyModelViewSet):
-    queryset = Partido.objects.select_related('torneo','jugador_a','jugador_b','ganador').order_by('torneo','ronda')
+    # Los serializers solo exponen ids de jugadores/torneo: no hace falta select_related
+    queryset = Partido.objects.order_by('torneo','ronda')
     serializer_class = PartidoSerializer
+    orden_keyset = ('torneo_id', 'ronda', 'id')
+    filtros = {
+        'torneo': ('torneo_id',),
+        'etapa': ('etapa',),
+        'grupo': ('grupo',),
+        'ronda': ('ronda',),
+        'jugador': ('jugador_a_id', 'jugador_b_id'),
+        # ?pendiente=1: partidos sin ganador (en juego o por jugar)
+        'pendiente': ('ganador__isnull',),
+    }
 
 class InscripcionViewSet(ReadOnlyModelViewSet):
-    queryset = Inscripcion.objects.select_related('torneo','jugador').order_by('-fecha_inscripcion')
+    queryset = Inscripcion.objects.order_by('-fecha_inscripcion')
     serializer_class = InscripcionSerializer
+    orden_keyset = ('-fecha_inscripcion', '-id')
+    filtros = {'torneo': ('torneo_id',), 'jugador': ('jugador_id',), 'estado': ('estado',)}
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def snapshot_completo(request):
+    """Toda la base como NDJSON gzip en streaming; ?updated_since=<ISO 8601> para extracciones incrementales."""
+    try:
+        desde = snapshot.parsear_desde(request.query_params.get('updated_since'))
+    except ValueError as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    response = StreamingHttpResponse(snapshot.generar(desde), content_type='application/gzip')
+    response['Content-Disposition'] = 'attachment; filename="snapshot.ndjson.gz"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@renderer_classes([JSONRenderer])  # sin camelize: las claves son nombres de vistas
+def estadisticas_cache(request):
+    """Aciertos, fallos y ratio de la caché de respuestas, por vista y en total."""
+    return Response(cache_respuestas.estadisticas())
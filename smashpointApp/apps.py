@@ -9,6 +9,7 @@ class SmashpointappConfig(AppConfig):
     name = 'smashpointApp'
 
     def ready(self):
+        from . import signals  # noqa: F401  (registra receptores)
         self._ensure_default_superuser()
 
     def _ensure_default_superuser(self):
@@ -0,0 +1,100 @@
+"""
+Caché en disco de archivos generados (PDF/Excel) indexada por versión de datos.
+El nombre del archivo incluye la versión de ContadorVersion, por lo que nunca hay que
+invalidar: una versión nueva simplemente produce otro archivo. Ante un fallo de caché
+un lockfile (O_CREAT | O_EXCL, portable) asegura que solo un request lo genere; los
+demás esperan a que aparezca.
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse
+
+ESPERA_MAXIMA = 120          # segundos esperando a otro generador
+LOCK_VENCIDO = 300           # un lock más viejo que esto se considera abandonado
+
+
+def directorio():
+    ruta = Path(getattr(settings, 'ARTEFACTOS_ROOT', Path(settings.MEDIA_ROOT) / 'artefactos'))
+    ruta.mkdir(parents=True, exist_ok=True)
+    return ruta
+
+
+def ruta_artefacto(nombre, version, extension):
+    return directorio() / f'{nombre}-v{version}.{extension}'
+
+
+def tomar_lock(lock):
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(lock) > LOCK_VENCIDO:
+                os.remove(lock)
+        except OSError:
+            pass
+        return False
+
+
+def limpiar_versiones(nombre, extension, version):
+    """Borra las versiones anteriores a `version`; una más nueva ya generada por otro request se conserva."""
+    prefijo = f'{nombre}-v'
+    for archivo in directorio().glob(f'{prefijo}*.{extension}'):
+        try:
+            anterior = int(archivo.stem[len(prefijo):]) < version
+        except ValueError:
+            continue
+        if anterior:
+            try:
+                archivo.unlink()
+            except OSError:
+                pass
+
+
+def obtener(nombre, version, extension, generar):
+    """Ruta del artefacto (nombre, version); lo genera con generar(archivo_binario) si no existe."""
+    destino = ruta_artefacto(nombre, version, extension)
+    lock = destino.with_suffix(destino.suffix + '.lock')
+    limite = time.monotonic() + ESPERA_MAXIMA
+    while not destino.exists():
+        if tomar_lock(lock):
+            try:
+                if not destino.exists():
+                    fd, temporal = tempfile.mkstemp(dir=destino.parent, suffix='.tmp')
+                    try:
+                        with os.fdopen(fd, 'wb') as archivo:
+                            generar(archivo)
+                        # Renombrado atómico: nadie ve un archivo a medio escribir
+                        os.replace(temporal, destino)
+                    except BaseException:
+                        os.unlink(temporal)
+                        raise
+                    limpiar_versiones(nombre, extension, version)
+            finally:
+                os.remove(lock)
+            break
+        if time.monotonic() > limite:
+            raise TimeoutError(f'Tiempo de espera agotado generando {destino.name}')
+        time.sleep(0.1)
+    return destino
+
+
+def etag(nombre, version):
+    return f'"{nombre}-v{version}"'
+
+
+def respuesta(nombre, version, extension, generar, filename, content_type):
+    """FileResponse del artefacto con ETag y Content-Length (este último lo pone FileResponse)."""
+    try:
+        archivo = open(obtener(nombre, version, extension, generar), 'rb')
+    except FileNotFoundError:
+        # Una generación más nueva borró esta versión entre obtener() y open(): se vuelve a generar
+        archivo = open(obtener(nombre, version, extension, generar), 'rb')
+    response = FileResponse(archivo, as_attachment=True, filename=filename, content_type=content_type)
+    response['ETag'] = etag(nombre, version)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,137 @@
+"""
+Caché de respuestas de los endpoints de lectura, sobre el framework de caché de Django
+(alias 'respuestas' en CACHES: memoria local por defecto, o el backend compartido que
+se configure con CACHE_RESPUESTAS_BACKEND / CACHE_RESPUESTAS_LOCATION).
+
+La clave incluye la versión de los contadores de ContadorVersion de los que depende la
+vista (ver versiones.py). Las señales post_save/post_delete de Partido, Ranking,
+Inscripcion, Torneo, etc. suben esos contadores, y las rutas masivas los suben a mano,
+así que cualquier escritura cambia la clave: no hace falta borrar nada y las entradas
+viejas expiran solas. Las vistas de un torneo dependen de 'torneo:<id>', por lo que un
+resultado guardado invalida solo las respuestas de ese torneo.
+
+De la query string solo entran en la clave los parámetros que la vista declara leer
+(más ?format= de DRF); una request con otros parámetros no se cachea, para que variar
+la URL no llene la caché de copias de la misma respuesta.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+ALIAS = 'respuestas'
+# Parámetros que toda vista acepta: ?format= elige el renderer en DRF
+PARAMETROS_COMUNES = ('format',)
+# Nombres de las vistas cacheadas, para el reporte de aciertos
+VISTAS = []
+
+
+def cache():
+    return caches[ALIAS]
+
+
+def clave(request, nombre, etag, ultima_modificacion):
+    """Clave de la respuesta: ruta, query ordenada, Accept (negociación de DRF) y versión de los datos."""
+    query = sorted((k, v) for k in request.GET for v in request.GET.getlist(k))
+    partes = '|'.join([request.path, repr(query), request.META.get('HTTP_ACCEPT', ''), etag,
+                       ultima_modificacion.isoformat()])
+    return f'resp:{nombre}:' + hashlib.md5(partes.encode()).hexdigest()
+
+
+def contar(nombre, acierto):
+    """Suma un acierto o fallo; los contadores viven en el mismo backend que las respuestas."""
+    contador = f"resp-stats:{nombre}:{'aciertos' if acierto else 'fallos'}"
+    try:
+        cache().incr(contador)
+    except ValueError:
+        cache().add(contador, 0, timeout=None)
+        cache().incr(contador)
+
+
+def estadisticas():
+    """{vista: {aciertos, fallos, ratio}} más el total."""
+    valores = cache().get_many([f'resp-stats:{n}:{t}' for n in VISTAS for t in ('aciertos', 'fallos')])
+    por_vista, total_aciertos, total_fallos = {}, 0, 0
+    for nombre in VISTAS:
+        aciertos = valores.get(f'resp-stats:{nombre}:aciertos', 0)
+        fallos = valores.get(f'resp-stats:{nombre}:fallos', 0)
+        por_vista[nombre] = {'aciertos': aciertos, 'fallos': fallos, 'ratio': _ratio(aciertos, fallos)}
+        total_aciertos += aciertos
+        total_fallos += fallos
+    return {
+        'backend': settings.CACHES[ALIAS]['BACKEND'],
+        'vistas': por_vista,
+        'total': {'aciertos': total_aciertos, 'fallos': total_fallos,
+                  'ratio': _ratio(total_aciertos, total_fallos)},
+    }
+
+
+def _ratio(aciertos, fallos):
+    return round(aciertos / (aciertos + fallos), 4) if aciertos + fallos else None
+
+
+def cacheada(vista, version, parametros=()):
+    """Envuelve una vista GET; version(request, *args, **kwargs) -> (etag, last_modified).
+
+    `parametros` son los de la query string que la vista lee; con cualquier otro la
+    request pasa directo a la vista.
+
+    Solo se guardan respuestas 200 sin cookies; las de streaming se copian mientras se
+    envían y se guardan al terminar si no superan CACHE_RESPUESTAS_MAX_BYTES. Se salta la caché si los
+    contadores aún no existen (no hay versión que garantice frescura) o si la request
+    trae mensajes flash pendientes, que la plantilla mostraría una sola vez.
+    """
+    # Las vistas de DRF llegan envueltas en APIView.as_view(); el nombre real está en .cls
+    nombre = getattr(vista, 'cls', vista).__name__
+    VISTAS.append(nombre)
+    aceptados = set(parametros) | set(PARAMETROS_COMUNES)
+
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        etag, ultima_modificacion = version(request, *args, **kwargs)
+        mensajes = getattr(request, '_messages', None)
+        if (request.method != 'GET' or ultima_modificacion is None or not aceptados.issuperset(request.GET)
+                or (mensajes is not None and len(mensajes))):
+            return vista(request, *args, **kwargs)
+
+        llave = clave(request, nombre, etag, ultima_modificacion)
+        guardada = cache().get(llave)
+        contar(nombre, guardada is not None)
+        if guardada is not None:
+            contenido, encabezados = guardada
+            response = HttpResponse(contenido)
+            for encabezado, valor in encabezados:
+                response[encabezado] = valor
+            return response
+
+        response = vista(request, *args, **kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+        if response.status_code == 200 and not response.cookies:
+            if response.streaming:
+                response.streaming_content = guardar_al_terminar(
+                    response.streaming_content, llave, list(response.items()))
+            else:
+                cache().set(llave, (response.content, list(response.items())), settings.CACHE_RESPUESTAS_TTL)
+        return response
+    return envoltura
+
+
+def guardar_al_terminar(bloques, llave, encabezados):
+    """Reenvía los bloques y guarda la respuesta completa al final, salvo que sea demasiado grande.
+
+    Pasado el límite se deja de copiar: la memoria sigue acotada por el bloque.
+    """
+    copia, tamano = [], 0
+    for bloque in bloques:
+        if copia is not None:
+            tamano += len(bloque)
+            if tamano <= settings.CACHE_RESPUESTAS_MAX_BYTES:
+                copia.append(bloque)
+            else:
+                copia = None
+        yield bloque
+    if copia is not None:
+        cache().set(llave, (b''.join(copia), encabezados), settings.CACHE_RESPUESTAS_TTL)
@@ -0,0 +1,111 @@
+"""
+Programación de partidos: rondas todos-contra-todos por el método del círculo y
+asignación de partidos a mesas y turnos minimizando la duración total (makespan).
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import versiones
+from .models import ContadorVersion, Partido
+
+
+def rondas_circulares(jugadores):
+    """Método del círculo (Berger): lista de rondas, cada una con pares (a, b).
+
+    Con cantidad impar se agrega un BYE que no genera partido, así cada jugador
+    juega a lo sumo una vez por ronda y n-1 (o n) rondas cubren todos los cruces.
+    """
+    jugadores = list(jugadores)
+    if len(jugadores) < 2:
+        return []
+    if len(jugadores) % 2:
+        jugadores.append(None)
+    n = len(jugadores)
+    fijo, rotan = jugadores[0], jugadores[1:]
+    rondas = []
+    for r in range(n - 1):
+        fila = [fijo] + rotan
+        pares = []
+        for i in range(n // 2):
+            a, b = fila[i], fila[n - 1 - i]
+            if a is not None and b is not None:
+                # Alternar local/visita del jugador fijo para equilibrar
+                pares.append((b, a) if i == 0 and r % 2 else (a, b))
+        rondas.append(pares)
+        rotan = rotan[-1:] + rotan[:-1]
+    return rondas
+
+
+def programar(partidos, mesas, descanso=1):
+    """Asigna turno y mesa a cada partido (modifica los objetos) y devuelve el makespan en turnos.
+
+    Lista greedy en orden de (ronda, grupo, id): cada partido va al primer turno en que
+    ambos jugadores cumplieron su descanso y queda una mesa libre. Los turnos llenos se
+    saltan con un union-find, de modo que el costo total es casi lineal en partidos.
+    """
+    if mesas < 1:
+        raise ValueError('Se necesita al menos una mesa.')
+    partidos = sorted(partidos, key=lambda p: (p.ronda, p.grupo or '', p.id or 0))
+    ocupacion = []      # mesas usadas por turno
+    siguiente = []      # union-find: siguiente turno con mesa libre
+    libre_desde = {}    # jugador_id -> primer turno en que puede volver a jugar
+
+    def buscar(t):
+        while len(siguiente) <= t:
+            siguiente.append(len(siguiente))
+            ocupacion.append(0)
+        raiz = t
+        while siguiente[raiz] != raiz:
+            raiz = siguiente[raiz]
+            if raiz == len(siguiente):
+                siguiente.append(raiz)
+                ocupacion.append(0)
+        # Compresión de caminos
+        while siguiente[t] != raiz:
+            siguiente[t], t = raiz, siguiente[t]
+        return raiz
+
+    makespan = 0
+    for p in partidos:
+        inicio = max(libre_desde.get(p.jugador_a_id, 0), libre_desde.get(p.jugador_b_id, 0))
+        t = buscar(inicio)
+        ocupacion[t] += 1
+        p.turno = t + 1
+        p.mesa = ocupacion[t]
+        if ocupacion[t] == mesas:
+            siguiente[t] = t + 1
+        libre_desde[p.jugador_a_id] = libre_desde[p.jugador_b_id] = t + 1 + descanso
+        makespan = max(makespan, t + 1)
+    return makespan
+
+
+def cota_inferior(partidos, mesas, descanso=1):
+    """Makespan mínimo teórico: por capacidad de mesas o por el jugador con más partidos."""
+    carga = {}
+    for p in partidos:
+        carga[p.jugador_a_id] = carga.get(p.jugador_a_id, 0) + 1
+        carga[p.jugador_b_id] = carga.get(p.jugador_b_id, 0) + 1
+    por_mesas = -(-len(partidos) // mesas) if partidos else 0
+    por_jugador = max(((k - 1) * (descanso + 1) + 1 for k in carga.values()), default=0)
+    return max(por_mesas, por_jugador)
+
+
+def programar_torneo(torneo, mesas, descanso=1):
+    """Programa los partidos pendientes del torneo y guarda turno/mesa con un bulk_update."""
+    with transaction.atomic():
+        pendientes = list(Partido.objects.filter(torneo=torneo, ganador__isnull=True)
+                          .only('id', 'ronda', 'grupo', 'jugador_a_id', 'jugador_b_id', 'turno', 'mesa'))
+        makespan = programar(pendientes, mesas, descanso)
+        # bulk_update no pasa por pre_save: la marca auto_now se asigna a mano
+        ahora = timezone.now()
+        for partido in pendientes:
+            partido.actualizado_en = ahora
+        Partido.objects.bulk_update(pendientes, ['turno', 'mesa', 'actualizado_en'], batch_size=1000)
+        ContadorVersion.incrementar(versiones.torneo(torneo.pk))
+    return makespan, len(pendientes)
+
+
+def orden_programado(qs):
+    """Ordena por turno/mesa cuando existen, dejando al final los no programados."""
+    return qs.order_by(F('turno').asc(nulls_last=True), F('mesa').asc(nulls_last=True), 'ronda', 'id')
@@ -0,0 +1,181 @@
+"""
+Exportaciones Excel en modo write-only de openpyxl.
+Las filas se escriben a medida que se leen (sin mantener celdas en memoria) y el libro
+se guarda en un archivo temporal que luego se sirve con FileResponse por bloques.
+"""
+import io
+import tempfile
+
+import openpyxl
+from django.db.models import F
+from django.http import FileResponse
+from django.utils import timezone
+from openpyxl.utils import get_column_letter
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from . import qr
+from .models import Grupo, GrupoStanding, Inscripcion, Partido, Ranking
+
+CONTENT_TYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def nueva_hoja(libro, titulo, encabezado, ancho=20):
+    """Hoja write-only con anchos fijos (deben definirse antes de la primera fila)."""
+    hoja = libro.create_sheet(title=titulo[:31])
+    for col in range(1, len(encabezado) + 1):
+        hoja.column_dimensions[get_column_letter(col)].width = ancho
+    hoja.append(encabezado)
+    return hoja
+
+
+def guardar_temporal(libro):
+    """Guarda el libro en un archivo temporal (se borra al cerrarse) posicionado al inicio."""
+    archivo = tempfile.TemporaryFile()
+    libro.save(archivo)
+    archivo.seek(0)
+    return archivo
+
+
+def respuesta_xlsx(libro, nombre):
+    return FileResponse(guardar_temporal(libro), as_attachment=True, filename=nombre,
+                        content_type=CONTENT_TYPE_XLSX)
+
+
+def libro_ranking():
+    """Ranking ordenado por puntos: una consulta iterada en bloques."""
+    libro = openpyxl.Workbook(write_only=True)
+    hoja = nueva_hoja(libro, 'Ranking', ['Nombre', 'Apellido', 'Puntos'])
+    filas = (Ranking.objects.order_by('-puntos', 'jugador_id')
+             .values_list('jugador__nombre', 'jugador__apellido', 'puntos').iterator(chunk_size=2000))
+    for fila in filas:
+        hoja.append(fila)
+    return libro
+
+
+def escribir_ranking_xlsx(archivo):
+    libro_ranking().save(archivo)
+
+
+def escribir_ranking_pdf(archivo):
+    """PDF del ranking (reportlab) escrito en `archivo`."""
+    c = canvas.Canvas(archivo, pagesize=letter)
+    width, height = letter
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(50, height - 50, "Ranking SmashPoint")
+    c.setFont("Helvetica", 12)
+    y = height - 90
+    filas = (Ranking.objects.order_by('-puntos', 'jugador_id')
+             .values_list('jugador__nombre', 'jugador__apellido', 'puntos').iterator(chunk_size=2000))
+    for nombre, apellido, puntos in filas:
+        c.drawString(50, y, f"{nombre} {apellido} - {puntos} pts")
+        y -= 18
+        if y < 60:
+            c.showPage()
+            c.setFont("Helvetica", 12)
+            y = height - 50
+    c.save()
+
+
+def nombre_completo(nombre, apellido):
+    return f'{nombre} {apellido}'.strip()
+
+
+def libro_torneo(torneo):
+    """Libro completo del torneo: inscripciones, tabla y partidos de cada grupo y cada ronda del bracket.
+
+    Usa cuatro consultas sin importar el tamaño (inscripciones, grupos, tablas y partidos).
+    """
+    libro = openpyxl.Workbook(write_only=True)
+
+    hoja = nueva_hoja(libro, 'Inscripciones', ['Jugador', 'RUT', 'Licencia', 'Categoría', 'Estado', 'Fecha inscripción'])
+    inscripciones = (Inscripcion.objects.filter(torneo=torneo).order_by('fecha_inscripcion', 'id')
+                     .values_list('jugador__nombre', 'jugador__apellido', 'jugador__rut', 'jugador__licencia',
+                                  'jugador__categoria', 'estado', 'fecha_inscripcion'))
+    for nombre, apellido, rut, licencia, categoria, estado, fecha in inscripciones.iterator(chunk_size=2000):
+        hoja.append([nombre_completo(nombre, apellido), rut, licencia, categoria, estado,
+                     timezone.make_naive(fecha) if fecha and timezone.is_aware(fecha) else fecha])
+
+    grupos = list(Grupo.objects.filter(torneo=torneo).order_by('nombre').values_list('id', 'nombre'))
+    tablas = GrupoStanding.tablas(gid for gid, _ in grupos)
+
+    partidos = (Partido.objects.filter(torneo=torneo)
+                .annotate(a_nombre=F('jugador_a__nombre'), a_apellido=F('jugador_a__apellido'),
+                          b_nombre=F('jugador_b__nombre'), b_apellido=F('jugador_b__apellido'),
+                          g_nombre=F('ganador__nombre'), g_apellido=F('ganador__apellido'))
+                .order_by('etapa', 'grupo', 'ronda', 'id')
+                .values('etapa', 'grupo', 'ronda', 'turno', 'mesa', 'sets_a', 'sets_b', 'detalle_sets',
+                        'a_nombre', 'a_apellido', 'b_nombre', 'b_apellido', 'g_nombre', 'g_apellido'))
+    por_grupo, por_ronda = {}, {}
+    for p in partidos:
+        if p['etapa'] == 'GRUPOS':
+            por_grupo.setdefault(p['grupo'], []).append(p)
+        else:
+            clave = 'Final' if p['etapa'] == 'FINAL' else f"Ronda {p['ronda']}"
+            por_ronda.setdefault((p['ronda'], clave), []).append(p)
+
+    encabezado_partidos = ['Ronda', 'Turno', 'Mesa', 'Jugador A', 'Jugador B', 'Sets A', 'Sets B', 'Detalle', 'Ganador']
+
+    def fila_partido(p):
+        ganador = nombre_completo(p['g_nombre'], p['g_apellido']) if p['g_nombre'] else ''
+        return [p['ronda'], p['turno'], p['mesa'], nombre_completo(p['a_nombre'], p['a_apellido']),
+                nombre_completo(p['b_nombre'], p['b_apellido']), p['sets_a'], p['sets_b'], p['detalle_sets'], ganador]
+
+    for gid, nombre in grupos:
+        hoja = nueva_hoja(libro, f'Grupo {nombre}', ['Pos', 'Jugador', 'PJ', 'PG', 'PP', 'SA', 'SB'])
+        for pos, fila in enumerate(tablas.get(gid, []), start=1):
+            j = fila['jugador']
+            hoja.append([pos, nombre_completo(j.nombre, j.apellido), fila['PJ'], fila['PG'], fila['PP'], fila['SA'], fila['SB']])
+        partidos_grupo = por_grupo.get(nombre, [])
+        if partidos_grupo:
+            hoja.append([])
+            hoja.append(encabezado_partidos)
+            for p in partidos_grupo:
+                hoja.append(fila_partido(p))
+
+    for (_, titulo), lista in sorted(por_ronda.items()):
+        hoja = nueva_hoja(libro, titulo, encabezado_partidos)
+        for p in lista:
+            hoja.append(fila_partido(p))
+    return libro
+
+
+CREDENCIALES_COLUMNAS = 2
+CREDENCIALES_FILAS = 4
+
+
+def escribir_credenciales(torneo, url_jugador, archivo):
+    """PDF imprimible con una credencial (nombre, categoría y QR) por jugador INSCRITO.
+
+    url_jugador(id) da el texto del QR. Los QR que no están en caché se codifican en
+    paralelo con qr.png_lote antes de dibujar.
+    """
+    jugadores = list(Inscripcion.objects.filter(torneo=torneo, estado='INSCRITO')
+                     .order_by('jugador__apellido', 'jugador__nombre', 'jugador_id')
+                     .values_list('jugador_id', 'jugador__nombre', 'jugador__apellido', 'jugador__categoria'))
+    imagenes = qr.png_lote(url_jugador(jid) for jid, *_ in jugadores)
+
+    c = canvas.Canvas(archivo, pagesize=letter)
+    ancho, alto = letter
+    margen = 36
+    celda_w = (ancho - 2 * margen) / CREDENCIALES_COLUMNAS
+    celda_h = (alto - 2 * margen) / CREDENCIALES_FILAS
+    lado_qr = min(celda_w, celda_h) - 60
+    por_pagina = CREDENCIALES_COLUMNAS * CREDENCIALES_FILAS
+    for i, (jid, nombre, apellido, categoria) in enumerate(jugadores):
+        if i and i % por_pagina == 0:
+            c.showPage()
+        fila, col = divmod(i % por_pagina, CREDENCIALES_COLUMNAS)
+        x = margen + col * celda_w
+        y = alto - margen - (fila + 1) * celda_h
+        c.rect(x + 4, y + 4, celda_w - 8, celda_h - 8)
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(x + 14, y + celda_h - 22, torneo.nombre[:40])
+        c.setFont("Helvetica-Bold", 13)
+        c.drawString(x + 14, y + celda_h - 40, nombre_completo(nombre, apellido)[:32])
+        c.setFont("Helvetica", 9)
+        c.drawString(x + 14, y + celda_h - 54, categoria)
+        imagen = ImageReader(io.BytesIO(imagenes[url_jugador(jid)]))
+        c.drawImage(imagen, x + (celda_w - lado_qr) / 2, y + 10, lado_qr, lado_qr)
+    c.save()
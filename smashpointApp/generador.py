@@ -0,0 +1,133 @@
+"""
+Generación de grupos, fixture y bracket de un torneo.
+Todo se arma en memoria y se persiste con bulk_create dentro de una sola transacción,
+de modo que un cuadro de cientos de jugadores cuesta un puñado de INSERTs.
+"""
+import math
+
+from django.db import transaction
+
+from . import versiones
+from .calendario import rondas_circulares
+from .models import ContadorVersion, Grupo, GrupoStanding, Jugador, Partido
+
+
+def jugadores_inscritos(torneo):
+    """Jugadores con estado INSCRITO, ordenados por id."""
+    return list(Jugador.objects.filter(
+        inscripcion__torneo=torneo, inscripcion__estado='INSCRITO'
+    ).order_by('id'))
+
+
+def potencia_2_cercana(n):
+    """Encuentra la potencia de 2 más cercana menor o igual a n"""
+    if n <= 2:
+        return 2
+    return 2 ** math.floor(math.log2(n))
+
+
+def nombre_grupo(idx):
+    """A..Z, luego AA, AB, ... (nombre cabe en Grupo.nombre)."""
+    nombre = ''
+    idx += 1
+    while idx:
+        idx, resto = divmod(idx - 1, 26)
+        nombre = chr(65 + resto) + nombre
+    return nombre
+
+
+def emparejar(jugadores, torneo, ronda, etapa, best_of):
+    """Partidos (sin guardar) emparejando la lista de a pares consecutivos."""
+    return [
+        Partido(torneo=torneo, ronda=ronda, etapa=etapa, jugador_a=jugadores[i],
+                jugador_b=jugadores[i + 1], best_of=best_of)
+        for i in range(0, len(jugadores) - 1, 2)
+    ]
+
+
+def generar_grupos(torneo, jugadores=None):
+    """Crea grupos, membresías, filas de tabla y partidos todos-contra-todos numerados por ronda.
+
+    La cantidad de grupos se elige para que los 2 mejores de cada grupo formen un
+    bracket potencia de 2. Devuelve la cantidad de grupos creados.
+    """
+    if jugadores is None:
+        jugadores = jugadores_inscritos(torneo)
+    jugadores = sorted(jugadores, key=lambda x: x.id)
+    num_grupos = potencia_2_cercana(len(jugadores)) // 2
+
+    # Distribuir jugadores de forma equitativa
+    miembros = [[] for _ in range(num_grupos)]
+    for idx, j in enumerate(jugadores):
+        miembros[idx % num_grupos].append(j)
+
+    with transaction.atomic():
+        Grupo.objects.bulk_create([Grupo(torneo=torneo, nombre=nombre_grupo(i)) for i in range(num_grupos)])
+        # Releer en una consulta: no todos los motores devuelven pk en bulk_create
+        por_nombre = {g.nombre: g for g in Grupo.objects.filter(torneo=torneo)}
+        grupos = [por_nombre[nombre_grupo(i)] for i in range(num_grupos)]
+
+        Membresia = Grupo.jugadores.through
+        Membresia.objects.bulk_create(
+            [Membresia(grupo_id=g.id, jugador_id=j.id) for g, grp in zip(grupos, miembros) for j in grp],
+            batch_size=1000,
+        )
+        GrupoStanding.objects.bulk_create(
+            [GrupoStanding(grupo_id=g.id, jugador_id=j.id) for g, grp in zip(grupos, miembros) for j in grp],
+            batch_size=1000,
+        )
+        partidos = []
+        for g, grp in zip(grupos, miembros):
+            for ronda, pares in enumerate(rondas_circulares(grp), start=1):
+                for a, b in pares:
+                    partidos.append(Partido(torneo=torneo, ronda=ronda, etapa='GRUPOS', grupo=g.nombre,
+                                            jugador_a=a, jugador_b=b, best_of=3))
+        Partido.objects.bulk_create(partidos, batch_size=1000)
+
+        torneo.estado = 'EN_CURSO'
+        torneo.save(update_fields=['estado'])
+    return num_grupos
+
+
+def generar_fixture(torneo, jugadores=None):
+    """Primera ronda de eliminación directa emparejando inscritos secuencialmente."""
+    if jugadores is None:
+        jugadores = jugadores_inscritos(torneo)
+    with transaction.atomic():
+        partidos = Partido.objects.bulk_create(
+            emparejar(jugadores, torneo, ronda=1, etapa='ELIMINACION', best_of=3), batch_size=1000
+        )
+        torneo.estado = 'EN_CURSO'
+        torneo.calcular_total_rondas()
+    return partidos
+
+
+def clasificados_grupos(torneo, por_grupo=2):
+    """Los mejores `por_grupo` de cada grupo según GrupoStanding (dos consultas en total)."""
+    grupos = list(Grupo.objects.filter(torneo=torneo).order_by('id'))
+    tablas = GrupoStanding.tablas(g.id for g in grupos)
+    clasificados = []
+    for g in grupos:
+        clasificados.extend(fila['jugador'] for fila in tablas.get(g.id, [])[:por_grupo])
+    return clasificados
+
+
+def generar_bracket(torneo):
+    """Primera ronda de eliminación con los clasificados de la fase de grupos."""
+    with transaction.atomic():
+        partidos = Partido.objects.bulk_create(
+            emparejar(clasificados_grupos(torneo), torneo, ronda=1, etapa='ELIMINACION', best_of=3),
+            batch_size=1000,
+        )
+        ContadorVersion.incrementar(versiones.torneo(torneo.pk))
+    return partidos
+
+
+def generar_ronda(torneo, ganadores, ronda):
+    """Siguiente ronda de eliminación (FINAL si quedan 2 jugadores)."""
+    etapa = 'FINAL' if len(ganadores) == 2 else 'ELIMINACION'
+    best_of = 5 if etapa == 'FINAL' else 3
+    with transaction.atomic():
+        partidos = Partido.objects.bulk_create(emparejar(ganadores, torneo, ronda, etapa, best_of), batch_size=1000)
+        ContadorVersion.incrementar(versiones.torneo(torneo.pk))
+    return partidos
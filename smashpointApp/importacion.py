@@ -0,0 +1,264 @@
+"""
+Importación masiva de jugadores.
+Lee el archivo en streaming, valida cada fila sin tocar la base (clean_fields), detecta
+RUTs repetidos contra un set precargado con una sola consulta e inserta con bulk_create
+por lotes dentro de una transacción. Los trabajos en segundo plano pasan `al_confirmar`:
+entonces cada lote se confirma en su propia transacción y se informa el avance (filas
+leídas y reporte de rechazos) entre lotes, fuera de toda transacción, para que sea
+visible mientras la importación sigue.
+"""
+import csv
+import io
+from contextlib import nullcontext
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import sincronizacion, versiones
+from .models import ContadorVersion, Jugador, normalizar_rut, validar_ruts_chilenos
+
+COLUMNAS_REQUERIDAS = ['nombre', 'apellido', 'categoria', 'rut']
+TAMANO_LOTE = 1000
+
+
+class ErrorFormato(Exception):
+    """El archivo no se puede leer o le faltan columnas requeridas."""
+
+
+def texto(valor):
+    return '' if valor is None else str(valor).strip()
+
+
+def filas_excel(archivo):
+    """Genera (numero_fila, {columna: valor}) leyendo el libro en modo read_only."""
+    from openpyxl import load_workbook
+    try:
+        wb = load_workbook(filename=archivo, read_only=True, data_only=True)
+    except Exception as e:
+        raise ErrorFormato(f"Error leyendo Excel: {e}")
+    try:
+        filas = wb.active.iter_rows(values_only=True)
+        encabezados = next(filas, None) or ()
+        mapa = {str(h).strip().lower(): idx for idx, h in enumerate(encabezados) if h}
+        faltan = [c for c in COLUMNAS_REQUERIDAS if c not in mapa]
+        if faltan:
+            raise ErrorFormato(f"Faltan columnas requeridas: {', '.join(faltan)}")
+        for numero, valores in enumerate(filas, start=2):
+            yield numero, {c: (valores[i] if i < len(valores) else None) for c, i in mapa.items()}
+    finally:
+        wb.close()
+
+
+def ruts_existentes():
+    """RUTs ya registrados en forma canónica (una consulta sobre el índice de rut_canonico)."""
+    return set(Jugador.objects.exclude(rut_canonico__isnull=True)
+               .values_list('rut_canonico', flat=True).iterator(chunk_size=5000))
+
+
+def por_bloques(iterable, tamano):
+    bloque = []
+    for elemento in iterable:
+        bloque.append(elemento)
+        if len(bloque) >= tamano:
+            yield bloque
+            bloque = []
+    if bloque:
+        yield bloque
+
+
+def transacciones(al_confirmar):
+    """(transacción de toda la importación, transacción de cada lote) según haya avance o no."""
+    if al_confirmar is None:
+        return transaction.atomic(), nullcontext
+    return nullcontext(), transaction.atomic
+
+
+def importar_jugadores(filas, tamano_lote=TAMANO_LOTE, al_confirmar=None):
+    """Crea los jugadores de `filas` (iterable de (numero_fila, dict)) y devuelve (creados, reporte).
+
+    Los RUTs de cada bloque se validan juntos con validar_ruts_chilenos. El reporte tiene
+    una línea por fila omitida, con el mismo formato de la importación fila a fila.
+    Sin `al_confirmar` todo ocurre en una transacción; con él, cada lote se confirma por
+    separado y se llama al_confirmar(filas_leidas, reporte) después de cada commit.
+    """
+    reporte = []
+    vistos = ruts_existentes()
+    largo_rut = Jugador._meta.get_field('rut').max_length
+    creados = leidas = 0
+    inicio = timezone.now()
+    total, por_lote = transacciones(al_confirmar)
+    with total:
+        for bloque in por_bloques(filas, tamano_lote):
+            leidas += len(bloque)
+            errores = validar_ruts_chilenos(texto(fila.get('rut')) for _, fila in bloque)
+            lote = []
+            for numero, fila in bloque:
+                nombre = texto(fila.get('nombre'))
+                apellido = texto(fila.get('apellido'))
+                categoria = texto(fila.get('categoria')).upper() or 'AMATEUR'
+                rut = texto(fila.get('rut'))
+                if not nombre or not apellido or not rut:
+                    reporte.append(f"Fila {numero}: datos incompletos, omitida.")
+                    continue
+                if categoria not in dict(Jugador.CATEGORIAS):
+                    categoria = 'AMATEUR'
+                canonico = normalizar_rut(rut)
+                if canonico in vistos:
+                    reporte.append(f"Fila {numero}: RUT duplicado {rut}, omitido.")
+                    continue
+                error = errores[rut] or (f'máximo {largo_rut} caracteres.' if len(rut) > largo_rut else None)
+                if error:
+                    reporte.append(f"Fila {numero}: error RUT {rut} -> {error}")
+                    continue
+                jugador = Jugador(nombre=nombre, apellido=apellido, categoria=categoria, rut=rut, rut_canonico=canonico)
+                try:
+                    # Resto de validadores de campo; el RUT y su unicidad ya se resolvieron arriba
+                    jugador.clean_fields(exclude=['rut'])
+                except ValidationError as e:
+                    reporte.append(f"Fila {numero}: {e}")
+                    continue
+                vistos.add(canonico)
+                lote.append(jugador)
+            with por_lote():
+                Jugador.objects.bulk_create(lote)
+                if lote and al_confirmar is not None:
+                    ContadorVersion.incrementar(versiones.JUGADORES)
+            creados += len(lote)
+            if al_confirmar is not None:
+                al_confirmar(leidas, reporte)
+        if creados and al_confirmar is None:
+            # bulk_create no dispara las señales que versionan la tabla
+            ContadorVersion.incrementar(versiones.JUGADORES)
+            # Transacción larga: que /api/sync/ vea las filas con la hora del commit
+            sincronizacion.remarcar(Jugador, inicio)
+    return creados, reporte
+
+
+# ---------- CSV: inserción o actualización por licencia / RUT ----------
+CAMPOS_ACTUALIZABLES = ['nombre', 'apellido', 'categoria', 'licencia', 'rut', 'rut_canonico']
+
+
+def filas_csv(archivo):
+    """Genera (numero_fila, dict) decodificando el archivo de a poco (sin leerlo entero)."""
+    binario = getattr(archivo, 'file', archivo)
+    binario.seek(0)
+    texto_csv = io.TextIOWrapper(binario, encoding='utf-8-sig', newline='')
+    try:
+        lector = csv.DictReader(texto_csv)
+        lector.fieldnames = [texto(c).lower() for c in (lector.fieldnames or [])]
+        for numero, fila in enumerate(lector, start=2):
+            yield numero, fila
+    finally:
+        # No cerrar el archivo subido junto con el wrapper
+        texto_csv.detach()
+
+
+def claves_existentes():
+    """Mapas licencia -> id y RUT canónico -> id, más los valores guardados por id (una consulta)."""
+    por_licencia, por_rut, guardados = {}, {}, {}
+    filas = Jugador.objects.values_list('id', 'licencia', 'rut', 'rut_canonico').iterator(chunk_size=5000)
+    for jid, licencia, rut, canonico in filas:
+        if licencia:
+            por_licencia[licencia] = jid
+        if canonico:
+            por_rut[canonico] = jid
+        guardados[jid] = (licencia, rut, canonico)
+    return por_licencia, por_rut, guardados
+
+
+def actualizar_existentes(jugadores):
+    """Escribe los campos actualizables de jugadores que ya existen (con id); devuelve cuántos se actualizaron.
+
+    UPDATE y no upsert: un jugador borrado después de claves_existentes() no reaparece (sin
+    su Ranking), y en MySQL ON DUPLICATE KEY chocaría también con licencia o rut_canonico.
+    """
+    ahora = timezone.now()
+    for jugador in jugadores:
+        # bulk_update no aplica auto_now
+        jugador.actualizado_en = ahora
+    return Jugador.objects.bulk_update(jugadores, CAMPOS_ACTUALIZABLES + ['actualizado_en'], batch_size=TAMANO_LOTE)
+
+
+def upsert_jugadores(filas, tamano_lote=TAMANO_LOTE, al_confirmar=None):
+    """Crea o actualiza jugadores identificados por licencia o RUT.
+
+    Devuelve {'creados', 'actualizados', 'rechazados', 'filas', 'reporte'}; el reporte
+    tiene una línea por fila rechazada. `al_confirmar` como en importar_jugadores: se
+    escribe cada `tamano_lote` filas leídas.
+    """
+    resultado = {'creados': 0, 'actualizados': 0, 'rechazados': 0, 'filas': 0, 'reporte': []}
+    por_licencia, por_rut, guardados = claves_existentes()
+    en_archivo = set()
+    nuevos, cambios = [], []
+
+    def rechazar(numero, motivo):
+        resultado['rechazados'] += 1
+        resultado['reporte'].append(f"Fila {numero}: {motivo}")
+
+    def escribir():
+        with por_lote():
+            if nuevos:
+                Jugador.objects.bulk_create(nuevos)
+                resultado['creados'] += len(nuevos)
+            if cambios:
+                resultado['actualizados'] += actualizar_existentes(cambios)
+            if (nuevos or cambios) and al_confirmar is not None:
+                ContadorVersion.incrementar(versiones.JUGADORES, versiones.RANKING)
+        nuevos.clear()
+        cambios.clear()
+        if al_confirmar is not None:
+            al_confirmar(resultado['filas'], resultado['reporte'])
+
+    inicio = timezone.now()
+    total, por_lote = transacciones(al_confirmar)
+    with total:
+        for numero, fila in filas:
+            if resultado['filas'] and resultado['filas'] % tamano_lote == 0:
+                escribir()
+            resultado['filas'] += 1
+            nombre = texto(fila.get('nombre'))
+            apellido = texto(fila.get('apellido'))
+            categoria = texto(fila.get('categoria')).upper() or 'AMATEUR'
+            licencia = texto(fila.get('licencia') or fila.get('license')) or None
+            rut = texto(fila.get('rut')) or None
+            canonico = normalizar_rut(rut)
+            if not (licencia or rut):
+                rechazar(numero, 'sin licencia ni RUT, omitida.')
+                continue
+            if not nombre or not apellido:
+                rechazar(numero, 'datos incompletos, omitida.')
+                continue
+            if categoria not in dict(Jugador.CATEGORIAS):
+                categoria = 'AMATEUR'
+            claves = {('L', licencia) if licencia else None, ('R', canonico) if rut else None} - {None}
+            if claves & en_archivo:
+                rechazar(numero, 'repetida en el archivo, omitida.')
+                continue
+            id_licencia = por_licencia.get(licencia) if licencia else None
+            id_rut = por_rut.get(canonico) if rut else None
+            if id_licencia and id_rut and id_licencia != id_rut:
+                rechazar(numero, f'licencia {licencia} y RUT {rut} pertenecen a jugadores distintos.')
+                continue
+            jid = id_licencia or id_rut
+            canonico = normalizar_rut(rut) or None
+            if jid:
+                licencia_guardada, rut_guardado, canonico_guardado = guardados[jid]
+                if not rut or rut == rut_guardado:
+                    # Mismo RUT: se conserva su canónico (NULL en los duplicados heredados, ver Jugador)
+                    rut, canonico = rut_guardado, canonico_guardado
+                licencia = licencia or licencia_guardada
+            jugador = Jugador(id=jid, nombre=nombre, apellido=apellido, categoria=categoria, licencia=licencia, rut=rut,
+                              rut_canonico=canonico)
+            try:
+                jugador.clean_fields()
+            except ValidationError as e:
+                rechazar(numero, f'inválida -> {e}')
+                continue
+            en_archivo.update(claves)
+            (cambios if jid else nuevos).append(jugador)
+        escribir()
+        if (resultado['creados'] or resultado['actualizados']) and al_confirmar is None:
+            ContadorVersion.incrementar(versiones.JUGADORES, versiones.RANKING)
+            sincronizacion.remarcar(Jugador, inicio)
+    return resultado
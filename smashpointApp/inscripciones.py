@@ -0,0 +1,79 @@
+"""
+Inscripción masiva de jugadores en un torneo.
+Resuelve jugadores, inscripciones existentes y cupos en un puñado de consultas y crea
+las inscripciones nuevas con un solo bulk_create, bajo el bloqueo de la fila del torneo.
+Lo usan la vista web, la API y las importaciones.
+"""
+from django.db import transaction
+
+from . import versiones
+from .models import ContadorVersion, Inscripcion, Jugador, Torneo
+
+
+def normalizar_ids(ids):
+    """Enteros únicos en el orden recibido; descarta valores no numéricos."""
+    # dict conserva el orden de inserción y deduplica en O(1) por elemento
+    vistos = {}
+    for valor in ids:
+        try:
+            vistos[int(valor)] = None
+        except (TypeError, ValueError):
+            continue
+    return list(vistos)
+
+
+def inscribir_jugadores(torneo, ids, permitir_espera=False):
+    """Inscribe los jugadores `ids` en `torneo` y devuelve un reporte.
+
+    Los primeros nuevos ocupan los cupos libres (INSCRITO). Si no alcanzan y
+    permitir_espera es True, el resto queda en ESPERA; si es False no se inscribe
+    a nadie y los que no caben se informan en 'sin_cupo'.
+
+    Reporte: {'creados': [Jugador], 'espera': [Jugador], 'duplicados': [Jugador],
+              'sin_cupo': [Jugador], 'inexistentes': [id], 'cupos_disponibles': int}
+    """
+    ids = normalizar_ids(ids)
+    reporte = {'creados': [], 'espera': [], 'duplicados': [], 'sin_cupo': [], 'inexistentes': [],
+               'cupos_disponibles': 0}
+    torneo_id = getattr(torneo, 'pk', torneo)
+
+    with transaction.atomic():
+        # Mismo bloqueo que Inscripcion.save: serializa la asignación de cupos del torneo
+        bloqueado = Torneo.objects.select_for_update().only('cupos_max', 'inscritos_count').get(pk=torneo_id)
+        cupos = max(0, bloqueado.cupos_max - bloqueado.inscritos_count)
+        reporte['cupos_disponibles'] = cupos
+        if not ids:
+            return reporte
+
+        jugadores = Jugador.objects.only('id', 'nombre', 'apellido').in_bulk(ids)
+        existentes = set(Inscripcion.objects.filter(torneo_id=torneo_id, jugador_id__in=jugadores)
+                         .values_list('jugador_id', flat=True))
+
+        nuevos = []
+        for jid in ids:
+            jugador = jugadores.get(jid)
+            if jugador is None:
+                reporte['inexistentes'].append(jid)
+            elif jid in existentes:
+                reporte['duplicados'].append(jugador)
+            else:
+                nuevos.append(jugador)
+
+        if len(nuevos) > cupos and not permitir_espera:
+            reporte['sin_cupo'] = nuevos[cupos:]
+            return reporte
+
+        reporte['creados'] = nuevos[:cupos]
+        reporte['espera'] = nuevos[cupos:]
+        # Sin ignore_conflicts: los contadores y el reporte asumen que se insertó todo. Una
+        # escritura que no tomó el bloqueo choca con unique_together y revierte el lote completo.
+        Inscripcion.objects.bulk_create(
+            [Inscripcion(torneo_id=torneo_id, jugador=j, estado='INSCRITO') for j in reporte['creados']]
+            + [Inscripcion(torneo_id=torneo_id, jugador=j, estado='ESPERA') for j in reporte['espera']],
+            batch_size=1000,
+        )
+        Torneo.ajustar_contadores(torneo_id, {'INSCRITO': len(reporte['creados']),
+                                              'ESPERA': len(reporte['espera'])})
+        if nuevos:
+            ContadorVersion.incrementar(versiones.TORNEOS, versiones.torneo(torneo_id))
+    return reporte
@@ -0,0 +1,107 @@
+"""
+Resultados enviados en lote por tablets sin conexión (/api/matches/finish/batch/).
+La tablet encola los resultados con una clave de idempotencia propia y los envía juntos
+al recuperar la conexión. Todo el lote se aplica en una transacción: una consulta para
+las claves ya recibidas, una para bloquear los partidos y otra para los nombres de sus
+jugadores, un bulk_update de sets y ganadores, y
+las tablas de grupo y el ledger de ranking actualizados con sus operaciones masivas.
+Cada ítem recibe su propio estado; los inválidos no impiden aplicar el resto.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .mobile_serializers import MobileMatchFinishSerializer
+from .models import ContadorVersion, EnvioResultado, GrupoStanding, Jugador, Partido, RankingEvent
+
+MAX_RESULTADOS = 200
+LARGO_CLAVE = EnvioResultado._meta.get_field('clave').max_length
+
+APLICADO = 'applied'
+DUPLICADO = 'duplicate'  # la clave ya se aplicó con los mismos datos
+CONFLICTO = 'conflict'  # la clave ya se usó con otros datos, u otra clave del lote ya tomó el partido
+NO_ENCONTRADO = 'not_found'
+INVALIDO = 'invalid'
+
+
+def validar(items):
+    """(estados, validos): estados con los inválidos ya resueltos y [(índice, clave, datos)]."""
+    estados = [None] * len(items)
+    validos = []
+    for i, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        clave = str(item.get('key') or '').strip()
+        serializer = MobileMatchFinishSerializer(data=item)
+        if not clave or len(clave) > LARGO_CLAVE:
+            errores = {'key': [f'Clave de idempotencia requerida (máx. {LARGO_CLAVE} caracteres)']}
+            estados[i] = estado(clave, item.get('match_id'), INVALIDO, errores)
+        elif not serializer.is_valid():
+            estados[i] = estado(clave, item.get('match_id'), INVALIDO, serializer.errors)
+        else:
+            validos.append((i, clave, serializer.validated_data))
+    return estados, validos
+
+
+def estado(clave, match_id, valor, errores=None):
+    resultado = {'key': clave, 'matchId': None if match_id is None else str(match_id), 'status': valor}
+    if errores:
+        resultado['errors'] = errores
+    return resultado
+
+
+def aplicar(items):
+    """Aplica los resultados válidos del lote y devuelve un estado por ítem, en el orden recibido."""
+    estados, validos = validar(items)
+    with transaction.atomic():
+        envios = {e.clave: e for e in EnvioResultado.objects.filter(clave__in=[c for _, c, _ in validos])}
+        # FOR UPDATE sin JOIN ni OF (MariaDB no lo soporta); los nombres se leen aparte
+        partidos = (Partido.objects.select_for_update()
+                    .in_bulk({datos['match_id'] for _, _, datos in validos}))
+        nombres = dict(Jugador.objects.filter(
+            id__in={jid for p in partidos.values() for jid in (p.jugador_a_id, p.jugador_b_id)}
+        ).values_list('id', 'nombre'))
+        originales = {}  # partido_id -> estado_grupo antes del lote
+        nuevos = []
+        for i, clave, datos in validos:
+            match_id, ganador, marcador = datos['match_id'], datos['winner'], datos['score']
+            if clave in envios:
+                repetido = envios[clave].coincide(match_id, ganador, marcador)
+                estados[i] = estado(clave, match_id, DUPLICADO if repetido else CONFLICTO)
+                continue
+            partido = partidos.get(match_id)
+            if partido is None:
+                estados[i] = estado(clave, match_id, NO_ENCONTRADO)
+                continue
+            if partido.pk in originales:
+                # Dos claves distintas para el mismo partido: se aplica solo la primera
+                estados[i] = estado(clave, match_id, CONFLICTO,
+                                    {'matchId': ['Otro resultado de este envío ya modificó el partido']})
+                continue
+            if nombres.get(partido.jugador_a_id) == ganador:
+                ganador_id = partido.jugador_a_id
+            elif nombres.get(partido.jugador_b_id) == ganador:
+                ganador_id = partido.jugador_b_id
+            else:
+                estados[i] = estado(clave, match_id, INVALIDO,
+                                    {'winner': ['Winner no coincide con jugadores del partido']})
+                continue
+            originales[partido.pk] = partido.estado_grupo()
+            partido.sets_a, partido.sets_b = map(int, marcador.split('-'))
+            partido.ganador_id = ganador_id
+            envios[clave] = EnvioResultado(clave=clave, partido=partido, ganador=ganador, marcador=marcador)
+            nuevos.append(envios[clave])
+            estados[i] = estado(clave, match_id, APLICADO)
+
+        if nuevos:
+            modificados = [partidos[pk] for pk in originales]
+            # bulk_update no pasa por save() ni por las señales: marca, tablas y versiones a mano
+            ahora = timezone.now()
+            for partido in modificados:
+                partido.actualizado_en = ahora
+            Partido.objects.bulk_update(modificados, ['sets_a', 'sets_b', 'ganador', 'actualizado_en'])
+            GrupoStanding.aplicar_cambios([(originales[p.pk], p.estado_grupo()) for p in modificados])
+            for partido in modificados:
+                partido._estado_grupo_db = partido.estado_grupo()
+            RankingEvent.registrar_partidos(modificados)
+            EnvioResultado.objects.bulk_create(nuevos)
+            ContadorVersion.incrementar(*{ContadorVersion.de_torneo(p.torneo_id) for p in modificados})
+    return estados
@@ -0,0 +1,334 @@
+import time
+import tracemalloc
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from smashpointApp.models import Jugador, Torneo, Inscripcion
+
+
+class Rollback(Exception):
+    """Se lanza al final de cada benchmark para descartar los datos sintéticos."""
+
+
+def crear_torneo_con_inscritos(n, nombre='Benchmark'):
+    """Torneo ABIERTO con n jugadores inscritos, creado con bulk_create."""
+    torneo = Torneo.objects.create(nombre=nombre, direccion='Benchmark', fecha=date.today(),
+                                   categoria='TODO_COMPETIDOR', cupos_max=n, inscritos_count=n)
+    base = Jugador.objects.count()
+    Jugador.objects.bulk_create(
+        [Jugador(nombre=f'Bench{base + i}', apellido='Jugador', categoria='AMATEUR', licencia=f'BENCH-{base + i}')
+         for i in range(n)],
+        batch_size=1000,
+    )
+    jugadores = list(Jugador.objects.filter(licencia__startswith='BENCH-').order_by('-id')[:n])
+    Inscripcion.objects.bulk_create(
+        [Inscripcion(torneo=torneo, jugador=j, estado='INSCRITO') for j in jugadores],
+        batch_size=1000,
+    )
+    return torneo
+
+
+def libro_jugadores(n, inicio=10_000_000):
+    """Archivo temporal .xlsx con n jugadores de RUT válido (fixture de importación)."""
+    import tempfile
+    import openpyxl
+    from smashpointApp.models import digito_verificador
+    libro = openpyxl.Workbook(write_only=True)
+    hoja = libro.create_sheet('Jugadores')
+    hoja.append(['nombre', 'apellido', 'categoria', 'rut'])
+    for i in range(n):
+        cuerpo = inicio + i
+        hoja.append([f'Imp{i}', 'Excel', 'FEDERADO' if i % 3 else 'AMATEUR', f'{cuerpo}-{digito_verificador(cuerpo)}'])
+    archivo = tempfile.TemporaryFile(suffix='.xlsx')
+    libro.save(archivo)
+    archivo.seek(0)
+    return archivo
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks de rendimiento. Cada medición corre en una transacción que se revierte al final.'
+
+    SUITES = ['generacion', 'calendario', 'exportacion', 'excel', 'importacion', 'importacion_csv', 'credenciales',
+              'serializacion', 'listas_json', 'lote_resultados']
+
+    def add_arguments(self, parser):
+        parser.add_argument('suite', choices=self.SUITES)
+        parser.add_argument('--tamanos', type=int, nargs='+', help='Tamaños a medir (por defecto según la suite)')
+        parser.add_argument('--limite-mb', type=float, help='exportacion/listas_json: falla si el pico de memoria supera este valor')
+
+    def handle(self, *args, **options):
+        getattr(self, f"bench_{options['suite']}")(options)
+
+    def medir(self, etiqueta, preparar, ejecutar):
+        """Ejecuta preparar() + ejecutar(datos) dentro de una transacción revertida; mide solo ejecutar."""
+        try:
+            with transaction.atomic():
+                datos = preparar()
+                with CaptureQueriesContext(connection) as consultas:
+                    inicio = time.perf_counter()
+                    resultado = ejecutar(datos)
+                    duracion = time.perf_counter() - inicio
+                self.stdout.write(f'{etiqueta:<40} {duracion * 1000:>10.1f} ms {len(consultas):>7} consultas  {resultado or ""}')
+                raise Rollback
+        except Rollback:
+            pass
+
+    def bench_generacion(self, options):
+        from smashpointApp import generador
+        self.stdout.write(self.style.MIGRATE_HEADING('Generación de grupos / fixture / bracket'))
+        for n in options['tamanos'] or [64, 256, 1024]:
+            self.medir(
+                f'generar_grupos ({n} inscritos)',
+                lambda: crear_torneo_con_inscritos(n),
+                lambda torneo: f'{generador.generar_grupos(torneo)} grupos',
+            )
+            self.medir(
+                f'generar_fixture ({n} inscritos)',
+                lambda: crear_torneo_con_inscritos(n),
+                lambda torneo: f'{len(generador.generar_fixture(torneo))} partidos',
+            )
+
+            def con_grupos():
+                torneo = crear_torneo_con_inscritos(n)
+                generador.generar_grupos(torneo)
+                return torneo
+            self.medir(
+                f'generar_bracket ({n} inscritos)',
+                con_grupos,
+                lambda torneo: f'{len(generador.generar_bracket(torneo))} partidos',
+            )
+
+    def bench_calendario(self, options):
+        from types import SimpleNamespace
+        from smashpointApp import calendario
+        self.stdout.write(self.style.MIGRATE_HEADING('Programación de mesas (método del círculo + greedy)'))
+        for n in options['tamanos'] or [64, 256, 1024]:
+            # Grupos de 4 como en un torneo real: 6 partidos por grupo en 3 rondas
+            partidos = []
+            for g in range(n // 4):
+                ids = [g * 4 + i for i in range(4)]
+                for ronda, pares in enumerate(calendario.rondas_circulares(ids), start=1):
+                    for a, b in pares:
+                        partidos.append(SimpleNamespace(id=len(partidos) + 1, ronda=ronda, grupo=str(g),
+                                                        jugador_a_id=a, jugador_b_id=b, turno=None, mesa=None))
+            for mesas in (8, 16):
+                inicio = time.perf_counter()
+                makespan = calendario.programar(partidos, mesas, descanso=1)
+                duracion = time.perf_counter() - inicio
+                cota = calendario.cota_inferior(partidos, mesas, descanso=1)
+                self.stdout.write(f'{len(partidos):>6} partidos, {mesas:>2} mesas: makespan {makespan:>4} turnos '
+                                  f'(cota inferior {cota:>4})  {duracion * 1000:>8.1f} ms')
+
+    def bench_exportacion(self, options):
+        from django.test import RequestFactory
+        from smashpointApp import streaming
+        self.stdout.write(self.style.MIGRATE_HEADING('Exportación CSV en streaming (pico de memoria con tracemalloc)'))
+        limite = options['limite_mb']
+        excedidos = []
+        for n in options['tamanos'] or [1_000_000]:
+            def preparar():
+                Jugador.objects.bulk_create(
+                    (Jugador(nombre=f'Exp{i}', apellido='Streaming', categoria='AMATEUR', licencia=f'EXP-{i}')
+                     for i in range(n)),
+                    batch_size=5000,
+                )
+                return Jugador.objects.filter(licencia__startswith='EXP-').order_by('id')
+
+            for gzip in (False, True):
+                def exportar(qs):
+                    request = RequestFactory().get('/', {'gzip': '1'} if gzip else {})
+                    response = streaming.respuesta_csv(request, 'jugadores', ['id', 'nombre', 'apellido', 'categoria'],
+                                                       qs, ['id', 'nombre', 'apellido', 'categoria'])
+                    tracemalloc.start()
+                    total = sum(len(bloque) for bloque in response.streaming_content)
+                    _, pico = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    pico_mb = pico / 1024 / 1024
+                    if limite is not None and pico_mb > limite:
+                        excedidos.append(f'{n} filas gzip={gzip}: {pico_mb:.1f} MB')
+                    return f'{total / 1024 / 1024:.1f} MB enviados, pico {pico_mb:.1f} MB'
+                self.medir(f'export CSV ({n} filas, gzip={gzip})', preparar, exportar)
+        if excedidos:
+            raise CommandError(f'Pico de memoria sobre {limite} MB: ' + '; '.join(excedidos))
+
+    def bench_excel(self, options):
+        from smashpointApp import exportaciones, generador
+        self.stdout.write(self.style.MIGRATE_HEADING('Libro Excel del torneo (write-only a archivo temporal)'))
+        for n in options['tamanos'] or [1024]:
+            def con_cuadro():
+                torneo = crear_torneo_con_inscritos(n)
+                generador.generar_grupos(torneo)
+                generador.generar_bracket(torneo)
+                return torneo
+
+            def exportar(torneo):
+                tracemalloc.start()
+                archivo = exportaciones.guardar_temporal(exportaciones.libro_torneo(torneo))
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                archivo.seek(0, 2)
+                tamano = archivo.tell()
+                archivo.close()
+                return f'{tamano / 1024:.0f} KB, pico {pico / 1024 / 1024:.1f} MB'
+            self.medir(f'libro_torneo ({n} inscritos)', con_cuadro, exportar)
+
+    def bench_importacion(self, options):
+        from smashpointApp import importacion
+        self.stdout.write(self.style.MIGRATE_HEADING('Importación Excel de jugadores (read_only + bulk_create)'))
+        for n in options['tamanos'] or [100_000]:
+            inicio = time.perf_counter()
+            archivo = libro_jugadores(n)
+            self.stdout.write(f'fixture de {n} filas generado en {time.perf_counter() - inicio:.1f} s')
+
+            def importar(archivo):
+                archivo.seek(0)
+                creados, reporte = importacion.importar_jugadores(importacion.filas_excel(archivo))
+                return f'{creados} creados, {len(reporte)} omitidos'
+            self.medir(f'importar_jugadores ({n} filas)', lambda: archivo, importar)
+            def ya_importado():
+                # Segunda pasada: todas las filas son duplicadas
+                importar(archivo)
+                return archivo
+            self.medir(f'importar_jugadores duplicados ({n} filas)', ya_importado, importar)
+            archivo.close()
+
+    def bench_importacion_csv(self, options):
+        import tempfile
+        from smashpointApp import importacion
+        from smashpointApp.models import digito_verificador
+        self.stdout.write(self.style.MIGRATE_HEADING('Importación CSV de jugadores (streaming + upsert por lotes)'))
+        for n in options['tamanos'] or [100_000]:
+            archivo = tempfile.TemporaryFile()
+            archivo.write(b'nombre,apellido,categoria,licencia,rut\n')
+            for i in range(n):
+                cuerpo = 20_000_000 + i
+                archivo.write(f'Csv{i},Upsert,AMATEUR,CSV-{i},{cuerpo}-{digito_verificador(cuerpo)}\n'.encode())
+
+            def importar(archivo):
+                tracemalloc.start()
+                resultado = importacion.upsert_jugadores(importacion.filas_csv(archivo))
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                return (f"{resultado['creados']} creados, {resultado['actualizados']} actualizados, "
+                        f"pico {pico / 1024 / 1024:.1f} MB")
+
+            self.medir(f'upsert_jugadores ({n} filas nuevas)', lambda: archivo, importar)
+
+            def ya_importado():
+                importacion.upsert_jugadores(importacion.filas_csv(archivo))
+                return archivo
+            self.medir(f'upsert_jugadores ({n} filas existentes)', ya_importado, importar)
+            archivo.close()
+
+    def bench_credenciales(self, options):
+        import tempfile
+        from django.test import override_settings
+        from smashpointApp import exportaciones, qr
+        self.stdout.write(self.style.MIGRATE_HEADING('Hoja de credenciales con QR (pool de procesos + caché en disco)'))
+        for n in options['tamanos'] or [500]:
+            with tempfile.TemporaryDirectory() as cache, override_settings(ARTEFACTOS_ROOT=cache):
+                for etiqueta in ('caché fría', 'caché caliente'):
+                    def generar(torneo):
+                        # Cada medición crea jugadores nuevos: numerarlos desde 0 para que la
+                        # segunda pasada encuentre los mismos QR en caché
+                        base = torneo.inscripcion_set.order_by('jugador_id').values_list('jugador_id', flat=True).first()
+                        with tempfile.TemporaryFile() as archivo:
+                            exportaciones.escribir_credenciales(
+                                torneo, lambda jid: f'https://smashpoint.cl/public/jugador/{jid - base}/', archivo)
+                            return f'{archivo.tell() / 1024:.0f} KB'
+                    qr.png.cache_clear()
+                    self.medir(f'credenciales ({n} inscritos, {etiqueta})', lambda: crear_torneo_con_inscritos(n), generar)
+
+    def bench_serializacion(self, options):
+        from django.db.models.functions import Coalesce
+        from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+        from smashpointApp import proyecciones
+        from smashpointApp.mobile_serializers import MobilePlayerSerializer
+        from smashpointApp.models import Ranking
+        self.stdout.write(self.style.MIGRATE_HEADING('Jugadores móviles: ModelSerializer + camelize vs proyección values()'))
+        for n in options['tamanos'] or [1000, 10000, 100000]:
+            def con_ranking():
+                torneo = crear_torneo_con_inscritos(n)
+                ids = torneo.inscripcion_set.values_list('jugador_id', flat=True)
+                Ranking.objects.bulk_create([Ranking(jugador_id=j, puntos=j % 500) for j in ids], batch_size=1000)
+                return Jugador.objects.filter(id__in=ids).order_by('id')
+
+            def serializer(qs):
+                qs = qs.annotate(puntos=Coalesce('ranking__puntos', 0))
+                return f"{len(CamelCaseJSONRenderer().render(MobilePlayerSerializer(qs, many=True).data)) / 1024:.0f} KB"
+
+            def proyeccion(qs):
+                return f"{len(JSONRenderer().render(proyecciones.JUGADORES.lista(qs))) / 1024:.0f} KB"
+
+            self.medir(f'serializer ({n} jugadores)', con_ranking, serializer)
+            self.medir(f'proyección ({n} jugadores)', con_ranking, proyeccion)
+
+    def bench_listas_json(self, options):
+        from django.http import JsonResponse
+        from smashpointApp import streaming
+        self.stdout.write(self.style.MIGRATE_HEADING('api_jugadores: JsonResponse(list(...)) vs JSON en streaming (tracemalloc)'))
+        limite = options['limite_mb']
+        excedidos = []
+        campos = ['id', 'nombre', 'apellido', 'categoria', 'rut', 'origen']
+        for n in options['tamanos'] or [10_000, 100_000]:
+            def preparar():
+                Jugador.objects.bulk_create(
+                    (Jugador(nombre=f'Json{i}', apellido='Streaming', categoria='AMATEUR', licencia=f'JSON-{i}')
+                     for i in range(n)),
+                    batch_size=5000,
+                )
+                return Jugador.objects.filter(licencia__startswith='JSON-')
+
+            def en_memoria(qs):
+                tracemalloc.start()
+                total = len(JsonResponse({'jugadores': list(qs.values(*campos))}).content)
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                return f'{total / 1024 / 1024:.1f} MB, pico {pico / 1024 / 1024:.1f} MB'
+
+            def en_streaming(qs):
+                tracemalloc.start()
+                total = sum(len(bloque) for bloque in streaming.respuesta_json('jugadores', qs, campos).streaming_content)
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                pico_mb = pico / 1024 / 1024
+                if limite is not None and pico_mb > limite:
+                    excedidos.append(f'{n} filas: {pico_mb:.1f} MB')
+                return f'{total / 1024 / 1024:.1f} MB, pico {pico_mb:.1f} MB'
+
+            self.medir(f'JsonResponse ({n} jugadores)', preparar, en_memoria)
+            self.medir(f'streaming ({n} jugadores)', preparar, en_streaming)
+        if excedidos:
+            raise CommandError(f'Pico de memoria sobre {limite} MB: ' + '; '.join(excedidos))
+
+    def bench_lote_resultados(self, options):
+        from smashpointApp import lote_resultados
+        from smashpointApp.mobile_serializers import MobileMatchFinishSerializer
+        from smashpointApp.models import Partido, RankingEvent
+        self.stdout.write(self.style.MIGRATE_HEADING('Resultados desde tablet: uno por POST vs lote'))
+        for n in options['tamanos'] or [50]:
+            def con_partidos():
+                torneo = crear_torneo_con_inscritos(2 * n)
+                ids = list(torneo.inscripcion_set.order_by('jugador_id').values_list('jugador_id', flat=True))
+                Partido.objects.bulk_create([Partido(torneo=torneo, ronda=1, jugador_a_id=ids[2 * i],
+                                                     jugador_b_id=ids[2 * i + 1]) for i in range(n)])
+                partidos = Partido.objects.filter(torneo=torneo).select_related('jugador_a')
+                return [{'key': f'bench-{p.id}', 'match_id': p.id, 'winner': p.jugador_a.nombre, 'score': '3-1'}
+                        for p in partidos]
+
+            def uno_por_uno(items):
+                for item in items:
+                    serializer = MobileMatchFinishSerializer(data=item)
+                    serializer.is_valid(raise_exception=True)
+                    RankingEvent.registrar_partidos([serializer.save()])
+
+            def en_lote(items):
+                estados = lote_resultados.aplicar(items)
+                return f"{sum(e['status'] == lote_resultados.APLICADO for e in estados)} aplicados"
+
+            self.medir(f'uno por POST ({n} resultados)', con_partidos, uno_por_uno)
+            self.medir(f'lote ({n} resultados)', con_partidos, en_lote)
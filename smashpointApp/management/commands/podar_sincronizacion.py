@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from smashpointApp import sincronizacion
+
+
+class Command(BaseCommand):
+    help = ('Borra los tombstones de /api/sync/ más viejos que SINCRONIZACION_RETENCION_DIAS. '
+            'Los clientes con un token anterior reciben una sincronización completa.')
+
+    def handle(self, *args, **options):
+        borrados = sincronizacion.podar_eliminaciones()
+        self.stdout.write(self.style.SUCCESS(f'Tombstones borrados: {borrados}'))
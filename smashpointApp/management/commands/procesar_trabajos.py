@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from smashpointApp import trabajos
+
+
+class Command(BaseCommand):
+    help = 'Worker de trabajos en segundo plano (importaciones). Usa la base de datos como cola, sin broker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrencia', type=int, default=2, help='Trabajos simultáneos')
+        parser.add_argument('--procesos', action='store_true', help='Usar un pool de procesos en vez de hilos')
+        parser.add_argument('--intervalo', type=float, default=2.0, help='Segundos entre consultas a la cola vacía')
+        parser.add_argument('--una-vez', action='store_true', help='Procesar lo pendiente y terminar')
+        parser.add_argument('--colgados-min', type=int, default=10,
+                            help='Reencolar trabajos EN_CURSO sin latido hace más de estos minutos')
+
+    def liberar_colgados(self, minutos):
+        liberados = trabajos.liberar_colgados(minutos)
+        if liberados:
+            self.stdout.write(self.style.WARNING(f'Trabajos colgados reencolados: {liberados}'))
+
+    def handle(self, *args, **options):
+        concurrencia = max(1, options['concurrencia'])
+        self.liberar_colgados(options['colgados_min'])
+        # Con la cola vacía se vuelve a revisar, como mucho una vez por minuto: recupera los
+        # trabajos de otros workers caídos mientras este sigue vivo
+        proxima_revision = time.monotonic() + 60
+        if options['procesos']:
+            # Los hijos no deben heredar conexiones abiertas del padre
+            connections.close_all()
+            pool, tarea = ProcessPoolExecutor(max_workers=concurrencia), trabajos.ejecutar_en_proceso
+        else:
+            pool, tarea = ThreadPoolExecutor(max_workers=concurrencia), trabajos.ejecutar_en_hilo
+        self.stdout.write(f"Worker iniciado ({concurrencia} {'procesos' if options['procesos'] else 'hilos'})")
+
+        en_curso = set()
+        try:
+            while True:
+                while len(en_curso) < concurrencia:
+                    trabajo_id = trabajos.reclamar_siguiente()
+                    if trabajo_id is None and time.monotonic() >= proxima_revision:
+                        proxima_revision = time.monotonic() + 60
+                        self.liberar_colgados(options['colgados_min'])
+                        trabajo_id = trabajos.reclamar_siguiente()
+                    if trabajo_id is None:
+                        break
+                    self.stdout.write(f'Trabajo #{trabajo_id} iniciado')
+                    en_curso.add(pool.submit(tarea, trabajo_id))
+                if not en_curso:
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+                listos, en_curso = wait(en_curso, timeout=options['intervalo'], return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    self.stdout.write(self.style.SUCCESS(f'Trabajo #{futuro.result()} terminado'))
+        except KeyboardInterrupt:
+            self.stdout.write('Deteniendo worker; se esperan los trabajos en curso...')
+        finally:
+            pool.shutdown(wait=True)
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from smashpointApp.models import RankingEvent
+
+class Command(BaseCommand):
+    help = 'Recalcula los puntos de Ranking desde el ledger RankingEvent en una sola pasada.'
+
+    def handle(self, *args, **options):
+        actualizados = RankingEvent.reconstruir_totales()
+        self.stdout.write(self.style.SUCCESS(f'Ranking reconstruido desde el ledger (filas actualizadas: {actualizados})'))
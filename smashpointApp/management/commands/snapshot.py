@@ -0,0 +1,30 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from smashpointApp import snapshot
+
+
+class Command(BaseCommand):
+    help = 'Vuelca toda la base (o lo modificado desde --updated-since) como NDJSON comprimido con gzip.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salida', default='-', help='Archivo .ndjson.gz de destino ("-" = stdout)')
+        parser.add_argument('--updated-since', help='Solo filas modificadas desde esta fecha (ISO 8601)')
+
+    def handle(self, *args, **options):
+        try:
+            desde = snapshot.parsear_desde(options['updated_since'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        destino = sys.stdout.buffer if options['salida'] == '-' else open(options['salida'], 'wb')
+        try:
+            total = 0
+            for bloque in snapshot.generar(desde):
+                destino.write(bloque)
+                total += len(bloque)
+        finally:
+            if destino is not sys.stdout.buffer:
+                destino.close()
+        if options['salida'] != '-':
+            self.stdout.write(self.style.SUCCESS(f"Snapshot escrito en {options['salida']} ({total} bytes)"))
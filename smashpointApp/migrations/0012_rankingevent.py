@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def saldo_inicial(apps, schema_editor):
+    # Los puntos acumulados antes del ledger quedan como un evento de saldo inicial por jugador
+    Ranking = apps.get_model('smashpointApp', 'Ranking')
+    RankingEvent = apps.get_model('smashpointApp', 'RankingEvent')
+    RankingEvent.objects.bulk_create(
+        [RankingEvent(jugador_id=jid, etapa='SALDO_INICIAL', puntos=pts)
+         for jid, pts in Ranking.objects.exclude(puntos=0).values_list('jugador_id', 'puntos').iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0011_alter_torneo_categoria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('etapa', models.CharField(choices=[('ELIMINACION', 'Eliminación'), ('GRUPOS', 'Grupos'), ('FINAL', 'Final'), ('AJUSTE', 'Ajuste manual'), ('SALDO_INICIAL', 'Saldo inicial')], max_length=15)),
+                ('puntos', models.IntegerField()),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('jugador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos_ranking', to='smashpointApp.jugador')),
+                ('partido', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='eventos_ranking', to='smashpointApp.partido')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['jugador', 'creado_en'], name='smashpointA_jugador_03cda0_idx')],
+            },
+        ),
+        migrations.RunPython(saldo_inicial, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def poblar_standings(apps, schema_editor):
+    # Calcula las tablas actuales a partir de los partidos de grupos ya jugados
+    Grupo = apps.get_model('smashpointApp', 'Grupo')
+    Partido = apps.get_model('smashpointApp', 'Partido')
+    GrupoStanding = apps.get_model('smashpointApp', 'GrupoStanding')
+    filas = {}
+    grupos = {}
+    for g in Grupo.objects.all():
+        grupos[(g.torneo_id, g.nombre)] = g.id
+        for jid in g.jugadores.values_list('id', flat=True):
+            filas[(g.id, jid)] = GrupoStanding(grupo_id=g.id, jugador_id=jid)
+    partidos = Partido.objects.filter(etapa='GRUPOS', sets_a__isnull=False, sets_b__isnull=False)
+    for p in partidos.iterator():
+        gid = grupos.get((p.torneo_id, p.grupo))
+        a = filas.get((gid, p.jugador_a_id))
+        b = filas.get((gid, p.jugador_b_id))
+        if a is None or b is None:
+            continue
+        a.pj += 1
+        b.pj += 1
+        a.sa += p.sets_a
+        a.sb += p.sets_b
+        b.sa += p.sets_b
+        b.sb += p.sets_a
+        if p.ganador_id == p.jugador_a_id:
+            a.pg += 1
+            b.pp += 1
+        elif p.ganador_id == p.jugador_b_id:
+            b.pg += 1
+            a.pp += 1
+    GrupoStanding.objects.bulk_create(filas.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0012_rankingevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GrupoStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pj', models.IntegerField(default=0)),
+                ('pg', models.IntegerField(default=0)),
+                ('pp', models.IntegerField(default=0)),
+                ('sa', models.IntegerField(default=0)),
+                ('sb', models.IntegerField(default=0)),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='smashpointApp.grupo')),
+                ('jugador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='smashpointApp.jugador')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['grupo', '-pg'], name='smashpointA_grupo_i_d95b11_idx')],
+                'unique_together': {('grupo', 'jugador')},
+            },
+        ),
+        migrations.RunPython(poblar_standings, migrations.RunPython.noop),
+    ]
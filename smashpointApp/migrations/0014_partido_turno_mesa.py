@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0013_grupostanding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partido',
+            name='mesa',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='turno',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
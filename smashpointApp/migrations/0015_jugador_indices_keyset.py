@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0014_partido_turno_mesa'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jugador',
+            index=models.Index(fields=['apellido', 'nombre', 'id'], name='smashpointA_apellid_670b2e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jugador',
+            index=models.Index(fields=['categoria', 'apellido', 'nombre', 'id'], name='smashpointA_categor_ff48d6_idx'),
+        ),
+    ]
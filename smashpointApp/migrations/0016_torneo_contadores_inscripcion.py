@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:32
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def calcular_contadores(apps, schema_editor):
+    Torneo = apps.get_model('smashpointApp', 'Torneo')
+    conteos = Torneo.objects.annotate(
+        n_inscritos=Count('inscripcion', filter=Q(inscripcion__estado='INSCRITO')),
+        n_espera=Count('inscripcion', filter=Q(inscripcion__estado='ESPERA')),
+    ).values_list('id', 'n_inscritos', 'n_espera')
+    for torneo_id, inscritos, espera in conteos:
+        Torneo.objects.filter(pk=torneo_id).update(inscritos_count=inscritos, espera_count=espera)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0015_jugador_indices_keyset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='torneo',
+            name='espera_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='torneo',
+            name='inscritos_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_contadores, migrations.RunPython.noop),
+    ]
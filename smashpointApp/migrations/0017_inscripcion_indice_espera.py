@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0016_torneo_contadores_inscripcion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inscripcion',
+            index=models.Index(fields=['torneo', 'estado', 'fecha_inscripcion'], name='smashpointA_torneo__5b55f5_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('smashpointApp', '0017_inscripcion_indice_espera'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoImportacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('JUGADORES_EXCEL', 'Jugadores desde Excel'), ('JUGADORES_CSV', 'Jugadores desde CSV')], max_length=20)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_CURSO', 'En curso'), ('COMPLETADO', 'Completado'), ('ERROR', 'Error')], default='PENDIENTE', max_length=12)),
+                ('archivo', models.FileField(upload_to='trabajos/%Y/%m/')),
+                ('filas_procesadas', models.PositiveIntegerField(default=0)),
+                ('creados', models.PositiveIntegerField(default=0)),
+                ('actualizados', models.PositiveIntegerField(default=0)),
+                ('rechazados', models.PositiveIntegerField(default=0)),
+                ('reporte', models.JSONField(blank=True, default=list)),
+                ('error', models.TextField(blank=True, default='')),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_en', models.DateTimeField(blank=True, null=True)),
+                ('terminado_en', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'creado_en'], name='smashpointA_estado_3cab05_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0018_trabajoimportacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=40, unique=True)),
+                ('valor', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:57
+
+from django.db import migrations, models
+
+
+def canonico(rut):
+    return (rut or '').upper().replace('.', '').replace('-', '').replace(' ', '').strip() or None
+
+
+def poblar_rut_canonico(apps, schema_editor):
+    """Rellena rut_canonico. Si dos jugadores comparten RUT con distinto formato, solo el
+    más antiguo lo recibe (el resto queda en NULL para revisión) y la unicidad se puede crear.
+    Jugador.save() conserva ese NULL mientras el RUT no cambie (Jugador.es_duplicado_heredado)."""
+    Jugador = apps.get_model('smashpointApp', 'Jugador')
+    vistos = set()
+    lote = []
+    for jugador in Jugador.objects.exclude(rut__isnull=True).only('id', 'rut').order_by('id').iterator(chunk_size=2000):
+        valor = canonico(jugador.rut)
+        if not valor or valor in vistos:
+            continue
+        vistos.add(valor)
+        jugador.rut_canonico = valor
+        lote.append(jugador)
+        if len(lote) >= 1000:
+            Jugador.objects.bulk_update(lote, ['rut_canonico'])
+            lote = []
+    if lote:
+        Jugador.objects.bulk_update(lote, ['rut_canonico'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0019_contadorversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jugador',
+            name='rut_canonico',
+            field=models.CharField(blank=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.RunPython(poblar_rut_canonico, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='jugador',
+            name='rut_canonico',
+            field=models.CharField(blank=True, editable=False, max_length=12, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0020_jugador_rut_canonico'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='grupo',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='inscripcion',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='jugador',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='partido',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='torneo',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='ranking',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0021_actualizado_en'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inscripcion',
+            index=models.Index(fields=['fecha_inscripcion', 'id'], name='smashpointA_fecha_i_3f48b3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='partido',
+            index=models.Index(fields=['torneo', 'ronda', 'id'], name='smashpointA_torneo__1bd407_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ranking',
+            index=models.Index(fields=['-puntos', 'id'], name='smashpointA_puntos_f9ef7d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='torneo',
+            index=models.Index(fields=['fecha', 'id'], name='smashpointA_fecha_6aeee0_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0022_indices_api_v2'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contadorversion',
+            name='actualizado_en',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
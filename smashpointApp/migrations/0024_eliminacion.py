@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0023_contadorversion_actualizado_en'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Eliminacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(choices=[('torneo', 'Torneo'), ('jugador', 'Jugador'), ('partido', 'Partido'), ('inscripcion', 'Inscripción')], max_length=20)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('eliminado_en', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['eliminado_en', 'modelo'], name='smashpointA_elimina_82750f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0024_eliminacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnvioResultado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=64, unique=True)),
+                ('ganador', models.CharField(max_length=100)),
+                ('marcador', models.CharField(max_length=20)),
+                ('recibido_en', models.DateTimeField(auto_now_add=True)),
+                ('partido', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='envios', to='smashpointApp.partido')),
+            ],
+        ),
+    ]
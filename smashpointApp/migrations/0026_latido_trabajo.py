@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:38
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def latido_desde_inicio(apps, schema_editor):
+    """Los trabajos EN_CURSO previos toman su inicio como último latido."""
+    TrabajoImportacion = apps.get_model('smashpointApp', 'TrabajoImportacion')
+    TrabajoImportacion.objects.filter(estado='EN_CURSO').update(latido_en=F('iniciado_en'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smashpointApp', '0025_envio_resultado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajoimportacion',
+            name='latido_en',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(latido_desde_inicio, migrations.RunPython.noop),
+    ]
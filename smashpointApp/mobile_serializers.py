@@ -16,8 +16,8 @@ class MobileTournamentSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre', 'fecha', 'direccion', 'estado', 'registered_count']
     
     def get_registered_count(self, obj):
-        """Retorna cantidad de jugadores inscritos"""
-        return obj.inscripcion_set.filter(estado='INSCRITO').count()
+        """Retorna cantidad de jugadores inscritos (contador desnormalizado, sin COUNT)"""
+        return obj.inscritos_count
     
     def to_representation(self, instance):
         """Convierte snake_case a camelCase"""
@@ -44,10 +44,12 @@ class MobilePlayerSerializer(serializers.ModelSerializer):
         ret = super().to_representation(instance)
         nombre_completo = f"{ret['nombre']} {ret['apellido']}"
         
-        # Obtener puntos del ranking si existe
-        from .models import Ranking
-        ranking = Ranking.objects.filter(jugador=instance).first()
-        puntos = ranking.puntos if ranking else 0
+        # Puntos anotados por la vista (un solo JOIN); consulta solo si no vienen anotados
+        puntos = getattr(instance, 'puntos', None)
+        if puntos is None:
+            from .models import Ranking
+            ranking = Ranking.objects.filter(jugador=instance).first()
+            puntos = ranking.puntos if ranking else 0
         
         return {
             'id': str(ret['id']),
@@ -98,6 +100,7 @@ class MobileMatchSerializer(serializers.ModelSerializer):
         
         return {
             'id': str(ret['id']),
+            'tournamentId': str(instance.torneo_id),
             'p1': p1_name,
             'p2': p2_name,
             'phase': phase,
@@ -117,6 +120,9 @@ class MobileTournamentPlayerSerializer(serializers.ModelSerializer):
     
     def get_rank(self, obj):
         """Obtener posición en ranking"""
+        # Posición anotada por la vista (Ranking.expresion_posicion); consulta solo si no viene
+        if getattr(obj, 'rank', None) is not None:
+            return obj.rank
         from .models import Ranking
         ranking = Ranking.objects.filter(jugador=obj).first()
         if ranking:
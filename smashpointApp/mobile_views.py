@@ -3,93 +3,94 @@ API Views para App Móvil
 Endpoints diseñados específicamente para React Native con respuestas en camelCase
 """
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError
+from django.http import Http404
 
-from .models import Torneo, Jugador, Partido, Inscripcion, Resultado
-from .mobile_serializers import (
-    MobileTournamentSerializer,
-    MobilePlayerSerializer,
-    MobileMatchSerializer,
-    MobileTournamentPlayerSerializer,
-    MobileResultSerializer,
-    MobileMatchFinishSerializer
-)
+from . import lote_resultados, proyecciones, sincronizacion, versiones
+from .models import Torneo, Jugador, Partido, Inscripcion, Resultado, Grupo, GrupoStanding
+from .paginacion import paginar_keyset, agregar_enlace_siguiente
+from .mobile_serializers import MobileMatchFinishSerializer
 
 
+@versiones.condicional(lambda request: [versiones.TORNEOS])
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@renderer_classes(proyecciones.RENDERERS)
 def mobile_tournaments(request):
     """
     GET /api/tournaments
     Lista de todos los torneos con información básica
     """
-    torneos = Torneo.objects.all().order_by('-fecha')
-    serializer = MobileTournamentSerializer(torneos, many=True)
-    return Response(serializer.data)
+    return Response(proyecciones.TORNEOS.lista(Torneo.objects.order_by('-fecha')))
 
 
+@versiones.condicional(lambda request: [versiones.JUGADORES, versiones.RANKING],
+                       parametros=('category', 'limit', 'cursor'))
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@renderer_classes(proyecciones.RENDERERS)
 def mobile_players(request):
     """
     GET /api/players
-    Lista de todos los jugadores con puntos y categoría
+    Lista de jugadores con puntos y categoría, paginada por cursor (keyset)
+
+    Query params opcionales:
+    - category: AMATEUR | FEDERADO
+    - limit: tamaño de página (por defecto 100, máximo 500)
+    - cursor: valor de la cabecera X-Next-Cursor de la respuesta anterior
     """
-    jugadores = Jugador.objects.all().order_by('apellido', 'nombre')
-    serializer = MobilePlayerSerializer(jugadores, many=True)
-    return Response(serializer.data)
+    jugadores = Jugador.objects.all()
+    categoria = request.GET.get('category')
+    if categoria:
+        jugadores = jugadores.filter(categoria=categoria.upper())
+    pagina, siguiente = paginar_keyset(request, proyecciones.JUGADORES.filas(jugadores), ['apellido', 'nombre', 'id'])
+    data = proyecciones.JUGADORES.construir_lista(pagina)
+    return agregar_enlace_siguiente(request, Response(data), siguiente)
 
 
+@versiones.condicional(lambda request, tournament_id: [versiones.torneo(tournament_id), versiones.JUGADORES])
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@renderer_classes(proyecciones.RENDERERS)
 def mobile_tournament_matches(request, tournament_id):
     """
     GET /api/tournaments/<id>/matches
     Lista de partidos de un torneo específico
     """
-    torneo = get_object_or_404(Torneo, pk=tournament_id)
-    partidos = Partido.objects.filter(torneo=torneo).select_related(
-        'jugador_a', 'jugador_b', 'ganador'
-    ).order_by('ronda', 'id')
-    
-    serializer = MobileMatchSerializer(partidos, many=True)
-    return Response(serializer.data)
+    data = proyecciones.PARTIDOS.lista(Partido.objects.filter(torneo_id=tournament_id).order_by('ronda', 'id'))
+    exigir_torneo(tournament_id, data)
+    return Response(data)
 
 
+@versiones.condicional(lambda request, tournament_id: [versiones.torneo(tournament_id), versiones.JUGADORES,
+                                                      versiones.RANKING])
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@renderer_classes(proyecciones.RENDERERS)
 def mobile_tournament_players(request, tournament_id):
     """
     GET /api/tournaments/<id>/players
     Lista de jugadores inscritos en un torneo
     """
-    torneo = get_object_or_404(Torneo, pk=tournament_id)
-    inscripciones = Inscripcion.objects.filter(
-        torneo=torneo, 
-        estado='INSCRITO'
-    ).select_related('jugador')
-    
-    jugadores = [insc.jugador for insc in inscripciones]
-    serializer = MobileTournamentPlayerSerializer(jugadores, many=True)
-    return Response(serializer.data)
+    data = inscritos_con_posicion(tournament_id)
+    exigir_torneo(tournament_id, data)
+    return Response(data)
 
 
+@versiones.condicional(lambda request: [versiones.RESULTADOS, versiones.TORNEOS, versiones.JUGADORES])
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@renderer_classes(proyecciones.RENDERERS)
 def mobile_results(request):
     """
     GET /api/results
     Resultados históricos de todos los torneos
     """
-    resultados = Resultado.objects.select_related(
-        'torneo', 'jugador1', 'jugador2'
-    ).all().order_by('-id')[:50]  # Últimos 50 resultados
-    
-    serializer = MobileResultSerializer(resultados, many=True)
-    return Response(serializer.data)
+    resultados = Resultado.objects.order_by('-id')[:50]  # Últimos 50 resultados
+    return Response(proyecciones.RESULTADOS.lista(resultados))
 
 
 @api_view(['POST'])
@@ -135,20 +136,143 @@ def mobile_finish_match(request):
     }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def mobile_finish_batch(request):
+    """
+    POST /api/matches/finish/batch
+    Guardar varios resultados encolados sin conexión (máx. 200), en una transacción
+
+    Body esperado (camelCase):
+    {
+        "results": [
+            {"key": "tablet3-0001", "matchId": "101", "winner": "Juan", "score": "3-1"},
+            ...
+        ]
+    }
+    Cada ítem vuelve con status applied, duplicate, conflict, not_found o invalid.
+    """
+    resultados = request.data.get('results') if isinstance(request.data, dict) else None
+    if not isinstance(resultados, list) or not resultados:
+        return Response({
+            'success': False,
+            'message': 'Se espera "results" con al menos un resultado'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(resultados) > lote_resultados.MAX_RESULTADOS:
+        return Response({
+            'success': False,
+            'message': f'Máximo {lote_resultados.MAX_RESULTADOS} resultados por envío'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        estados = lote_resultados.aplicar(resultados)
+    except IntegrityError:
+        # Otro envío con las mismas claves confirmó primero; al reintentar vuelven como duplicate
+        return Response({
+            'success': False,
+            'message': 'Envío concurrente con las mismas claves, reintentar'
+        }, status=status.HTTP_409_CONFLICT)
+    return Response({
+        'success': True,
+        'applied': sum(e['status'] == lote_resultados.APLICADO for e in estados),
+        'results': estados
+    }, status=status.HTTP_200_OK)
+
+
+@versiones.condicional(lambda request, tournament_id: [versiones.torneo(tournament_id)])
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@renderer_classes(proyecciones.RENDERERS)
 def mobile_tournament_detail(request, tournament_id):
     """
     GET /api/tournaments/<id>
     Detalle completo de un torneo
     """
-    torneo = get_object_or_404(Torneo, pk=tournament_id)
-    serializer = MobileTournamentSerializer(torneo)
-    
-    # Agregar información adicional
-    data = serializer.data
-    data['description'] = f"Torneo de categoría {torneo.categoria}"
-    data['maxPlayers'] = torneo.cupos_max
-    data['currentRound'] = torneo.total_rondas or 0
-    
-    return Response(data)
+    return Response(detalle_torneo(tournament_id))
+
+
+@versiones.condicional(lambda request, tournament_id: [versiones.torneo(tournament_id), versiones.JUGADORES,
+                                                      versiones.RANKING])
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes(proyecciones.RENDERERS)
+def mobile_tournament_bundle(request, tournament_id):
+    """
+    GET /api/tournaments/<id>/bundle
+    Todo lo que muestra la pantalla de un torneo en una sola respuesta:
+    detalle, partidos agrupados por fase, inscritos con su posición y tablas de grupos.
+    Cantidad fija de consultas sin importar el tamaño del torneo.
+    """
+    detalle = detalle_torneo(tournament_id)
+    fases = {}
+    for partido in proyecciones.PARTIDOS.lista(Partido.objects.filter(torneo_id=tournament_id).order_by('ronda', 'id')):
+        fases.setdefault(partido['phase'], []).append(partido)
+
+    grupos = list(Grupo.objects.filter(torneo_id=tournament_id).order_by('nombre'))
+    tablas = GrupoStanding.tablas(g.id for g in grupos)
+
+    return Response({
+        'tournament': detalle,
+        'phases': [{'phase': fase, 'matches': lista} for fase, lista in fases.items()],
+        'players': inscritos_con_posicion(tournament_id),
+        'groups': [
+            {'name': g.nombre, 'standings': [fila_posiciones(fila) for fila in tablas.get(g.id, [])]}
+            for g in grupos
+        ],
+    })
+
+
+def detalle_torneo(torneo_id):
+    """Datos del torneo para la pantalla de detalle (una consulta); 404 si no existe."""
+    data = proyecciones.TORNEO_DETALLE.uno(Torneo.objects.filter(pk=torneo_id))
+    if data is None:
+        raise Http404
+    return data
+
+
+def exigir_torneo(torneo_id, data):
+    """Una lista vacía puede deberse a un torneo inexistente: solo entonces se consulta."""
+    if not data and not Torneo.objects.filter(pk=torneo_id).exists():
+        raise Http404
+
+
+def inscritos_con_posicion(torneo_id):
+    """Inscritos del torneo con su posición en el ranking anotada (una consulta)."""
+    inscripciones = (Inscripcion.objects.filter(torneo_id=torneo_id, estado='INSCRITO')
+                     .order_by('fecha_inscripcion', 'id'))
+    return proyecciones.INSCRITOS.lista(inscripciones)
+
+
+def fila_posiciones(fila):
+    """Fila de GrupoStanding.tablas en formato de la app."""
+    jugador = fila['jugador']
+    return {
+        'playerId': str(jugador.id),
+        'name': f"{jugador.nombre} {jugador.apellido}",
+        'played': fila['PJ'],
+        'won': fila['PG'],
+        'lost': fila['PP'],
+        'setsWon': fila['SA'],
+        'setsLost': fila['SB'],
+    }
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes(proyecciones.RENDERERS)
+def mobile_sync(request):
+    """
+    GET /api/sync/?since=<token>
+    Cambios desde la sincronización anterior en una sola respuesta
+
+    Sin `since` devuelve todo (`full: true`). La respuesta trae `token`, que se envía
+    como `since` la próxima vez; `deleted` lista los ids borrados por tipo.
+    """
+    token = request.GET.get('since')
+    desde = None
+    if token:
+        desde = sincronizacion.decodificar_token(token)
+        if desde is None:
+            return Response({'success': False, 'message': 'Token de sincronización inválido'},
+                            status=status.HTTP_400_BAD_REQUEST)
+    return Response(sincronizacion.cambios(desde))
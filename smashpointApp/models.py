@@ -1,5 +1,21 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Func, OuterRef, Subquery, Sum, Value, When
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+
+def digito_verificador(cuerpo):
+    """DV módulo 11 de la parte numérica de un RUT ('0'-'9' o 'K')."""
+    factors = [2,3,4,5,6,7]
+    acc = 0
+    for i, d in enumerate(map(int, reversed(str(cuerpo)))):
+        acc += d * factors[i % len(factors)]
+    expected = 11 - (acc % 11)
+    if expected == 11:
+        return '0'
+    if expected == 10:
+        return 'K'
+    return str(expected)
 
 
 def validar_rut_chileno(value: str):
@@ -17,24 +33,45 @@ def validar_rut_chileno(value: str):
     if not cuerpo.isdigit():
         raise ValidationError('Cuerpo del RUT debe ser numérico.')
     # Calcular DV esperado
-    reversed_digits = map(int, reversed(cuerpo))
-    factors = [2,3,4,5,6,7]
-    acc = 0
-    i = 0
-    for d in reversed_digits:
-        acc += d * factors[i]
-        i = (i + 1) % len(factors)
-    expected = 11 - (acc % 11)
-    if expected == 11:
-        expected_dv = '0'
-    elif expected == 10:
-        expected_dv = 'K'
-    else:
-        expected_dv = str(expected)
+    expected_dv = digito_verificador(cuerpo)
     if dv != expected_dv:
         raise ValidationError('RUT inválido: dígito verificador incorrecto.')
 
 
+def normalizar_rut(value):
+    """Forma canónica de un RUT: solo dígitos + DV en mayúscula (12.345.678-k -> 12345678K)."""
+    if not value:
+        return ''
+    return str(value).upper().replace('.', '').replace('-', '').replace(' ', '').strip()
+
+
+def validar_ruts_chilenos(valores):
+    """Versión por lotes de validar_rut_chileno: {valor: mensaje de error o None}.
+
+    Cada forma canónica distinta se valida una sola vez, sin levantar excepciones por fila.
+    """
+    por_canonico = {}
+    resultado = {}
+    for valor in valores:
+        if valor in resultado:
+            continue
+        canonico = normalizar_rut(valor)
+        if canonico not in por_canonico:
+            if not canonico:
+                error = None
+            elif len(canonico) < 8 or len(canonico) > 9:
+                error = 'RUT debe tener 8 a 9 caracteres (sin puntos).'
+            elif not canonico[:-1].isdigit():
+                error = 'Cuerpo del RUT debe ser numérico.'
+            elif canonico[-1] != digito_verificador(canonico[:-1]):
+                error = 'RUT inválido: dígito verificador incorrecto.'
+            else:
+                error = None
+            por_canonico[canonico] = error
+        resultado[valor] = por_canonico[canonico]
+    return resultado
+
+
 # Create your models here.
 
 class Jugador(models.Model):
@@ -50,10 +87,55 @@ class Jugador(models.Model):
     rut = models.CharField(max_length=12, unique=True, null=True, blank=True, validators=[validar_rut_chileno], help_text="RUT chileno válido (ej: 12.345.678-5)")
     licencia = models.CharField(max_length=20, unique=True, null=True, blank=True)
     origen = models.CharField(max_length=80, null=True, blank=True, help_text="Ciudad/Región de procedencia")
+    # normalizar_rut(rut), mantenido en save(): las búsquedas de duplicados usan este índice único
+    rut_canonico = models.CharField(max_length=12, unique=True, null=True, blank=True, editable=False)
+    # Marca de modificación para exportaciones incrementales (snapshot?updated_since=)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Paginación keyset de /api/players (orden apellido, nombre, id)
+            models.Index(fields=['apellido', 'nombre', 'id']),
+            models.Index(fields=['categoria', 'apellido', 'nombre', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.nombre} {self.apellido}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        jugador = super().from_db(db, field_names, values)
+        leidos = dict(zip(field_names, values))
+        jugador._rut_db, jugador._rut_canonico_db = leidos.get('rut'), leidos.get('rut_canonico')
+        return jugador
+
+    def es_duplicado_heredado(self):
+        """RUT sin cambios cuyo canónico quedó en NULL (0020) porque otro jugador ya lo tenía.
+
+        Estos jugadores se pueden seguir editando; el RUT se corrige a mano.
+        """
+        canonico = normalizar_rut(self.rut)
+        return (canonico and self.pk is not None and self.rut == getattr(self, '_rut_db', None)
+                and getattr(self, '_rut_canonico_db', canonico) is None
+                and Jugador.objects.filter(rut_canonico=canonico).exclude(pk=self.pk).exists())
+
+    def sincronizar_rut_canonico(self):
+        self.rut_canonico = None if self.es_duplicado_heredado() else (normalizar_rut(self.rut) or None)
+
+    def clean(self):
+        self.sincronizar_rut_canonico()
+        if self.rut_canonico and Jugador.objects.filter(rut_canonico=self.rut_canonico).exclude(pk=self.pk).exists():
+            raise ValidationError({'rut': 'El RUT ingresado ya está registrado.'})
+
+    def save(self, *args, **kwargs):
+        self.sincronizar_rut_canonico()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            extra = {'actualizado_en', 'rut_canonico'} if 'rut' in update_fields else {'actualizado_en'}
+            kwargs['update_fields'] = set(update_fields) | extra
+        super().save(*args, **kwargs)
+        self._rut_db, self._rut_canonico_db = self.rut, self.rut_canonico
+
 
 # -------------------- TORNEOS --------------------
 class Torneo(models.Model):
@@ -80,18 +162,88 @@ class Torneo(models.Model):
     estado = models.CharField(max_length=20, choices=ESTADOS, default='ABIERTO')
     total_rondas = models.PositiveIntegerField(null=True, blank=True)
     numero_grupos = models.PositiveIntegerField(default=0, help_text="Cantidad de grupos (0 = sin fase de grupos)")
+    # Contadores desnormalizados: se mantienen con F() al crear/cancelar/promover inscripciones
+    inscritos_count = models.PositiveIntegerField(default=0, editable=False)
+    espera_count = models.PositiveIntegerField(default=0, editable=False)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
+
+    CONTADORES = {'INSCRITO': 'inscritos_count', 'ESPERA': 'espera_count'}
+
+    class Meta:
+        indexes = [
+            # Paginación keyset de /api/v2/torneos (orden -fecha, -id)
+            models.Index(fields=['fecha', 'id']),
+        ]
 
     def __str__(self):
         return self.nombre
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._cupos_max_db = instance.__dict__.get('cupos_max')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # No pisar los contadores con los valores (posiblemente viejos) en memoria
+            kwargs['update_fields'] = [f.name for f in self._meta.concrete_fields
+                                       if not f.primary_key and f.name not in self.CONTADORES.values()]
+        elif kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'actualizado_en'}
+        cupos_previos = getattr(self, '_cupos_max_db', None)
+        super().save(*args, **kwargs)
+        self._cupos_max_db = self.cupos_max
+        if cupos_previos is not None and self.cupos_max > cupos_previos:
+            Torneo.promover_espera(self.pk)
+
     def inscripciones_count(self):
-        return self.inscripcion_set.filter(estado='INSCRITO').count()
+        return self.inscritos_count
 
     def tiene_cupos(self):
-        return self.inscripciones_count() < self.cupos_max
+        return self.inscritos_count < self.cupos_max
+
+    @classmethod
+    def ajustar_contadores(cls, torneo_id, deltas):
+        """Aplica {estado: delta} a los contadores del torneo con un UPDATE atómico."""
+        cambios = {}
+        for estado, delta in deltas.items():
+            campo = cls.CONTADORES.get(estado)
+            if campo and delta:
+                cambios[campo] = cambios.get(campo, 0) + delta
+        if cambios:
+            cls.objects.filter(pk=torneo_id).update(actualizado_en=timezone.now(),
+                                                    **{c: F(c) + d for c, d in cambios.items()})
+
+    @classmethod
+    def promover_espera(cls, torneo_id, excluir=None):
+        """Pasa a INSCRITO las inscripciones en ESPERA más antiguas (FIFO) hasta llenar los cupos libres.
+
+        Lee los k ids por el índice (torneo, estado, fecha_inscripcion) y los promueve con un
+        solo UPDATE. `excluir`: id de una inscripción que no se promueve (la que se acaba de
+        pasar a ESPERA a mano). Devuelve la cantidad de promovidos.
+        """
+        with transaction.atomic():
+            torneo = (cls.objects.select_for_update()
+                      .only('estado', 'cupos_max', 'inscritos_count', 'espera_count')
+                      .filter(pk=torneo_id).first())
+            if torneo is None or torneo.estado != 'ABIERTO' or not torneo.espera_count:
+                return 0
+            libres = torneo.cupos_max - torneo.inscritos_count
+            if libres <= 0:
+                return 0
+            ids = list(Inscripcion.objects.filter(torneo_id=torneo_id, estado='ESPERA').exclude(pk=excluir)
+                       .order_by('fecha_inscripcion', 'id').values_list('id', flat=True)[:libres])
+            promovidos = Inscripcion.objects.filter(id__in=ids, estado='ESPERA').update(
+                estado='INSCRITO', actualizado_en=timezone.now())
+            cls.ajustar_contadores(torneo_id, {'ESPERA': -promovidos, 'INSCRITO': promovidos})
+            if promovidos:
+                # UPDATE masivo: no pasa por las señales que versionan el torneo
+                ContadorVersion.incrementar('torneos', ContadorVersion.de_torneo(torneo_id))
+        return promovidos
 
     def calcular_total_rondas(self):
-        inscritos = self.inscripcion_set.filter(estado='INSCRITO').count()
+        inscritos = self.inscritos_count
         r = 0
         n = 1 if inscritos == 0 else inscritos
         while n > 1:
@@ -138,21 +290,46 @@ class Inscripcion(models.Model):
     jugador = models.ForeignKey(Jugador, on_delete=models.CASCADE)
     estado = models.CharField(max_length=20, choices=ESTADOS, default='INSCRITO')
     fecha_inscripcion = models.DateTimeField(auto_now_add=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ('torneo', 'jugador')
+        indexes = [
+            # Lista de espera FIFO por torneo y contadores por estado
+            models.Index(fields=['torneo', 'estado', 'fecha_inscripcion']),
+            # Paginación keyset de /api/v2/inscripciones (orden -fecha_inscripcion, -id)
+            models.Index(fields=['fecha_inscripcion', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.jugador} -> {self.torneo} ({self.estado})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._estado_db = instance.__dict__.get('estado')
+        return instance
+
     def save(self, *args, **kwargs):
-        # Asignar estado automáticamente según cupos solo si es nuevo
-        if self.pk is None and self.torneo.estado == 'ABIERTO':
-            if self.torneo.tiene_cupos():
-                self.estado = 'INSCRITO'
+        with transaction.atomic():
+            if self._state.adding:
+                previo = None
+                # Bloquear el torneo: dos inscripciones simultáneas no pueden tomar el último cupo
+                torneo = Torneo.objects.select_for_update().only('estado', 'cupos_max', 'inscritos_count').get(pk=self.torneo_id)
+                # Asignar estado automáticamente según cupos solo si es nuevo
+                if torneo.estado == 'ABIERTO':
+                    self.estado = 'INSCRITO' if torneo.tiene_cupos() else 'ESPERA'
             else:
-                self.estado = 'ESPERA'
-        super().save(*args, **kwargs)
+                previo = getattr(self, '_estado_db', None)
+                if previo is None:
+                    previo = Inscripcion.objects.filter(pk=self.pk).values_list('estado', flat=True).first()
+            super().save(*args, **kwargs)
+            if previo != self.estado:
+                Torneo.ajustar_contadores(self.torneo_id, {previo: -1, self.estado: 1})
+                if previo == 'INSCRITO':
+                    # Una baja manual a ESPERA cede el cupo al siguiente, no vuelve a tomarlo
+                    Torneo.promover_espera(self.torneo_id, excluir=self.pk)
+        self._estado_db = self.estado
 
 
 # -------------------- PARTIDOS (Fixtures) --------------------
@@ -160,6 +337,7 @@ class Grupo(models.Model):
     torneo = models.ForeignKey(Torneo, on_delete=models.CASCADE, related_name='grupos')
     nombre = models.CharField(max_length=5)
     jugadores = models.ManyToManyField('Jugador', related_name='grupos', blank=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ('torneo','nombre')
@@ -168,31 +346,80 @@ class Grupo(models.Model):
         return f"{self.torneo.nombre} - Grupo {self.nombre}"
 
     def estadisticas(self):
-        """Devuelve dict por jugador: PJ, PG, PP, SA, SB (sets a favor/en contra)."""
-        data = {}
-        for j in self.jugadores.all():
-            data[j.id] = {'jugador': j, 'PJ':0,'PG':0,'PP':0,'SA':0,'SB':0}
-        from .models import Partido  # local import to avoid circular
-        for p in Partido.objects.filter(torneo=self.torneo, etapa='GRUPOS', grupo=self.nombre):
-            if p.sets_a is not None and p.sets_b is not None:
-                # Jugador A stats
-                da = data[p.jugador_a_id]
-                db = data[p.jugador_b_id]
-                da['PJ'] += 1
-                db['PJ'] += 1
-                da['SA'] += p.sets_a
-                da['SB'] += p.sets_b
-                db['SA'] += p.sets_b
-                db['SB'] += p.sets_a
-                if p.ganador_id == p.jugador_a_id:
-                    da['PG'] += 1
-                    db['PP'] += 1
-                elif p.ganador_id == p.jugador_b_id:
-                    db['PG'] += 1
-                    da['PP'] += 1
-        # Ordenar por PG, diferencia sets SA-SB
-        orden = sorted(data.values(), key=lambda d: (d['PG'], d['SA']-d['SB']), reverse=True)
-        return orden
+        """Devuelve la tabla del grupo (PJ, PG, PP, SA, SB por jugador) leída de GrupoStanding."""
+        return GrupoStanding.tablas([self.pk]).get(self.pk, [])
+
+
+class GrupoStanding(models.Model):
+    """Fila persistida de la tabla de posiciones de un grupo.
+
+    Se actualiza con incrementos F() en la misma transacción en que se guarda (o corrige)
+    el resultado de un Partido de GRUPOS, evitando recalcular la tabla en cada lectura.
+    """
+    grupo = models.ForeignKey(Grupo, on_delete=models.CASCADE, related_name='standings')
+    jugador = models.ForeignKey(Jugador, on_delete=models.CASCADE, related_name='standings')
+    pj = models.IntegerField(default=0)
+    pg = models.IntegerField(default=0)
+    pp = models.IntegerField(default=0)
+    sa = models.IntegerField(default=0)
+    sb = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('grupo', 'jugador')
+        indexes = [
+            models.Index(fields=['grupo', '-pg']),
+        ]
+
+    def __str__(self):
+        return f"{self.grupo_id} - {self.jugador_id}: {self.pg} PG"
+
+    def como_fila(self):
+        return {'jugador': self.jugador, 'PJ': self.pj, 'PG': self.pg, 'PP': self.pp, 'SA': self.sa, 'SB': self.sb}
+
+    @classmethod
+    def tablas(cls, grupo_ids):
+        """Una consulta para varias tablas: {grupo_id: [fila, ...]} ordenadas por PG y diferencia de sets."""
+        tablas = {}
+        qs = (cls.objects.filter(grupo_id__in=list(grupo_ids)).select_related('jugador')
+              .annotate(dif=F('sa') - F('sb')).order_by('grupo_id', '-pg', '-dif', 'jugador_id'))
+        for st in qs:
+            tablas.setdefault(st.grupo_id, []).append(st.como_fila())
+        return tablas
+
+    @staticmethod
+    def contribucion(estado):
+        """Aporte de un partido (snapshot de Partido.estado_grupo) a la tabla: {jugador_id: (pj, pg, pp, sa, sb)}."""
+        if not estado:
+            return {}
+        torneo_id, etapa, grupo, a, b, sets_a, sets_b, ganador_id = estado
+        if etapa != 'GRUPOS' or not grupo or sets_a is None or sets_b is None:
+            return {}
+        return {
+            a: (1, int(ganador_id == a), int(ganador_id == b), sets_a, sets_b),
+            b: (1, int(ganador_id == b), int(ganador_id == a), sets_b, sets_a),
+        }
+
+    @classmethod
+    def aplicar_cambios(cls, cambios):
+        """Aplica los deltas de una lista de (estado_previo, estado_actual) de partidos de grupos.
+
+        Los jugadores del mismo grupo con idéntico delta se actualizan en un solo UPDATE.
+        """
+        deltas = {}
+        for previo, actual in cambios:
+            for signo, estado in ((-1, previo), (1, actual)):
+                for jid, valores in cls.contribucion(estado).items():
+                    clave = (estado[0], estado[2], jid)
+                    acumulado = deltas.get(clave, (0, 0, 0, 0, 0))
+                    deltas[clave] = tuple(x + signo * v for x, v in zip(acumulado, valores))
+        lotes = {}
+        for (torneo_id, grupo, jid), delta in deltas.items():
+            if any(delta):
+                lotes.setdefault((torneo_id, grupo, delta), []).append(jid)
+        for (torneo_id, grupo, (pj, pg, pp, sa, sb)), jugadores in lotes.items():
+            cls.objects.filter(grupo__torneo_id=torneo_id, grupo__nombre=grupo, jugador_id__in=jugadores).update(
+                pj=F('pj') + pj, pg=F('pg') + pg, pp=F('pp') + pp, sa=F('sa') + sa, sb=F('sb') + sb,
+            )
 
 class Partido(models.Model):
     ETAPAS = [
@@ -214,10 +441,51 @@ class Partido(models.Model):
     detalle_sets = models.CharField(max_length=120, null=True, blank=True, help_text="Formato: 11-7,8-11,11-9")
     best_of = models.PositiveIntegerField(default=3, help_text="Cantidad máxima de sets (3 ó 5). Se gana mayoría.")
     ganador = models.ForeignKey(Jugador, on_delete=models.SET_NULL, null=True, blank=True, related_name='partidos_ganados')
+    # Programación (ver calendario.programar): turno 1..N y mesa dentro del turno
+    turno = models.PositiveIntegerField(null=True, blank=True)
+    mesa = models.PositiveIntegerField(null=True, blank=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Partidos de un torneo en orden de ronda: /api/v2/partidos?torneo= y su keyset
+            models.Index(fields=['torneo', 'ronda', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.torneo} R{self.ronda}: {self.jugador_a} vs {self.jugador_b}"
 
+    CAMPOS_GRUPO = ('torneo_id', 'etapa', 'grupo', 'jugador_a_id', 'jugador_b_id', 'sets_a', 'sets_b', 'ganador_id')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(f in instance.__dict__ for f in cls.CAMPOS_GRUPO):
+            instance._estado_grupo_db = instance.estado_grupo()
+        return instance
+
+    def estado_grupo(self):
+        """Snapshot de los campos que afectan la tabla de posiciones del grupo."""
+        return tuple(getattr(self, f) for f in self.CAMPOS_GRUPO)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            previo = None
+        elif hasattr(self, '_estado_grupo_db'):
+            previo = self._estado_grupo_db
+        else:
+            # Instancia cargada con campos diferidos: leer el estado guardado
+            previo = Partido.objects.filter(pk=self.pk).values_list(*self.CAMPOS_GRUPO).first()
+        actual = self.estado_grupo()
+        if GrupoStanding.contribucion(previo) == GrupoStanding.contribucion(actual) and \
+                (not previo or previo[:3] == actual[:3]):
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                GrupoStanding.aplicar_cambios([(previo, actual)])
+        self._estado_grupo_db = actual
+
     def calcular_ganador(self):
         # Prioridad a sets si existen
         if self.best_of > 1 and (self.sets_a is not None and self.sets_b is not None):
@@ -237,25 +505,24 @@ class Partido(models.Model):
                 self.ganador = None
             self.save()
 
-        # Puntos ranking según etapa
-        if self.ganador:
-            if self.etapa == 'GRUPOS':
-                rk_g, _ = Ranking.objects.get_or_create(jugador=self.ganador)
-                rk_g.agregar_puntos(2)
-                perdedor = self.jugador_a if self.ganador == self.jugador_b else self.jugador_b
-                rk_p, _ = Ranking.objects.get_or_create(jugador=perdedor)
-                rk_p.agregar_puntos(1)
-            elif self.etapa in ['ELIMINACION','FINAL']:
-                base = 3
-                bonus = self.ronda
-                puntos = base + bonus
-                if self.etapa == 'FINAL':
-                    puntos += 5
-                rk_g, _ = Ranking.objects.get_or_create(jugador=self.ganador)
-                rk_g.agregar_puntos(puntos)
-                perdedor = self.jugador_a if self.ganador == self.jugador_b else self.jugador_b
-                rk_p, _ = Ranking.objects.get_or_create(jugador=perdedor)
-                rk_p.agregar_puntos(1)
+        # Puntos ranking según etapa (ledger idempotente por partido)
+        RankingEvent.registrar_partidos([self])
+
+    def puntos_ranking(self):
+        """Devuelve {jugador_id: puntos} que otorga este partido según su etapa (vacío si no hay ganador)."""
+        if not self.ganador_id:
+            return {}
+        perdedor_id = self.jugador_a_id if self.ganador_id == self.jugador_b_id else self.jugador_b_id
+        if self.etapa == 'GRUPOS':
+            return {self.ganador_id: 2, perdedor_id: 1}
+        if self.etapa in ['ELIMINACION','FINAL']:
+            base = 3
+            bonus = self.ronda
+            puntos = base + bonus
+            if self.etapa == 'FINAL':
+                puntos += 5
+            return {self.ganador_id: puntos, perdedor_id: 1}
+        return {}
 
     def parsear_detalle_sets(self):
         """Convierte detalle_sets en sets ganados para cada jugador, asumiendo formato '11-7,8-11,...'."""
@@ -298,11 +565,265 @@ class Partido(models.Model):
 class Ranking(models.Model):
     jugador = models.OneToOneField(Jugador, on_delete=models.CASCADE)
     puntos = models.IntegerField(default=0)
-    actualizado_en = models.DateTimeField(auto_now=True)
+    actualizado_en = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Tabla de ranking y keyset de /api/v2/ranking (orden -puntos, id)
+            models.Index(fields=['-puntos', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.jugador} - {self.puntos} pts"
 
+    @staticmethod
+    def expresion_posicion(ref_puntos):
+        """Posición en el ranking (1 + jugadores con más puntos) como subconsulta correlacionada.
+
+        `ref_puntos` es la ruta a los puntos desde el modelo anotado (p. ej. 'jugador__ranking__puntos');
+        sin fila de Ranking la posición es 0. Se resuelve en la misma consulta que la lista.
+        """
+        mayores = (Ranking.objects.filter(puntos__gt=OuterRef(ref_puntos)).order_by()
+                   .annotate(n=Func(F('pk'), function='COUNT')).values('n'))
+        return Case(
+            When(**{f'{ref_puntos}__isnull': True}, then=Value(0)),
+            default=Subquery(mayores, output_field=models.IntegerField()) + 1,
+            output_field=models.IntegerField(),
+        )
+
     def agregar_puntos(self, pts):
-        self.puntos += pts
-        self.save()
\ No newline at end of file
+        """Ajuste manual: registra el evento en el ledger e incrementa el total de forma atómica."""
+        with transaction.atomic():
+            RankingEvent.objects.create(jugador_id=self.jugador_id, etapa='AJUSTE', puntos=pts)
+            Ranking.objects.filter(pk=self.pk).update(puntos=F('puntos') + pts, actualizado_en=timezone.now())
+            ContadorVersion.incrementar('ranking')
+        self.refresh_from_db(fields=['puntos', 'actualizado_en'])
+
+    @staticmethod
+    def incrementar(deltas):
+        """Aplica {jugador_id: delta} con un único UPDATE atómico (F()), creando filas faltantes."""
+        deltas = {jid: pts for jid, pts in deltas.items() if pts}
+        if not deltas:
+            return
+        Ranking.objects.bulk_create([Ranking(jugador_id=jid) for jid in deltas], ignore_conflicts=True)
+        Ranking.objects.filter(jugador_id__in=deltas).update(
+            puntos=F('puntos') + Case(
+                *[When(jugador_id=jid, then=Value(pts)) for jid, pts in deltas.items()],
+                default=Value(0),
+                output_field=models.IntegerField(),
+            ),
+            actualizado_en=timezone.now(),
+        )
+        ContadorVersion.incrementar('ranking')
+
+
+class RankingEvent(models.Model):
+    """Ledger append-only de puntos de ranking. Ranking.puntos es la suma materializada de estos eventos."""
+    ETAPAS = Partido.ETAPAS + [
+        ('AJUSTE', 'Ajuste manual'),
+        ('SALDO_INICIAL', 'Saldo inicial'),
+    ]
+    jugador = models.ForeignKey(Jugador, on_delete=models.CASCADE, related_name='eventos_ranking')
+    partido = models.ForeignKey(Partido, on_delete=models.SET_NULL, null=True, blank=True, related_name='eventos_ranking')
+    etapa = models.CharField(max_length=15, choices=ETAPAS)
+    puntos = models.IntegerField()
+    creado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['jugador', 'creado_en']),
+        ]
+
+    def __str__(self):
+        return f"{self.jugador_id} {self.puntos:+d} ({self.etapa})"
+
+    @classmethod
+    def registrar_partidos(cls, partidos):
+        """Sincroniza el ledger con el resultado actual de los partidos.
+
+        Compara los puntos ya registrados por partido con los que corresponden ahora y escribe
+        solo la diferencia (eventos compensatorios en correcciones), en un único bulk insert.
+        Los totales de Ranking se actualizan con F() en la misma transacción. Las filas de los
+        partidos se bloquean antes de leer el ledger: dos correcciones simultáneas del mismo
+        partido no pueden calcular la diferencia sobre los mismos eventos previos.
+        """
+        partidos = [p for p in partidos if p.pk]
+        if not partidos:
+            return
+        with transaction.atomic():
+            # Orden por pk: transacciones con partidos en común se bloquean sin deadlock
+            list(Partido.objects.select_for_update().filter(pk__in=[p.pk for p in partidos])
+                 .order_by('pk').values_list('pk', flat=True))
+            previos = {}
+            registrados = (cls.objects.filter(partido__in=partidos)
+                           .values('partido_id', 'jugador_id').annotate(total=Sum('puntos')))
+            for r in registrados:
+                previos[(r['partido_id'], r['jugador_id'])] = r['total']
+            eventos = []
+            deltas = {}
+            for p in partidos:
+                esperados = p.puntos_ranking()
+                jugadores = set(esperados) | {jid for (pid, jid) in previos if pid == p.pk}
+                for jid in jugadores:
+                    delta = esperados.get(jid, 0) - previos.get((p.pk, jid), 0)
+                    if delta:
+                        eventos.append(cls(jugador_id=jid, partido_id=p.pk, etapa=p.etapa, puntos=delta))
+                        deltas[jid] = deltas.get(jid, 0) + delta
+            if eventos:
+                cls.objects.bulk_create(eventos)
+                Ranking.incrementar(deltas)
+
+    @classmethod
+    def reconstruir_totales(cls):
+        """Recalcula todos los Ranking.puntos desde el ledger en una pasada basada en conjuntos."""
+        from django.db.models import OuterRef, Subquery
+        from django.db.models.functions import Coalesce
+        with transaction.atomic():
+            con_eventos = cls.objects.values_list('jugador_id', flat=True).distinct()
+            Ranking.objects.bulk_create(
+                [Ranking(jugador_id=jid) for jid in con_eventos.exclude(jugador__ranking__isnull=False)],
+                ignore_conflicts=True,
+            )
+            suma = (cls.objects.filter(jugador_id=OuterRef('jugador_id'))
+                    .order_by().values('jugador_id').annotate(total=Sum('puntos')).values('total'))
+            actualizados = Ranking.objects.update(puntos=Coalesce(Subquery(suma), Value(0)), actualizado_en=timezone.now())
+            ContadorVersion.incrementar('ranking')
+            return actualizados
+
+# -------------------- TRABAJOS EN SEGUNDO PLANO --------------------
+class TrabajoImportacion(models.Model):
+    """Importación encolada que procesa el comando `procesar_trabajos` fuera del request.
+
+    La propia tabla hace de cola: un worker reclama un trabajo PENDIENTE con un UPDATE
+    condicional y va guardando el avance para que la interfaz lo consulte.
+    """
+    TIPOS = [
+        ('JUGADORES_EXCEL', 'Jugadores desde Excel'),
+        ('JUGADORES_CSV', 'Jugadores desde CSV'),
+    ]
+    ESTADOS = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_CURSO', 'En curso'),
+        ('COMPLETADO', 'Completado'),
+        ('ERROR', 'Error'),
+    ]
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    estado = models.CharField(max_length=12, choices=ESTADOS, default='PENDIENTE')
+    archivo = models.FileField(upload_to='trabajos/%Y/%m/')
+    usuario = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
+    filas_procesadas = models.PositiveIntegerField(default=0)
+    creados = models.PositiveIntegerField(default=0)
+    actualizados = models.PositiveIntegerField(default=0)
+    rechazados = models.PositiveIntegerField(default=0)
+    reporte = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, default='')
+    creado_en = models.DateTimeField(auto_now_add=True)
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    # Lo renueva el worker con cada avance; sin latido reciente el trabajo se da por abandonado
+    latido_en = models.DateTimeField(null=True, blank=True)
+    terminado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'creado_en']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.pk} ({self.estado})"
+
+    def como_dict(self):
+        return {
+            'id': self.pk,
+            'tipo': self.tipo,
+            'estado': self.estado,
+            'filas_procesadas': self.filas_procesadas,
+            'creados': self.creados,
+            'actualizados': self.actualizados,
+            'rechazados': self.rechazados,
+            'reporte': self.reporte,
+            'error': self.error,
+            'terminado': self.estado in ('COMPLETADO', 'ERROR'),
+        }
+
+
+# -------------------- SINCRONIZACIÓN --------------------
+class Eliminacion(models.Model):
+    """Tombstone de una fila borrada: /api/sync/ lo informa a los clientes que ya la tenían."""
+    MODELOS = [
+        ('torneo', 'Torneo'),
+        ('jugador', 'Jugador'),
+        ('partido', 'Partido'),
+        ('inscripcion', 'Inscripción'),
+    ]
+    modelo = models.CharField(max_length=20, choices=MODELOS)
+    objeto_id = models.PositiveBigIntegerField()
+    eliminado_en = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['eliminado_en', 'modelo']),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id} eliminado"
+
+
+class EnvioResultado(models.Model):
+    """Resultado recibido desde una tablet, registrado por la clave de idempotencia del cliente.
+
+    Reenviar la misma clave (p. ej. tras perder la respuesta) no vuelve a aplicar el resultado.
+    """
+    clave = models.CharField(max_length=64, unique=True)
+    partido = models.ForeignKey(Partido, on_delete=models.CASCADE, related_name='envios')
+    ganador = models.CharField(max_length=100)
+    marcador = models.CharField(max_length=20)
+    recibido_en = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.clave} -> partido #{self.partido_id}"
+
+    def coincide(self, partido_id, ganador, marcador):
+        return (self.partido_id, self.ganador, self.marcador) == (partido_id, ganador, marcador)
+
+
+# -------------------- VERSIONES --------------------
+class ContadorVersion(models.Model):
+    """Número de versión por conjunto de datos (p. ej. 'ranking').
+
+    Se incrementa en la misma transacción que modifica los datos, de modo que cachés y
+    artefactos generados pueden usar (nombre, valor) como clave sin invalidación explícita.
+    """
+    nombre = models.CharField(max_length=40, unique=True)
+    valor = models.PositiveBigIntegerField(default=0)
+    # Fecha del último incremento: Last-Modified de las respuestas condicionales
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nombre} v{self.valor}"
+
+    @classmethod
+    def actual(cls, nombre):
+        return cls.objects.filter(nombre=nombre).values_list('valor', flat=True).first() or 0
+
+    @staticmethod
+    def de_torneo(torneo_id):
+        """Contador de todo lo que cuelga de un torneo (partidos, inscripciones, el torneo mismo)."""
+        return f'torneo:{torneo_id}'
+
+    @classmethod
+    def varios(cls, nombres):
+        """{nombre: (valor, actualizado_en)} en una consulta; (0, None) para los que no existen."""
+        encontrados = {n: (v, f) for n, v, f in
+                       cls.objects.filter(nombre__in=nombres).values_list('nombre', 'valor', 'actualizado_en')}
+        return {n: encontrados.get(n, (0, None)) for n in nombres}
+
+    @classmethod
+    def incrementar(cls, *nombres):
+        """Sube en 1 la versión de cada nombre con un UPDATE atómico (crea las filas que falten)."""
+        ahora = timezone.now()
+        actualizados = cls.objects.filter(nombre__in=nombres).update(valor=F('valor') + 1, actualizado_en=ahora)
+        if actualizados < len(set(nombres)):
+            cls.objects.bulk_create([cls(nombre=n) for n in set(nombres)], ignore_conflicts=True)
+            existentes = set(cls.objects.filter(nombre__in=nombres, valor=0).values_list('nombre', flat=True))
+            if existentes:
+                cls.objects.filter(nombre__in=existentes).update(valor=F('valor') + 1, actualizado_en=ahora)
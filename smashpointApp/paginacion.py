@@ -0,0 +1,125 @@
+"""
+Paginación keyset (seek) para endpoints de lista.
+El cursor codifica los valores de orden del último elemento entregado, de modo que la
+página siguiente es un WHERE sobre un índice en lugar de un OFFSET creciente.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def codificar_cursor(valores):
+    return base64.urlsafe_b64encode(json.dumps(valores, default=str).encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, cantidad):
+    """Devuelve la lista de valores del cursor o None si es inválido."""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        return None
+    return valores
+
+
+def nombre_campo(campo):
+    return campo.lstrip('-')
+
+
+def filtro_posterior(campos, valores):
+    """Q para las filas posteriores a (v1, v2, ...) en el orden de `campos`, expandido para cualquier motor.
+
+    Un campo con prefijo '-' es descendente: para él "posterior" significa menor.
+    """
+    condicion = Q()
+    for i, campo in enumerate(campos):
+        iguales = {nombre_campo(c): v for c, v in zip(campos[:i], valores[:i])}
+        comparacion = 'lt' if campo.startswith('-') else 'gt'
+        condicion |= Q(**iguales, **{f'{nombre_campo(campo)}__{comparacion}': valores[i]})
+    return condicion
+
+
+def limite_solicitado(request, defecto, maximo):
+    try:
+        limite = int(request.GET.get('limit', defecto))
+    except (TypeError, ValueError):
+        limite = defecto
+    return max(1, min(limite, maximo))
+
+
+def paginar_keyset(request, queryset, campos, defecto=100, maximo=500):
+    """Aplica ?cursor= y ?limit= a un queryset ordenado por `campos` (el último debe ser único;
+    prefijo '-' para orden descendente).
+
+    Devuelve (elementos, cursor_siguiente) donde cursor_siguiente es None en la última página.
+    """
+    queryset = queryset.order_by(*campos)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        valores = decodificar_cursor(cursor, len(campos))
+        if valores is not None:
+            queryset = queryset.filter(filtro_posterior(campos, valores))
+    limite = limite_solicitado(request, defecto, maximo)
+    elementos = list(queryset[:limite + 1])
+    siguiente = None
+    if len(elementos) > limite:
+        elementos = elementos[:limite]
+        ultimo = elementos[-1]
+        # Acepta instancias o filas de values()
+        leer = ultimo.get if isinstance(ultimo, dict) else lambda c: getattr(ultimo, c)
+        siguiente = codificar_cursor([leer(nombre_campo(c)) for c in campos])
+    return elementos, siguiente
+
+
+def agregar_enlace_siguiente(request, response, siguiente):
+    """Expone el cursor siguiente en cabeceras, manteniendo el cuerpo como lista JSON."""
+    if siguiente:
+        params = request.GET.copy()
+        params['cursor'] = siguiente
+        url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+        response['X-Next-Cursor'] = siguiente
+        response['Link'] = f'<{url}>; rel="next"'
+    return response
+
+
+class PaginacionKeyset(BasePagination):
+    """Paginación keyset para los ViewSets de DRF.
+
+    Cada vista declara `orden_keyset` (campos del ORDER BY, el último único) y el cuerpo
+    es {"next": url o null, "results": [...]}. ?limit= elige el tamaño de página hasta
+    `maximo`; no hay número de página ni total, así que ninguna página cuesta un OFFSET
+    o un COUNT.
+    """
+    defecto = api_settings.PAGE_SIZE or 10
+    maximo = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        campos = getattr(view, 'orden_keyset', ('id',))
+        elementos, self.siguiente = paginar_keyset(request, queryset, campos, self.defecto, self.maximo)
+        self.request = request
+        return elementos
+
+    def get_next_link(self):
+        if not self.siguiente:
+            return None
+        params = self.request.query_params.copy()
+        params['cursor'] = self.siguiente
+        return self.request.build_absolute_uri(f'{self.request.path}?{params.urlencode()}')
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
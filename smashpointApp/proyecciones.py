@@ -0,0 +1,130 @@
+"""
+Proyecciones de solo lectura para los endpoints móviles.
+Cada proyección pide a la base solo las columnas que usa (values()) y arma el dict final
+en camelCase directamente desde la fila: no instancia modelos ni pasa por
+ModelSerializer.to_representation. Como las claves ya vienen en camelCase, las vistas
+responden con JSONRenderer y se evitan la pasada recursiva de CamelCaseJSONRenderer.
+El JSON resultante es idéntico byte a byte al de los serializers de mobile_serializers.py
+(ver TestProyeccionesContrato).
+"""
+from django.db.models.functions import Coalesce
+from djangorestframework_camel_case.render import CamelCaseBrowsableAPIRenderer
+from rest_framework.renderers import JSONRenderer
+
+from .models import Ranking
+
+# Las claves ya están en camelCase: JSON sin camelize; el navegable se mantiene para depurar
+RENDERERS = [JSONRenderer, CamelCaseBrowsableAPIRenderer]
+
+FASES = {1: 'Final', 2: 'Semifinal', 3: 'Cuartos', 4: 'Octavos'}
+
+
+class Proyeccion:
+    """Columnas/anotaciones a leer con values() y función que arma el dict final de una fila."""
+
+    def __init__(self, campos, construir, **anotaciones):
+        self.campos = campos
+        self.construir = construir
+        self.anotaciones = anotaciones
+
+    def filas(self, queryset):
+        return queryset.values(*self.campos, **self.anotaciones)
+
+    def construir_lista(self, filas):
+        construir = self.construir
+        return [construir(fila) for fila in filas]
+
+    def lista(self, queryset):
+        return self.construir_lista(self.filas(queryset))
+
+    def uno(self, queryset):
+        """Dict del primer elemento o None."""
+        fila = self.filas(queryset).first()
+        return None if fila is None else self.construir(fila)
+
+
+def _torneo(fila):
+    return {
+        'id': str(fila['id']),
+        'name': fila['nombre'],
+        'date': str(fila['fecha']) if fila['fecha'] else 'Fecha Pendiente',
+        'location': fila['direccion'],
+        'status': fila['estado'],
+        'registeredCount': fila['inscritos_count'],
+    }
+
+
+def _torneo_detalle(fila):
+    data = _torneo(fila)
+    data['description'] = f"Torneo de categoría {fila['categoria']}"
+    data['maxPlayers'] = fila['cupos_max']
+    data['currentRound'] = fila['total_rondas'] or 0
+    return data
+
+
+def _jugador(fila):
+    return {
+        'id': str(fila['id']),
+        'name': f"{fila['nombre']} {fila['apellido']}",
+        'category': fila['categoria'],
+        'points': fila['puntos'],
+        'club': fila['origen'],
+    }
+
+
+def _partido(fila):
+    sets_a, sets_b = fila['sets_a'], fila['sets_b']
+    if fila['ganador_id'] is not None:
+        status, time, score = 'finished', 'Finalizado', f"{sets_a or 0}-{sets_b or 0}"
+    elif sets_a is not None or sets_b is not None:
+        status, time, score = 'live', 'En Juego', f"{sets_a or 0}-{sets_b or 0}"
+    else:
+        status, time, score = 'pending', 'Pendiente', "0-0"
+    ronda = fila['ronda']
+    return {
+        'id': str(fila['id']),
+        'tournamentId': str(fila['torneo_id']),
+        'p1': fila['jugador_a__nombre'] if fila['jugador_a_id'] is not None else "BYE",
+        'p2': fila['jugador_b__nombre'] if fila['jugador_b_id'] is not None else "BYE",
+        'phase': FASES.get(ronda, f'Ronda {ronda}'),
+        'status': status,
+        'time': time,
+        'score': score,
+    }
+
+
+def _inscrito(fila):
+    return {
+        'id': str(fila['jugador_id']),
+        'name': fila['jugador__nombre'],
+        'club': fila['jugador__origen'],
+        'rank': fila['posicion'],
+    }
+
+
+def _resultado(fila):
+    fecha = fila['torneo__fecha']
+    return {
+        'id': str(fila['id']),
+        'tournament': fila['torneo__nombre'],
+        'p1': fila['jugador1__nombre'],
+        'p2': fila['jugador2__nombre'],
+        'score': f"{fila['marcador_j1']} - {fila['marcador_j2']}",
+        'date': fecha.strftime('%d/%m/%Y') if fecha else "",
+    }
+
+
+CAMPOS_TORNEO = ('id', 'nombre', 'fecha', 'direccion', 'estado', 'inscritos_count')
+
+TORNEOS = Proyeccion(CAMPOS_TORNEO, _torneo)
+TORNEO_DETALLE = Proyeccion(CAMPOS_TORNEO + ('categoria', 'cupos_max', 'total_rondas'), _torneo_detalle)
+# Incluye apellido/nombre/id: son las columnas del keyset de /api/players
+JUGADORES = Proyeccion(('id', 'nombre', 'apellido', 'categoria', 'origen'), _jugador,
+                       puntos=Coalesce('ranking__puntos', 0))
+PARTIDOS = Proyeccion(('id', 'torneo_id', 'ronda', 'sets_a', 'sets_b', 'ganador_id',
+                       'jugador_a_id', 'jugador_a__nombre', 'jugador_b_id', 'jugador_b__nombre'), _partido)
+# Sobre Inscripcion: inscritos de un torneo con su posición en el ranking
+INSCRITOS = Proyeccion(('jugador_id', 'jugador__nombre', 'jugador__origen'), _inscrito,
+                       posicion=Ranking.expresion_posicion('jugador__ranking__puntos'))
+RESULTADOS = Proyeccion(('id', 'torneo__nombre', 'torneo__fecha', 'jugador1__nombre', 'jugador2__nombre',
+                         'marcador_j1', 'marcador_j2'), _resultado)
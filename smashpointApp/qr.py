@@ -0,0 +1,88 @@
+"""
+Códigos QR con caché en memoria y en disco.
+La imagen depende solo del texto codificado (la URL pública del jugador), así que se
+guarda bajo el hash de ese texto: sirve como nombre de archivo y como ETag.
+Este módulo no importa modelos para que los procesos del pool lo carguen sin Django.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import qrcode
+except ImportError:
+    qrcode = None
+
+# Por debajo de esta cantidad de QR faltantes no compensa levantar procesos
+MINIMO_PARALELO = 32
+
+
+def clave(texto):
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def codificar_png(texto):
+    """PNG del QR (función pura, apta para ProcessPoolExecutor)."""
+    img = qrcode.make(texto)
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def directorio():
+    from django.conf import settings
+    ruta = Path(getattr(settings, 'ARTEFACTOS_ROOT', Path(settings.MEDIA_ROOT) / 'artefactos')) / 'qr'
+    ruta.mkdir(parents=True, exist_ok=True)
+    return ruta
+
+
+def leer_disco(texto):
+    try:
+        return (directorio() / f'{clave(texto)}.png').read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def guardar_disco(texto, png):
+    destino = directorio() / f'{clave(texto)}.png'
+    fd, temporal = tempfile.mkstemp(dir=destino.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as archivo:
+        archivo.write(png)
+    os.replace(temporal, destino)
+
+
+@lru_cache(maxsize=2048)
+def png(texto):
+    """PNG desde memoria, luego disco; si falta se codifica y se guarda en ambos."""
+    datos = leer_disco(texto)
+    if datos is None:
+        datos = codificar_png(texto)
+        guardar_disco(texto, datos)
+    return datos
+
+
+def png_lote(textos, procesos=None):
+    """{texto: png} para muchos textos; los faltantes en caché se codifican en paralelo."""
+    resultado = {}
+    faltantes = []
+    for texto in textos:
+        datos = leer_disco(texto)
+        if datos is None:
+            faltantes.append(texto)
+        else:
+            resultado[texto] = datos
+    if len(faltantes) >= MINIMO_PARALELO:
+        procesos = procesos or min(os.cpu_count() or 1, 8)
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            codificados = pool.map(codificar_png, faltantes, chunksize=max(1, len(faltantes) // (procesos * 4)))
+            for texto, datos in zip(faltantes, codificados):
+                guardar_disco(texto, datos)
+                resultado[texto] = datos
+    else:
+        for texto in faltantes:
+            resultado[texto] = png(texto)
+    return resultado
@@ -1,33 +1,57 @@
+from djangorestframework_camel_case.util import camel_to_underscore
 from rest_framework import serializers
 from .models import Jugador, Torneo, Resultado, Ranking, Partido, Inscripcion
 
-class JugadorSerializer(serializers.ModelSerializer):
+
+class CamposDinamicosMixin:
+    """?fields=id,marcadorA restringe los campos de la respuesta (sparse fieldsets).
+
+    Acepta nombres en camelCase o snake_case; los desconocidos se ignoran. Solo aplica al
+    serializer de nivel superior (los anidados se construyen sin request en el contexto) y
+    solo en GET, para no quitar campos a la validación de una escritura.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        pedidos = request.query_params.get('fields')
+        if not pedidos:
+            return
+        campos = {camel_to_underscore(c.strip()) for c in pedidos.split(',')} & set(self.fields)
+        if campos:
+            for nombre in set(self.fields) - campos:
+                self.fields.pop(nombre)
+
+
+class JugadorSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Jugador
         fields = ['id','nombre','apellido','categoria','licencia']
 
-class TorneoSerializer(serializers.ModelSerializer):
+class TorneoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Torneo
         fields = ['id','nombre','direccion','fecha','categoria','cupos_max','estado','total_rondas']
 
-class ResultadoSerializer(serializers.ModelSerializer):
+class ResultadoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Resultado
         fields = ['id','torneo','jugador1','jugador2','marcador_j1','marcador_j2']
 
-class RankingSerializer(serializers.ModelSerializer):
+class RankingSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     jugador = JugadorSerializer(read_only=True)
     class Meta:
         model = Ranking
         fields = ['id','jugador','puntos']
 
-class PartidoSerializer(serializers.ModelSerializer):
+class PartidoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Partido
-        fields = ['id','torneo','ronda','jugador_a','jugador_b','marcador_a','marcador_b','ganador']
+        fields = ['id','torneo','ronda','etapa','grupo','jugador_a','jugador_b','marcador_a','marcador_b','sets_a','sets_b','ganador']
 
-class InscripcionSerializer(serializers.ModelSerializer):
+class InscripcionSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Inscripcion
         fields = ['id','torneo','jugador','estado','fecha_inscripcion']
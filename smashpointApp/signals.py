@@ -0,0 +1,116 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import versiones
+from .models import (ContadorVersion, Eliminacion, Grupo, GrupoStanding, Inscripcion, Jugador, Partido, Ranking,
+                     Resultado, Torneo)
+
+
+@receiver(m2m_changed, sender=Grupo.jugadores.through)
+def sincronizar_standings_grupo(sender, instance, action, reverse, pk_set, **kwargs):
+    """Mantiene una fila de GrupoStanding por cada jugador del grupo."""
+    if reverse:
+        # Cambios desde Jugador.grupos: pk_set son grupos
+        grupos, jugadores = pk_set or set(), {instance.pk}
+    else:
+        grupos, jugadores = {instance.pk}, pk_set or set()
+    if action == 'post_add':
+        GrupoStanding.objects.bulk_create(
+            [GrupoStanding(grupo_id=g, jugador_id=j) for g in grupos for j in jugadores],
+            ignore_conflicts=True,
+        )
+    elif action == 'post_remove':
+        GrupoStanding.objects.filter(grupo_id__in=grupos, jugador_id__in=jugadores).delete()
+    elif action == 'pre_clear':
+        filtro = {'jugador_id': instance.pk} if reverse else {'grupo_id': instance.pk}
+        GrupoStanding.objects.filter(**filtro).delete()
+
+
+@receiver(m2m_changed, sender=Grupo.jugadores.through)
+def marcar_grupo_membresia(sender, instance, action, reverse, pk_set, **kwargs):
+    """Un cambio de jugadores marca el grupo: el snapshot incremental exporta sus membresías por él."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        grupos = {instance.pk}
+    elif action == 'pre_clear':
+        # Antes de vaciar: los grupos del jugador todavía se pueden consultar
+        grupos = set(instance.grupos.values_list('pk', flat=True))
+    else:
+        grupos = pk_set or set()
+    if grupos:
+        Grupo.objects.filter(pk__in=grupos).update(actualizado_en=timezone.now())
+
+
+@receiver(post_delete, sender=Partido)
+def descontar_partido_grupo(sender, instance, **kwargs):
+    """Al borrar un partido de grupos con resultado se descuenta su aporte a la tabla."""
+    previo = getattr(instance, '_estado_grupo_db', None)
+    if GrupoStanding.contribucion(previo):
+        GrupoStanding.aplicar_cambios([(previo, None)])
+
+
+@receiver(pre_delete, sender=Inscripcion)
+def leer_estado_inscripcion(sender, instance, **kwargs):
+    """La instancia puede estar desactualizada (p. ej. promovida desde la lista de espera)."""
+    actual = Inscripcion.objects.filter(pk=instance.pk).values_list('estado', flat=True).first()
+    if actual is not None:
+        instance.estado = actual
+
+
+@receiver(post_delete, sender=Inscripcion)
+def descontar_inscripcion(sender, instance, **kwargs):
+    Torneo.ajustar_contadores(instance.torneo_id, {instance.estado: -1})
+    if instance.estado == 'INSCRITO':
+        Torneo.promover_espera(instance.torneo_id)
+
+
+@receiver(post_save, sender=Ranking)
+@receiver(post_delete, sender=Ranking)
+def versionar_ranking(sender, **kwargs):
+    ContadorVersion.incrementar(versiones.RANKING)
+
+
+@receiver(post_save, sender=Jugador)
+@receiver(post_delete, sender=Jugador)
+def versionar_jugador(sender, **kwargs):
+    """El ranking muestra nombres: un cambio de jugador invalida también su versión."""
+    ContadorVersion.incrementar(versiones.JUGADORES, versiones.RANKING)
+
+
+@receiver(post_save, sender=Torneo)
+@receiver(post_delete, sender=Torneo)
+@receiver(post_save, sender=Inscripcion)
+@receiver(post_delete, sender=Inscripcion)
+def versionar_torneo(sender, instance, **kwargs):
+    """Las inscripciones cambian el contador de inscritos que muestra la lista de torneos."""
+    torneo_id = instance.pk if sender is Torneo else instance.torneo_id
+    ContadorVersion.incrementar(versiones.TORNEOS, versiones.torneo(torneo_id))
+
+
+@receiver(post_save, sender=Partido)
+@receiver(post_delete, sender=Partido)
+def versionar_partido(sender, instance, **kwargs):
+    ContadorVersion.incrementar(versiones.torneo(instance.torneo_id))
+
+
+@receiver(post_save, sender=Resultado)
+@receiver(post_delete, sender=Resultado)
+def versionar_resultado(sender, **kwargs):
+    ContadorVersion.incrementar(versiones.RESULTADOS)
+
+
+@receiver(post_delete, sender=Torneo)
+@receiver(post_delete, sender=Jugador)
+@receiver(post_delete, sender=Partido)
+@receiver(post_delete, sender=Inscripcion)
+def registrar_eliminacion(sender, instance, **kwargs):
+    """Tombstone para que /api/sync/ propague el borrado a los clientes."""
+    Eliminacion.objects.create(modelo=sender._meta.model_name, objeto_id=instance.pk)
+
+
+@receiver(post_delete, sender=Ranking)
+def tocar_jugador_sin_ranking(sender, instance, **kwargs):
+    """Los puntos se sincronizan con el jugador: que vuelva a viajar (ahora con 0 puntos)."""
+    Jugador.objects.filter(pk=instance.jugador_id).update(actualizado_en=timezone.now())
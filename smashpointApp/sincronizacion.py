@@ -0,0 +1,99 @@
+"""
+Sincronización incremental para la app móvil (/api/sync/).
+El token es opaco para el cliente: codifica el instante en que empezó la sincronización
+anterior. Se devuelven las filas con actualizado_en posterior y los tombstones de
+Eliminacion del mismo período, con un margen (SINCRONIZACION_MARGEN_SEGUNDOS) para las
+transacciones que marcaron sus filas antes del token pero confirmaron después.
+
+El margen solo es seguro si ninguna escritura tarda más que él entre marcar
+actualizado_en y confirmar. Las rutas de escritura lo respetan así:
+- save() y las señales: una fila por transacción;
+- trabajos en segundo plano: confirman cada lote de TAMANO_LOTE filas;
+- importaciones interactivas (una transacción larga): vuelven a marcar sus filas con
+  `remarcar` como última sentencia antes de confirmar;
+- lote de resultados y generación de cuadros: transacciones acotadas y en memoria.
+Las filas repetidas por el margen son inofensivas: el cliente las aplica como upsert.
+
+Los tombstones se conservan SINCRONIZACION_RETENCION_DIAS (`podar_eliminaciones`);
+un token más viejo que eso recibe una sincronización completa.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import proyecciones
+from .models import Eliminacion, Inscripcion, Jugador, Partido, Torneo
+from .paginacion import codificar_cursor, decodificar_cursor
+
+# Cubre escrituras cuya transacción confirmó después de que empezara la sincronización anterior
+MARGEN = timedelta(seconds=settings.SINCRONIZACION_MARGEN_SEGUNDOS)
+RETENCION = timedelta(days=settings.SINCRONIZACION_RETENCION_DIAS)
+
+# modelo de Eliminacion -> clave en la respuesta
+CLAVES = {'torneo': 'tournaments', 'jugador': 'players', 'partido': 'matches', 'inscripcion': 'registrations'}
+
+
+def codificar_token(instante):
+    return codificar_cursor([instante.isoformat()])
+
+
+def decodificar_token(token):
+    """datetime del token o None si es inválido."""
+    valores = decodificar_cursor(token, 1)
+    instante = parse_datetime(valores[0]) if valores and isinstance(valores[0], str) else None
+    return instante if instante is not None and not timezone.is_naive(instante) else None
+
+
+def remarcar(modelo, inicio):
+    """Vuelve a marcar con la hora actual lo escrito desde `inicio`; última sentencia de una transacción larga.
+
+    Puede tocar filas de otras transacciones del mismo período: solo se resincronizan.
+    """
+    modelo.objects.filter(actualizado_en__gte=inicio).update(actualizado_en=timezone.now())
+
+
+def podar_eliminaciones():
+    """Borra los tombstones fuera de la retención; devuelve cuántos."""
+    return Eliminacion.objects.filter(eliminado_en__lt=timezone.now() - RETENCION).delete()[0]
+
+
+def cambios(desde=None):
+    """Filas modificadas y eliminadas desde `desde` (todo si es None), ya serializadas.
+
+    Si `desde` es anterior a la retención de tombstones, se responde todo (full).
+    """
+    ahora = timezone.now()
+    if desde is not None and desde - MARGEN < ahora - RETENCION:
+        desde = None
+    filtro = Q() if desde is None else Q(actualizado_en__gte=desde - MARGEN)
+
+    torneos = Torneo.objects.filter(filtro).order_by('id')
+    # Los puntos viven en Ranking: un cambio de puntos también trae al jugador
+    filtro_jugador = filtro if desde is None else filtro | Q(ranking__actualizado_en__gte=desde - MARGEN)
+    jugadores = Jugador.objects.filter(filtro_jugador).order_by('id')
+    partidos = Partido.objects.filter(filtro).order_by('id')
+    inscripciones = (Inscripcion.objects.filter(filtro).order_by('id')
+                     .values_list('id', 'torneo_id', 'jugador_id', 'estado'))
+
+    eliminados = {clave: [] for clave in CLAVES.values()}
+    if desde is not None:
+        tombstones = (Eliminacion.objects.filter(eliminado_en__gte=desde - MARGEN)
+                      .order_by('id').values_list('modelo', 'objeto_id'))
+        for modelo, objeto_id in tombstones:
+            eliminados[CLAVES[modelo]].append(str(objeto_id))
+
+    return {
+        'token': codificar_token(ahora),
+        'full': desde is None,
+        'tournaments': proyecciones.TORNEOS.lista(torneos),
+        'players': proyecciones.JUGADORES.lista(jugadores),
+        'matches': proyecciones.PARTIDOS.lista(partidos),
+        'registrations': [
+            {'id': str(i), 'tournamentId': str(t), 'playerId': str(j), 'status': e}
+            for i, t, j, e in inscripciones
+        ],
+        'deleted': eliminados,
+    }
@@ -0,0 +1,83 @@
+"""
+Volcado completo (o incremental) de la base en NDJSON comprimido con gzip.
+Cada modelo se recorre con values().iterator(), que en PostgreSQL usa un cursor del
+lado del servidor: la memoria queda acotada por el chunk de la consulta y el bloque
+de salida, no por el tamaño de la base. Lo usan la vista /api/v2/snapshot/ y el
+comando `snapshot`.
+
+Formato: una línea de cabecera {"modelo": "snapshot", "generado_en": ..., "updated_since": ...}
+y luego una línea por fila {"modelo": "<nombre>", <campo>: <valor>, ...}. Para la
+siguiente extracción incremental se pasa generado_en como updated_since: el filtro
+resta sincronizacion.MARGEN, así que las filas marcadas antes de generado_en pero
+confirmadas después también llegan (alguna puede repetirse; aplicarlas como upsert).
+Las membresías de un grupo viajan completas cada vez que el grupo cambia, también
+cuando solo cambian sus jugadores: reemplazan las que el destino tenga de ese grupo.
+"""
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Grupo, Inscripcion, Jugador, Partido, Ranking, Torneo
+from .sincronizacion import MARGEN
+from .streaming import CHUNK_CONSULTA, TAMANO_BLOQUE, comprimir_gzip
+
+# (nombre en el NDJSON, modelo, campo de fecha para filtrar updated_since)
+MODELOS = [
+    ('jugador', Jugador, 'actualizado_en'),
+    ('torneo', Torneo, 'actualizado_en'),
+    ('inscripcion', Inscripcion, 'actualizado_en'),
+    ('grupo', Grupo, 'actualizado_en'),
+    # Membresías del M2M: signals.marcar_grupo_membresia marca el grupo cuando cambian
+    ('grupo_jugador', Grupo.jugadores.through, 'grupo__actualizado_en'),
+    ('partido', Partido, 'actualizado_en'),
+    ('ranking', Ranking, 'actualizado_en'),
+]
+
+
+def parsear_desde(valor):
+    """datetime consciente de zona a partir de ISO 8601 (fecha o fecha-hora); ValueError si es inválido."""
+    if not valor:
+        return None
+    fecha = parse_datetime(valor)
+    if fecha is None:
+        dia = parse_date(valor)
+        if dia is None:
+            raise ValueError(f'Fecha inválida: {valor}')
+        fecha = timezone.datetime(dia.year, dia.month, dia.day)
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    return fecha
+
+
+def filas(desde=None):
+    """Genera los dicts de todas las filas, modelo por modelo."""
+    for nombre, modelo, campo_fecha in MODELOS:
+        campos = [f.attname for f in modelo._meta.concrete_fields]
+        qs = modelo.objects.order_by('pk')
+        if desde is not None:
+            qs = qs.filter(**{f'{campo_fecha}__gte': desde - MARGEN})
+        for valores in qs.values(*campos).iterator(chunk_size=CHUNK_CONSULTA):
+            yield {'modelo': nombre, **valores}
+
+
+def lineas_ndjson(desde=None, tamano_bloque=TAMANO_BLOQUE):
+    """Genera bytes NDJSON (UTF-8) agrupados en bloques de ~tamano_bloque."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    cabecera = {'modelo': 'snapshot', 'generado_en': timezone.now(), 'updated_since': desde}
+    bloque = [encoder.encode(cabecera) + '\n']
+    acumulado = len(bloque[0])
+    for fila in filas(desde):
+        linea = encoder.encode(fila) + '\n'
+        bloque.append(linea)
+        acumulado += len(linea)
+        if acumulado >= tamano_bloque:
+            yield ''.join(bloque).encode('utf-8')
+            bloque, acumulado = [], 0
+    if bloque:
+        yield ''.join(bloque).encode('utf-8')
+
+
+def generar(desde=None):
+    """Bytes gzip del snapshot, en streaming."""
+    return comprimir_gzip(lineas_ndjson(desde))
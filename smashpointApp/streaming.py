@@ -0,0 +1,106 @@
+"""
+Respuestas en streaming para exportaciones y listados grandes.
+Las filas se leen con values_list()/values().iterator(), se serializan en bloques de
+~64 KB y, opcionalmente, se comprimen con gzip al vuelo: la memoria del worker queda
+acotada por el tamaño del bloque y no por la cantidad de filas.
+"""
+import csv
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+
+TAMANO_BLOQUE = 64 * 1024
+CHUNK_CONSULTA = 2000
+
+
+class Eco:
+    """Pseudo-archivo para csv.writer: write() devuelve la línea en vez de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def filas_csv(encabezado, filas, tamano_bloque=TAMANO_BLOQUE):
+    """Genera bytes CSV (UTF-8) agrupando líneas en bloques de ~tamano_bloque."""
+    writer = csv.writer(Eco())
+    bloque = [writer.writerow(encabezado)]
+    acumulado = len(bloque[0])
+    for fila in filas:
+        linea = writer.writerow(fila)
+        bloque.append(linea)
+        acumulado += len(linea)
+        if acumulado >= tamano_bloque:
+            yield ''.join(bloque).encode('utf-8')
+            bloque, acumulado = [], 0
+    if bloque:
+        yield ''.join(bloque).encode('utf-8')
+
+
+def lista_json(clave, filas, tamano_bloque=TAMANO_BLOQUE):
+    """Genera bytes de {"clave": [fila, ...]} en bloques de ~tamano_bloque.
+
+    Mismo formato que JsonResponse (DjangoJSONEncoder, separadores por defecto), así que
+    el resultado es idéntico al de JsonResponse({clave: list(filas)}).
+    """
+    encoder = DjangoJSONEncoder()
+    bloque = [encoder.encode(clave).join(['{', ': ['])]
+    acumulado = len(bloque[0])
+    separador = ''
+    for fila in filas:
+        elemento = separador + encoder.encode(fila)
+        separador = ', '
+        bloque.append(elemento)
+        acumulado += len(elemento)
+        if acumulado >= tamano_bloque:
+            yield ''.join(bloque).encode('utf-8')
+            bloque, acumulado = [], 0
+    bloque.append(']}')
+    yield ''.join(bloque).encode('utf-8')
+
+
+def comprimir_gzip(bloques):
+    """Comprime un iterable de bytes en formato gzip sin materializarlo."""
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for bloque in bloques:
+        datos = compresor.compress(bloque)
+        if datos:
+            yield datos
+    yield compresor.flush()
+
+
+def pide_gzip(request):
+    return request.GET.get('gzip', '').lower() in ('1', 'true', 'si', 'sí')
+
+
+def filtro_fechas(request, campo):
+    """{campo__gte, campo__lte} a partir de ?desde= y ?hasta= (YYYY-MM-DD); ignora fechas inválidas."""
+    filtros = {}
+    for parametro, lookup in (('desde', 'gte'), ('hasta', 'lte')):
+        try:
+            fecha = parse_date(request.GET.get(parametro) or '')
+        except ValueError:
+            fecha = None
+        if fecha:
+            filtros[f'{campo}__{lookup}'] = fecha
+    return filtros
+
+
+def respuesta_json(clave, queryset, campos):
+    """StreamingHttpResponse con {clave: [queryset.values(*campos)...]}, leído por chunks."""
+    filas = queryset.values(*campos).iterator(chunk_size=CHUNK_CONSULTA)
+    return StreamingHttpResponse(lista_json(clave, filas), content_type='application/json')
+
+
+def respuesta_csv(request, nombre, encabezado, queryset, campos):
+    """StreamingHttpResponse con el CSV de queryset.values_list(*campos); ?gzip=1 entrega .csv.gz."""
+    filas = queryset.values_list(*campos).iterator(chunk_size=CHUNK_CONSULTA)
+    contenido = filas_csv(encabezado, filas)
+    if pide_gzip(request):
+        response = StreamingHttpResponse(comprimir_gzip(contenido), content_type='application/gzip')
+        response['Content-Disposition'] = f'attachment; filename="{nombre}.csv.gz"'
+    else:
+        response = StreamingHttpResponse(contenido, content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{nombre}.csv"'
+    return response
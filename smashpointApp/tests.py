@@ -1,13 +1,18 @@
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client, override_settings
 from rest_framework.test import APIClient
 from django.contrib.auth.models import User, Permission
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.urls import reverse
 from django.utils import timezone
 from datetime import date, timedelta
+import io
+import os
+import tempfile
 import time
 
 from .models import Jugador, Torneo, Resultado, Contacto
-from .models import Inscripcion, Partido, Ranking
+from .models import Inscripcion, Partido, Ranking, RankingEvent, Grupo, GrupoStanding
 
 
 # ==================== PRUEBAS FUNCIONALES ====================
@@ -686,6 +691,7 @@ class TestRondasSiguiente(TestCase):
         self.torneo.refresh_from_db()
         self.assertEqual(self.torneo.estado, 'FINALIZADO')
 
+@override_settings(ARTEFACTOS_ROOT=os.path.join(tempfile.gettempdir(), 'smashpoint-test-artefactos'))
 class TestExportRankingFormato(TestCase):
     """Verifica exportación PDF y Excel del ranking"""
 
@@ -700,13 +706,13 @@ class TestExportRankingFormato(TestCase):
         resp = self.client.get(reverse('export_ranking_pdf'))
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp['Content-Type'], 'application/pdf')
-        self.assertGreater(len(resp.content), 100)  # algo de contenido
+        self.assertGreater(len(b''.join(resp.streaming_content)), 100)  # algo de contenido
 
     def test_export_ranking_excel(self):
         resp = self.client.get(reverse('export_ranking_excel'))
         self.assertEqual(resp.status_code, 200)
         self.assertIn('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', resp['Content-Type'])
-        self.assertGreater(len(resp.content), 100)  # contenido binario
+        self.assertGreater(len(b''.join(resp.streaming_content)), 100)  # contenido binario
 
 class TestAPIV2(TestCase):
     """Pruebas para endpoints DRF /api/v2/"""
@@ -819,6 +825,7 @@ class TestRoles(TestCase):
 
 
 # ==================== TESTS RF9: Scoreboard público y QR ====================
+@override_settings(ARTEFACTOS_ROOT=os.path.join(tempfile.gettempdir(), 'smashpoint-test-artefactos'))
 class TestPublicScoreboard(TestCase):
     def setUp(self):
         self.client = Client()
@@ -864,9 +871,10 @@ class TestExportImportAPI(TestCase):
         self.assertIn('jugadores.csv', resp['Content-Disposition'])
 
     def test_api_jugadores(self):
+        import json
         resp = self.client.get(reverse('api_jugadores'))
         self.assertEqual(resp.status_code, 200)
-        self.assertIn('jugadores', resp.json())
+        self.assertIn('jugadores', json.loads(b''.join(resp.streaming_content)))
 
     def test_import_jugadores_csv(self):
         import io
@@ -887,6 +895,1476 @@ class TestOfflineManifest(TestCase):
         self.assertContains(resp, 'Modo Offline')
 
 
+# ==================== TESTS: LEDGER DE RANKING ====================
+class TestRankingLedger(TestCase):
+    """Puntos de ranking registrados como eventos append-only"""
+
+    def setUp(self):
+        self.torneo = Torneo.objects.create(nombre='T Ledger', direccion='D', fecha=date(2025,12,5), categoria='JUVENIL')
+        self.a = Jugador.objects.create(nombre='LA', apellido='X', categoria='AMATEUR', licencia='LG1')
+        self.b = Jugador.objects.create(nombre='LB', apellido='Y', categoria='AMATEUR', licencia='LG2')
+        self.partido = Partido.objects.create(torneo=self.torneo, ronda=1, etapa='GRUPOS', grupo='A',
+                                              jugador_a=self.a, jugador_b=self.b, best_of=3)
+
+    def test_resultado_registra_eventos_y_totales(self):
+        self.partido.sets_a, self.partido.sets_b = 2, 0
+        self.partido.calcular_ganador()
+        self.assertEqual(Ranking.objects.get(jugador=self.a).puntos, 2)
+        self.assertEqual(Ranking.objects.get(jugador=self.b).puntos, 1)
+        self.assertEqual(RankingEvent.objects.filter(partido=self.partido).count(), 2)
+
+    def test_recalcular_mismo_resultado_no_duplica_puntos(self):
+        self.partido.sets_a, self.partido.sets_b = 2, 1
+        self.partido.calcular_ganador()
+        self.partido.calcular_ganador()
+        self.assertEqual(Ranking.objects.get(jugador=self.a).puntos, 2)
+
+    def test_correccion_escribe_eventos_compensatorios(self):
+        self.partido.sets_a, self.partido.sets_b = 2, 0
+        self.partido.calcular_ganador()
+        self.partido.sets_a, self.partido.sets_b = 0, 2
+        self.partido.calcular_ganador()
+        self.assertEqual(Ranking.objects.get(jugador=self.a).puntos, 1)
+        self.assertEqual(Ranking.objects.get(jugador=self.b).puntos, 2)
+        self.assertEqual(RankingEvent.objects.filter(partido=self.partido).count(), 4)
+
+    def test_bloquea_partidos_antes_de_leer_el_ledger(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self.partido.sets_a, self.partido.sets_b = 2, 0
+        with CaptureQueriesContext(connection) as consultas:
+            RankingEvent.registrar_partidos([self.partido])
+        sql = [q['sql'] for q in consultas.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertIn('"smashpointApp_partido"', sql[0])
+        self.assertIn('"smashpointApp_rankingevent"', sql[1])
+        if connection.features.has_select_for_update:
+            self.assertIn('FOR UPDATE', sql[0])
+
+    def test_rebuild_ranking_desde_ledger(self):
+        from django.core import management
+        self.partido.sets_a, self.partido.sets_b = 2, 0
+        self.partido.calcular_ganador()
+        Ranking.objects.update(puntos=0)
+        management.call_command('rebuild_ranking', stdout=io.StringIO())
+        self.assertEqual(Ranking.objects.get(jugador=self.a).puntos, 2)
+        self.assertEqual(Ranking.objects.get(jugador=self.b).puntos, 1)
+
+
+# ==================== TESTS: TABLA DE GRUPOS PERSISTIDA ====================
+class TestGrupoStanding(TestCase):
+    """La tabla de posiciones se mantiene al guardar resultados de grupos"""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin = User.objects.create_superuser(username='admin', password='admin123')
+        self.client.login(username='admin', password='admin123')
+        self.torneo = Torneo.objects.create(nombre='T Grupos', direccion='D', fecha=date(2025,12,6), categoria='JUVENIL')
+        self.jugadores = [Jugador.objects.create(nombre=f'G{i}', apellido='S', categoria='AMATEUR', licencia=f'GS{i}') for i in range(3)]
+        self.grupo = Grupo.objects.create(torneo=self.torneo, nombre='A')
+        self.grupo.jugadores.add(*self.jugadores)
+        a, b, c = self.jugadores
+        self.p1 = Partido.objects.create(torneo=self.torneo, etapa='GRUPOS', grupo='A', jugador_a=a, jugador_b=b)
+        self.p2 = Partido.objects.create(torneo=self.torneo, etapa='GRUPOS', grupo='A', jugador_a=b, jugador_b=c)
+
+    def _resultado(self, partido, sets_a, sets_b):
+        partido.sets_a, partido.sets_b = sets_a, sets_b
+        partido.calcular_ganador()
+
+    def test_filas_creadas_al_agregar_jugadores(self):
+        self.assertEqual(GrupoStanding.objects.filter(grupo=self.grupo).count(), 3)
+
+    def test_resultado_actualiza_tabla(self):
+        a, b, c = self.jugadores
+        self._resultado(self.p1, 1, 2)
+        self._resultado(self.p2, 2, 0)
+        tabla = self.grupo.estadisticas()
+        self.assertEqual([f['jugador'] for f in tabla], [b, a, c])
+        fila_b = tabla[0]
+        self.assertEqual((fila_b['PJ'], fila_b['PG'], fila_b['PP'], fila_b['SA'], fila_b['SB']), (2, 2, 0, 4, 1))
+
+    def test_correccion_y_borrado_de_resultado(self):
+        a, b, _ = self.jugadores
+        self._resultado(self.p1, 2, 0)
+        partido = Partido.objects.get(pk=self.p1.pk)
+        self._resultado(partido, 1, 2)
+        st_a = GrupoStanding.objects.get(grupo=self.grupo, jugador=a)
+        self.assertEqual((st_a.pj, st_a.pg, st_a.pp, st_a.sa, st_a.sb), (1, 0, 1, 1, 2))
+        Partido.objects.get(pk=self.p1.pk).delete()
+        st_a.refresh_from_db()
+        self.assertEqual((st_a.pj, st_a.pg, st_a.pp, st_a.sa, st_a.sb), (0, 0, 0, 0, 0))
+
+    def test_lista_grupos_consultas_constantes(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('lista_grupos', args=[self.torneo.id])
+        with CaptureQueriesContext(connection) as un_grupo:
+            self.client.get(url)
+        for nombre in 'BCD':
+            g = Grupo.objects.create(torneo=self.torneo, nombre=nombre)
+            g.jugadores.add(*self.jugadores)
+        with CaptureQueriesContext(connection) as cuatro_grupos:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(un_grupo), len(cuatro_grupos))
+
+
+# ==================== TESTS: GENERACIÓN MASIVA DE GRUPOS / FIXTURE ====================
+class TestGenerador(TestCase):
+    """Generación de grupos y fixture con bulk_create (consultas constantes)"""
+
+    def _torneo(self, n, nombre):
+        torneo = Torneo.objects.create(nombre=nombre, direccion='D', fecha=date(2025,12,7), categoria='JUVENIL', cupos_max=n)
+        for i in range(n):
+            j = Jugador.objects.create(nombre=f'{nombre}{i}', apellido='Gen', categoria='AMATEUR', licencia=f'{nombre}-{i}')
+            Inscripcion.objects.create(torneo=torneo, jugador=j)
+        return torneo
+
+    def test_generar_grupos_estructura(self):
+        from . import generador
+        torneo = self._torneo(12, 'GA')
+        num_grupos = generador.generar_grupos(torneo)
+        self.assertEqual(num_grupos, 4)
+        self.assertEqual(Grupo.objects.filter(torneo=torneo).count(), 4)
+        self.assertEqual(GrupoStanding.objects.filter(grupo__torneo=torneo).count(), 12)
+        # 4 grupos de 3 jugadores: 3 partidos cada uno
+        self.assertEqual(Partido.objects.filter(torneo=torneo, etapa='GRUPOS').count(), 12)
+        torneo.refresh_from_db()
+        self.assertEqual(torneo.estado, 'EN_CURSO')
+
+    def test_generar_grupos_consultas_constantes(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from . import generador
+        chico = self._torneo(4, 'GB')
+        grande = self._torneo(32, 'GC')
+        with CaptureQueriesContext(connection) as q_chico:
+            generador.generar_grupos(chico)
+        with CaptureQueriesContext(connection) as q_grande:
+            generador.generar_grupos(grande)
+        self.assertEqual(len(q_chico), len(q_grande))
+
+    def test_generar_bracket_con_clasificados(self):
+        from . import generador
+        torneo = self._torneo(8, 'GD')
+        generador.generar_grupos(torneo)
+        partidos = generador.generar_bracket(torneo)
+        self.assertEqual(len(partidos), 4)
+        self.assertEqual(Partido.objects.filter(torneo=torneo, etapa='ELIMINACION').count(), 4)
+
+
+# ==================== TESTS: PROGRAMACIÓN DE MESAS ====================
+class TestCalendario(TestCase):
+    """Rondas por método del círculo y asignación de mesas/turnos"""
+
+    def test_rondas_circulares_cubren_todos_los_cruces(self):
+        from itertools import combinations
+        from .calendario import rondas_circulares
+        for n in (4, 5, 6):
+            rondas = rondas_circulares(list(range(n)))
+            self.assertEqual(len(rondas), n - 1 if n % 2 == 0 else n)
+            cruces = [frozenset(par) for ronda in rondas for par in ronda]
+            self.assertEqual(set(cruces), {frozenset(c) for c in combinations(range(n), 2)})
+            self.assertEqual(len(cruces), len(set(cruces)))
+            for ronda in rondas:
+                jugadores = [j for par in ronda for j in par]
+                self.assertEqual(len(jugadores), len(set(jugadores)))
+
+    def test_programar_respeta_mesas_y_descanso(self):
+        from types import SimpleNamespace
+        from .calendario import rondas_circulares, programar
+        partidos = []
+        for g in range(6):
+            ids = [g * 5 + i for i in range(5)]
+            for ronda, pares in enumerate(rondas_circulares(ids), start=1):
+                for a, b in pares:
+                    partidos.append(SimpleNamespace(id=len(partidos), ronda=ronda, grupo=str(g), jugador_a_id=a, jugador_b_id=b))
+        makespan = programar(partidos, mesas=4, descanso=1)
+        self.assertEqual(max(p.turno for p in partidos), makespan)
+        por_turno = {}
+        turnos_jugador = {}
+        for p in partidos:
+            por_turno.setdefault(p.turno, []).append(p.mesa)
+            for j in (p.jugador_a_id, p.jugador_b_id):
+                turnos_jugador.setdefault(j, []).append(p.turno)
+        for mesas in por_turno.values():
+            self.assertLessEqual(len(mesas), 4)
+            self.assertEqual(len(mesas), len(set(mesas)))
+        for turnos in turnos_jugador.values():
+            turnos.sort()
+            self.assertTrue(all(b - a >= 2 for a, b in zip(turnos, turnos[1:])))
+
+    def test_vista_programar_partidos(self):
+        from . import generador
+        User.objects.create_superuser(username='admin', password='admin123')
+        self.client.login(username='admin', password='admin123')
+        torneo = Torneo.objects.create(nombre='T Cal', direccion='D', fecha=date(2025,12,8), categoria='JUVENIL', cupos_max=8)
+        for i in range(8):
+            j = Jugador.objects.create(nombre=f'C{i}', apellido='Cal', categoria='AMATEUR', licencia=f'CAL-{i}')
+            Inscripcion.objects.create(torneo=torneo, jugador=j)
+        torneo.numero_grupos = 2
+        torneo.save()
+        generador.generar_grupos(torneo)
+        resp = self.client.post(reverse('programar_partidos', args=[torneo.id]), {'mesas': 2, 'descanso': 0})
+        self.assertEqual(resp.status_code, 302)
+        self.assertFalse(Partido.objects.filter(torneo=torneo, turno__isnull=True).exists())
+
+
+# ==================== TESTS: API MÓVIL /api/players ====================
+class TestMobilePlayers(TestCase):
+    """Lista de jugadores móvil: puntos anotados, keyset y filtro por categoría"""
+
+    def setUp(self):
+        self.client = Client()
+        for i in range(12):
+            j = Jugador.objects.create(nombre=f'N{i:02d}', apellido='Mob', categoria='FEDERADO' if i % 3 == 0 else 'AMATEUR', licencia=f'MOB-{i}')
+            if i % 2 == 0:
+                Ranking.objects.create(jugador=j, puntos=i * 10)
+
+    def test_consultas_constantes(self):
+        # versiones (ETag) + lista
+        with self.assertNumQueries(2):
+            resp = self.client.get(reverse('mobile_players'))
+        self.assertEqual(resp.status_code, 200)
+        for i in range(12, 40):
+            Jugador.objects.create(nombre=f'N{i:02d}', apellido='Mob', categoria='AMATEUR', licencia=f'MOB-{i}')
+        with self.assertNumQueries(2):
+            self.client.get(reverse('mobile_players'))
+
+    def test_puntos_y_formato(self):
+        data = self.client.get(reverse('mobile_players')).json()
+        por_nombre = {d['name']: d for d in data}
+        self.assertEqual(por_nombre['N04 Mob']['points'], 40)
+        self.assertEqual(por_nombre['N01 Mob']['points'], 0)
+        self.assertEqual(set(data[0].keys()), {'id', 'name', 'category', 'points', 'club'})
+
+    def test_paginacion_keyset(self):
+        resp = self.client.get(reverse('mobile_players'), {'limit': 5})
+        self.assertEqual(len(resp.json()), 5)
+        vistos = [d['id'] for d in resp.json()]
+        while 'X-Next-Cursor' in resp:
+            resp = self.client.get(reverse('mobile_players'), {'limit': 5, 'cursor': resp['X-Next-Cursor']})
+            vistos.extend(d['id'] for d in resp.json())
+        self.assertEqual(len(vistos), 12)
+        self.assertEqual(len(set(vistos)), 12)
+
+    def test_filtro_categoria(self):
+        data = self.client.get(reverse('mobile_players'), {'category': 'federado'}).json()
+        self.assertEqual(len(data), 4)
+        self.assertTrue(all(d['category'] == 'FEDERADO' for d in data))
+
+
+# ==================== TESTS: CONTADORES DE INSCRIPCIÓN ====================
+class TestContadoresInscripcion(TestCase):
+    """Contadores desnormalizados de inscritos / lista de espera en Torneo"""
+
+    def setUp(self):
+        self.torneo = Torneo.objects.create(nombre='T Cupos', direccion='D', fecha=date(2025,12,9), categoria='JUVENIL', cupos_max=2)
+        self.jugadores = [Jugador.objects.create(nombre=f'K{i}', apellido='Cupo', categoria='AMATEUR', licencia=f'CUP-{i}') for i in range(3)]
+
+    def _contadores(self):
+        self.torneo.refresh_from_db()
+        return self.torneo.inscritos_count, self.torneo.espera_count
+
+    def test_crear_cancelar_y_borrar(self):
+        inscs = [Inscripcion.objects.create(torneo=self.torneo, jugador=j) for j in self.jugadores]
+        self.assertEqual(self._contadores(), (2, 1))
+        self.assertEqual(inscs[2].estado, 'ESPERA')
+        inscs[0].estado = 'CANCELADO'
+        inscs[0].save()
+        # El cupo liberado lo toma la inscripción en espera
+        self.assertEqual(self._contadores(), (2, 0))
+        inscs[2].delete()
+        self.assertEqual(self._contadores(), (1, 0))
+
+    def test_guardar_torneo_desactualizado_no_pisa_contadores(self):
+        viejo = Torneo.objects.get(pk=self.torneo.pk)
+        Inscripcion.objects.create(torneo=self.torneo, jugador=self.jugadores[0])
+        viejo.nombre = 'Renombrado'
+        viejo.save()
+        self.assertEqual(self._contadores(), (1, 0))
+        self.assertEqual(self.torneo.nombre, 'Renombrado')
+
+    def test_lista_torneos_movil_sin_count_por_fila(self):
+        for i in range(5):
+            Torneo.objects.create(nombre=f'TM{i}', direccion='D', fecha=date(2025,12,10), categoria='JUVENIL')
+        # versiones (ETag) + lista
+        with self.assertNumQueries(2):
+            resp = self.client.get(reverse('mobile_tournaments'))
+        self.assertEqual(resp.status_code, 200)
+
+
+# ==================== TESTS: INSCRIPCIÓN MASIVA ====================
+class TestInscripcionMasiva(TestCase):
+    """Servicio inscripciones.inscribir_jugadores y su acción en la API"""
+
+    def setUp(self):
+        self.torneo = Torneo.objects.create(nombre='T Masivo', direccion='D', fecha=date(2025,12,11), categoria='ADULTO', cupos_max=3)
+        self.jugadores = [Jugador.objects.create(nombre=f'M{i}', apellido='Masivo', categoria='AMATEUR', licencia=f'MAS-{i}') for i in range(5)]
+        self.ids = [j.id for j in self.jugadores]
+
+    def test_reporte_y_pocas_consultas(self):
+        from . import inscripciones
+        Inscripcion.objects.create(torneo=self.torneo, jugador=self.jugadores[0])
+        # bloqueo + jugadores + existentes + INSERT + contadores + versión (+ savepoint)
+        with self.assertNumQueries(8):
+            reporte = inscripciones.inscribir_jugadores(self.torneo, self.ids + [999999, 'x'], permitir_espera=True)
+        self.assertEqual([j.id for j in reporte['duplicados']], self.ids[:1])
+        self.assertEqual([j.id for j in reporte['creados']], self.ids[1:3])
+        self.assertEqual([j.id for j in reporte['espera']], self.ids[3:])
+        self.assertEqual(reporte['inexistentes'], [999999])
+        self.torneo.refresh_from_db()
+        self.assertEqual((self.torneo.inscritos_count, self.torneo.espera_count), (3, 2))
+
+    def test_conflicto_no_desajusta_contadores(self):
+        """Una inscripción que la lectura de existentes no vio revierte el lote, no se cuenta."""
+        from unittest import mock
+        from . import inscripciones
+        Inscripcion.objects.create(torneo=self.torneo, jugador=self.jugadores[0])
+        with mock.patch.object(Inscripcion.objects, 'filter', return_value=Inscripcion.objects.none()):
+            with self.assertRaises(IntegrityError):
+                inscripciones.inscribir_jugadores(self.torneo, self.ids[:2])
+        self.torneo.refresh_from_db()
+        self.assertEqual((self.torneo.inscritos_count, Inscripcion.objects.filter(torneo=self.torneo).count()), (1, 1))
+
+    def test_sin_espera_no_inscribe_si_no_alcanzan_cupos(self):
+        from . import inscripciones
+        reporte = inscripciones.inscribir_jugadores(self.torneo, self.ids)
+        self.assertEqual(len(reporte['sin_cupo']), 2)
+        self.assertFalse(Inscripcion.objects.filter(torneo=self.torneo).exists())
+
+    def test_accion_api(self):
+        User.objects.create_superuser(username='adm_mas', password='x')
+        api = APIClient()
+        api.login(username='adm_mas', password='x')
+        resp = api.post(f'/api/v2/torneos/{self.torneo.id}/inscribir/',
+                        {'jugadores': self.ids[:2]}, format='json')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['creados'], self.ids[:2])
+        resp = api.post(f'/api/v2/torneos/{self.torneo.id}/inscribir/',
+                        {'jugadores': self.ids[2:]}, format='json')
+        self.assertEqual(resp.status_code, 409)
+
+
+# ==================== TESTS: PROMOCIÓN DE LISTA DE ESPERA ====================
+class TestPromocionEspera(TestCase):
+    """Promoción FIFO de ESPERA a INSCRITO al liberar cupos"""
+
+    def setUp(self):
+        self.torneo = Torneo.objects.create(nombre='T Espera', direccion='D', fecha=date(2025,12,12), categoria='ADULTO', cupos_max=2)
+        self.inscs = []
+        for i in range(5):
+            j = Jugador.objects.create(nombre=f'E{i}', apellido='Espera', categoria='AMATEUR', licencia=f'ESP-{i}')
+            self.inscs.append(Inscripcion.objects.create(torneo=self.torneo, jugador=j))
+
+    def _estados(self):
+        return list(Inscripcion.objects.filter(torneo=self.torneo).order_by('id').values_list('estado', flat=True))
+
+    def test_cancelar_promueve_el_mas_antiguo(self):
+        self.assertEqual(self._estados(), ['INSCRITO', 'INSCRITO', 'ESPERA', 'ESPERA', 'ESPERA'])
+        self.inscs[0].estado = 'CANCELADO'
+        self.inscs[0].save()
+        self.assertEqual(self._estados(), ['CANCELADO', 'INSCRITO', 'INSCRITO', 'ESPERA', 'ESPERA'])
+        self.inscs[1].delete()
+        self.assertEqual(self._estados(), ['CANCELADO', 'INSCRITO', 'INSCRITO', 'ESPERA'])
+        self.torneo.refresh_from_db()
+        self.assertEqual((self.torneo.inscritos_count, self.torneo.espera_count), (2, 1))
+
+    def test_bajar_a_espera_no_se_revierte(self):
+        """INSCRITO -> ESPERA a mano: el cupo pasa al siguiente en espera, no vuelve al mismo."""
+        self.inscs[0].estado = 'ESPERA'
+        self.inscs[0].save()
+        self.assertEqual(self._estados(), ['ESPERA', 'INSCRITO', 'INSCRITO', 'ESPERA', 'ESPERA'])
+        self.torneo.refresh_from_db()
+        self.assertEqual((self.torneo.inscritos_count, self.torneo.espera_count), (2, 3))
+
+    def test_aumentar_cupos_promueve_en_un_update(self):
+        torneo = Torneo.objects.get(pk=self.torneo.pk)
+        torneo.cupos_max = 10
+        torneo.save()
+        self.assertEqual(self._estados(), ['INSCRITO'] * 5)
+        torneo.refresh_from_db()
+        self.assertEqual((torneo.inscritos_count, torneo.espera_count), (5, 0))
+
+    def test_torneo_cerrado_no_promueve(self):
+        Torneo.objects.filter(pk=self.torneo.pk).update(estado='EN_CURSO')
+        self.assertEqual(Torneo.promover_espera(self.torneo.pk), 0)
+
+
+# ==================== TESTS: EXPORTACIÓN CSV EN STREAMING ====================
+class TestExportacionStreaming(TestCase):
+    """Exportaciones CSV con StreamingHttpResponse, filtros y gzip"""
+
+    def setUp(self):
+        User.objects.create_superuser(username='adm_exp', password='x')
+        self.client.login(username='adm_exp', password='x')
+        self.j = Jugador.objects.create(nombre='Str', apellido='Eam', categoria='AMATEUR', licencia='STR-1')
+        self.t1 = Torneo.objects.create(nombre='Viejo', direccion='D', fecha=date(2024,1,10), categoria='ADULTO')
+        self.t2 = Torneo.objects.create(nombre='Nuevo', direccion='D', fecha=date(2025,6,10), categoria='ADULTO')
+        for t in (self.t1, self.t2):
+            Resultado.objects.create(torneo=t, jugador1=self.j, jugador2=self.j, marcador_j1=3, marcador_j2=1)
+
+    def _filas(self, resp):
+        return b''.join(resp.streaming_content).decode('utf-8').splitlines()
+
+    def test_torneos_filtro_fecha(self):
+        resp = self.client.get(reverse('export_torneos_csv'), {'desde': '2025-01-01'})
+        self.assertTrue(resp.streaming)
+        filas = self._filas(resp)
+        self.assertEqual(filas[0], 'id,nombre,direccion,fecha,categoria,cupos_max,estado')
+        self.assertEqual(len(filas), 2)
+        self.assertIn('Nuevo', filas[1])
+
+    def test_resultados_por_torneo_en_gzip(self):
+        import gzip
+        resp = self.client.get(reverse('export_resultados_csv'), {'torneo': self.t1.id, 'gzip': '1'})
+        self.assertIn('resultados.csv.gz', resp['Content-Disposition'])
+        filas = gzip.decompress(b''.join(resp.streaming_content)).decode('utf-8').splitlines()
+        self.assertEqual(filas[1].split(',')[1], str(self.t1.id))
+        self.assertEqual(len(filas), 2)
+
+    def test_bloques_acotados(self):
+        from . import streaming
+        filas = ((i, 'x' * 50) for i in range(5000))
+        bloques = list(streaming.filas_csv(['id', 'txt'], filas, tamano_bloque=4096))
+        self.assertGreater(len(bloques), 10)
+        self.assertTrue(all(len(b) < 4096 + 100 for b in bloques))
+
+
+# ==================== TESTS: LIBRO EXCEL DEL TORNEO ====================
+class TestLibroTorneo(TestCase):
+    """Exportación write-only del torneo completo"""
+
+    def setUp(self):
+        from . import generador
+        User.objects.create_superuser(username='adm_xls', password='x')
+        self.client.login(username='adm_xls', password='x')
+        self.torneo = Torneo.objects.create(nombre='T Excel', direccion='D', fecha=date(2025,12,13), categoria='ADULTO', cupos_max=8)
+        for i in range(8):
+            j = Jugador.objects.create(nombre=f'X{i}', apellido='Libro', categoria='AMATEUR', licencia=f'XLS-{i}')
+            Inscripcion.objects.create(torneo=self.torneo, jugador=j)
+        generador.generar_grupos(self.torneo)
+        generador.generar_bracket(self.torneo)
+
+    def test_hojas_y_consultas_fijas(self):
+        import openpyxl
+        from . import exportaciones
+        with self.assertNumQueries(4):
+            archivo = exportaciones.guardar_temporal(exportaciones.libro_torneo(self.torneo))
+        libro = openpyxl.load_workbook(archivo, read_only=True)
+        self.assertEqual(libro.sheetnames, ['Inscripciones', 'Grupo A', 'Grupo B', 'Grupo C', 'Grupo D', 'Ronda 1'])
+        self.assertEqual(len(list(libro['Inscripciones'].iter_rows())), 9)
+        archivo.close()
+
+    def test_vista(self):
+        resp = self.client.get(reverse('export_torneo_excel', args=[self.torneo.id]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn(f'torneo_{self.torneo.id}.xlsx', resp['Content-Disposition'])
+        self.assertTrue(b''.join(resp.streaming_content).startswith(b'PK'))
+
+
+# ==================== TESTS: IMPORTACIÓN EXCEL POR LOTES ====================
+class TestImportacionExcel(TestCase):
+    """Pipeline read_only + bulk_create de importar_jugadores_excel"""
+
+    def setUp(self):
+        User.objects.create_superuser(username='adm_imp', password='x')
+        self.client.login(username='adm_imp', password='x')
+        Jugador.objects.create(nombre='Ya', apellido='Existe', categoria='AMATEUR', rut='12.345.678-5')
+
+    def _libro(self, filas):
+        import openpyxl
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(['Nombre', 'Apellido', 'Categoria', 'RUT'])
+        for fila in filas:
+            ws.append(fila)
+        buf = io.BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+        buf.name = 'jugadores.xlsx'
+        return buf
+
+    def test_reporte_por_fila_y_lotes(self):
+        from . import importacion
+        archivo = self._libro([
+            ['Ana', 'Uno', 'federado', '11.111.111-1'],
+            ['Rep', 'Existente', 'AMATEUR', '12345678-5'],
+            ['Sin', '', 'AMATEUR', '22.222.222-2'],
+            ['Mal', 'Dv', 'AMATEUR', '11.111.112-1'],
+            ['Ana', 'Otra', 'AMATEUR', '111111111'],
+            ['Beto', 'Dos', 'XX', '22.222.222-2'],
+        ])
+        # preload de RUTs + 1 INSERT por lote + versión + remarcar (+ savepoint)
+        with self.assertNumQueries(7):
+            creados, reporte = importacion.importar_jugadores(importacion.filas_excel(archivo), tamano_lote=1)
+        self.assertEqual(creados, 2)
+        self.assertEqual(reporte[0], 'Fila 3: RUT duplicado 12345678-5, omitido.')
+        self.assertEqual(reporte[1], 'Fila 4: datos incompletos, omitida.')
+        self.assertTrue(reporte[2].startswith('Fila 5: error RUT'))
+        self.assertEqual(reporte[3], 'Fila 6: RUT duplicado 111111111, omitido.')
+        self.assertEqual(Jugador.objects.get(rut='22.222.222-2').categoria, 'AMATEUR')
+        self.assertEqual(Jugador.objects.get(rut='11.111.111-1').categoria, 'FEDERADO')
+
+    def test_vista_columnas_faltantes(self):
+        import openpyxl
+        wb = openpyxl.Workbook()
+        wb.active.append(['nombre', 'rut'])
+        buf = io.BytesIO()
+        wb.save(buf)
+        buf.seek(0)
+        buf.name = 'malo.xlsx'
+        resp = self.client.post(reverse('importar_jugadores_excel'), {'archivo': buf}, follow=True)
+        self.assertContains(resp, 'Faltan columnas requeridas: apellido, categoria')
+
+
+# ==================== TESTS: IMPORTACIÓN CSV CON UPSERT ====================
+class TestImportacionCSV(TestCase):
+    """import_jugadores_csv: lectura incremental e inserción/actualización por licencia o RUT"""
+
+    def setUp(self):
+        User.objects.create_superuser(username='adm_csv', password='x')
+        self.client.login(username='adm_csv', password='x')
+        self.existente = Jugador.objects.create(nombre='Viejo', apellido='Nombre', categoria='AMATEUR', licencia='CSV-1')
+
+    def _archivo(self, contenido):
+        f = io.BytesIO(contenido.encode('utf-8'))
+        f.name = 'import.csv'
+        return f
+
+    def test_upsert_y_rechazos(self):
+        from . import importacion
+        archivo = self._archivo(
+            '\ufeffNombre,Apellido,Categoria,Licencia,RUT\n'
+            'Nuevo,Nombre,federado,CSV-1,\n'
+            'Otro,Jugador,AMATEUR,CSV-2,11.111.111-1\n'
+            'Rut,Malo,AMATEUR,CSV-3,11.111.112-1\n'
+            'Rep,Etido,AMATEUR,CSV-2,\n'
+            'Sin,Claves,AMATEUR,,\n'
+        )
+        resultado = importacion.upsert_jugadores(importacion.filas_csv(archivo), tamano_lote=1)
+        self.assertEqual((resultado['creados'], resultado['actualizados'], resultado['rechazados']), (1, 1, 3))
+        self.existente.refresh_from_db()
+        self.assertEqual((self.existente.nombre, self.existente.categoria), ('Nuevo', 'FEDERADO'))
+        self.assertEqual(Jugador.objects.get(licencia='CSV-2').rut, '11.111.111-1')
+        self.assertTrue(resultado['reporte'][0].startswith('Fila 4: inválida'))
+        self.assertEqual(resultado['reporte'][1], 'Fila 5: repetida en el archivo, omitida.')
+
+    def test_borrado_durante_la_importacion_no_reaparece(self):
+        from unittest import mock
+        from . import importacion
+        leer = importacion.claves_existentes
+
+        def leer_y_borrar():
+            claves = leer()
+            # Otro usuario borra al jugador mientras se lee el archivo
+            Jugador.objects.filter(pk=self.existente.pk).delete()
+            return claves
+
+        with mock.patch.object(importacion, 'claves_existentes', leer_y_borrar):
+            resultado = importacion.upsert_jugadores([(2, {'nombre': 'Vuelve', 'apellido': 'X', 'licencia': 'CSV-1'})])
+        self.assertEqual((resultado['creados'], resultado['actualizados']), (0, 0))
+        self.assertFalse(Jugador.objects.filter(pk=self.existente.pk).exists())
+
+    def test_vista_reporta_rendimiento(self):
+        resp = self.client.post(reverse('import_jugadores_csv'),
+                                {'file': self._archivo('nombre,apellido,categoria,licencia\nA,B,AMATEUR,CSV-9\n')}, follow=True)
+        mensajes = [str(m) for m in resp.context['messages']]
+        self.assertTrue(any('creados: 1' in m and 'filas/s' in m for m in mensajes))
+
+
+# ==================== TESTS: TRABAJOS EN SEGUNDO PLANO ====================
+class TestTrabajosImportacion(TestCase):
+    """Cola de importaciones en base de datos y endpoint de avance"""
+
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        self.media = tempfile.TemporaryDirectory()
+        self.ajustes = override_settings(MEDIA_ROOT=self.media.name, IMPORTACION_UMBRAL_ASINCRONO=10)
+        self.ajustes.enable()
+        User.objects.create_superuser(username='adm_job', password='x')
+        self.client.login(username='adm_job', password='x')
+
+    def tearDown(self):
+        self.ajustes.disable()
+        self.media.cleanup()
+
+    def test_encolar_reclamar_y_ejecutar(self):
+        from . import trabajos
+        from .models import TrabajoImportacion
+        f = io.BytesIO('nombre,apellido,categoria,licencia\nA,B,AMATEUR,JOB-1\nC,D,AMATEUR,\n'.encode('utf-8'))
+        f.name = 'grande.csv'
+        resp = self.client.post(reverse('import_jugadores_csv'), {'file': f})
+        trabajo = TrabajoImportacion.objects.get()
+        self.assertRedirects(resp, reverse('detalle_trabajo', args=[trabajo.id]))
+        self.assertFalse(Jugador.objects.filter(licencia='JOB-1').exists())
+
+        self.assertEqual(trabajos.reclamar_siguiente(), trabajo.id)
+        self.assertIsNone(trabajos.reclamar_siguiente())
+        trabajos.ejecutar(trabajo.id)
+
+        estado = self.client.get(reverse('estado_trabajo', args=[trabajo.id])).json()
+        self.assertEqual(estado['estado'], 'COMPLETADO')
+        self.assertEqual((estado['filas_procesadas'], estado['creados'], estado['rechazados']), (2, 1, 1))
+        self.assertTrue(estado['terminado'])
+        self.assertTrue(Jugador.objects.filter(licencia='JOB-1').exists())
+
+    def test_error_queda_registrado(self):
+        from . import trabajos
+        from django.core.files.base import ContentFile
+        from .models import TrabajoImportacion
+        trabajo = TrabajoImportacion.objects.create(tipo='JUGADORES_EXCEL', archivo=ContentFile(b'no es excel', name='x.xlsx'))
+        trabajos.ejecutar(trabajos.reclamar_siguiente())
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, 'ERROR')
+        self.assertIn('Error leyendo Excel', trabajo.error)
+
+    def test_solo_reencola_sin_latido(self):
+        from . import trabajos
+        from django.core.files.base import ContentFile
+        from .models import TrabajoImportacion
+        hace_horas = timezone.now() - timedelta(hours=3)
+        vivo, caido = [TrabajoImportacion.objects.create(tipo='JUGADORES_CSV', estado='EN_CURSO', iniciado_en=hace_horas,
+                                                         archivo=ContentFile(b'x', name=f'{n}.csv'))
+                       for n in ('vivo', 'caido')]
+        TrabajoImportacion.objects.filter(pk=vivo.pk).update(latido_en=timezone.now())
+        TrabajoImportacion.objects.filter(pk=caido.pk).update(latido_en=hace_horas)
+        self.assertEqual(trabajos.liberar_colgados(10), 1)
+        self.assertEqual(TrabajoImportacion.objects.get(pk=vivo.pk).estado, 'EN_CURSO')
+        self.assertEqual(TrabajoImportacion.objects.get(pk=caido.pk).estado, 'PENDIENTE')
+
+    def test_worker_revisa_colgados_con_la_cola_vacia(self):
+        import itertools
+        from unittest import mock
+        from django.core.management import call_command
+        from . import trabajos
+        from .management.commands import procesar_trabajos
+        # Cada lectura del reloj avanza 100 s: la revisión periódica ya venció en la primera vuelta
+        with mock.patch.object(procesar_trabajos.time, 'monotonic', side_effect=itertools.count(0, 100)), \
+                mock.patch.object(trabajos, 'liberar_colgados', return_value=0) as liberar:
+            call_command('procesar_trabajos', una_vez=True, stdout=io.StringIO())
+        self.assertEqual(liberar.call_count, 2)
+
+
+class TestAvanceTrabajoEnVivo(TransactionTestCase):
+    """El avance se confirma entre lotes: otra conexión lo ve mientras la importación sigue"""
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.ajustes = override_settings(MEDIA_ROOT=self.media.name)
+        self.ajustes.enable()
+
+    def tearDown(self):
+        self.ajustes.disable()
+        self.media.cleanup()
+
+    def test_avance_visible_desde_otro_hilo(self):
+        import threading
+        from unittest import mock
+        from django.core.files.base import ContentFile
+        from django.db import connection
+        from . import trabajos
+        from .models import TrabajoImportacion
+        # La tercera fila no tiene apellido: el rechazo se ve en el lote donde ocurre
+        filas = ''.join(f'Vivo{i},{"" if i == 2 else "X"},AMATEUR,VIVO-{i}\n' for i in range(5))
+        TrabajoImportacion.objects.create(
+            tipo='JUGADORES_CSV', archivo=ContentFile(('nombre,apellido,categoria,licencia\n' + filas).encode(), name='v.csv'))
+        trabajo_id = trabajos.reclamar_siguiente()
+        vistos = []
+        registrar = trabajos.registrar_avance
+
+        def espiar(tid, leidas, reporte):
+            registrar(tid, leidas, reporte)
+
+            def leer():
+                try:
+                    trabajo = TrabajoImportacion.objects.get(pk=tid)
+                    vistos.append((trabajo.filas_procesadas, trabajo.rechazados, Jugador.objects.count()))
+                finally:
+                    connection.close()
+            hilo = threading.Thread(target=leer)
+            hilo.start()
+            hilo.join()
+
+        with mock.patch.object(trabajos, 'registrar_avance', espiar), mock.patch.object(trabajos, 'LOTE', 2):
+            trabajos.ejecutar(trabajo_id)
+        # Avance, rechazos y jugadores ya confirmados en cada lote, no al final
+        self.assertEqual(vistos, [(2, 0, 2), (4, 1, 3), (5, 1, 4)])
+        self.assertEqual(TrabajoImportacion.objects.get(pk=trabajo_id).estado, 'COMPLETADO')
+
+
+# ==================== TESTS: CACHÉ DE ARTEFACTOS ====================
+class TestArtefactosRanking(TestCase):
+    """Exportaciones del ranking servidas desde disco según ContadorVersion"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ajustes = override_settings(ARTEFACTOS_ROOT=self.dir.name)
+        self.ajustes.enable()
+        User.objects.create_superuser(username='adm_art', password='x')
+        self.client.login(username='adm_art', password='x')
+        self.j = Jugador.objects.create(nombre='Art', apellido='Efacto', categoria='AMATEUR', licencia='ART-1')
+        self.rk = Ranking.objects.create(jugador=self.j, puntos=10)
+
+    def tearDown(self):
+        self.ajustes.disable()
+        self.dir.cleanup()
+
+    def test_version_sube_con_puntos(self):
+        from .models import ContadorVersion
+        v = ContadorVersion.actual('ranking')
+        self.rk.agregar_puntos(5)
+        Ranking.incrementar({self.j.id: 3})
+        self.assertEqual(ContadorVersion.actual('ranking'), v + 2)
+
+    def test_generacion_unica_y_etag(self):
+        from unittest import mock
+        from . import exportaciones
+        url = reverse('export_ranking_pdf')
+        with mock.patch.object(exportaciones, 'escribir_ranking_pdf', wraps=exportaciones.escribir_ranking_pdf) as gen:
+            r1 = self.client.get(url)
+            cuerpo = b''.join(r1.streaming_content)
+            r2 = self.client.get(url)
+            self.assertEqual(b''.join(r2.streaming_content), cuerpo)
+            self.assertEqual(gen.call_count, 1)
+            self.assertEqual(int(r1['Content-Length']), len(cuerpo))
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=r1['ETag']).status_code, 304)
+            self.rk.agregar_puntos(1)
+            r3 = self.client.get(url)
+            self.assertNotEqual(r3['ETag'], r1['ETag'])
+            self.assertEqual(gen.call_count, 2)
+        # La versión anterior se borra del disco
+        self.assertEqual(len(os.listdir(self.dir.name)), 1)
+
+    def test_fallo_concurrente_genera_una_vez(self):
+        import threading
+        from . import artefactos
+        llamadas = []
+
+        def generar(archivo):
+            llamadas.append(1)
+            time.sleep(0.2)
+            archivo.write(b'contenido')
+
+        hilos = [threading.Thread(target=artefactos.obtener, args=('prueba', 7, 'bin', generar)) for _ in range(6)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(artefactos.ruta_artefacto('prueba', 7, 'bin').read_bytes(), b'contenido')
+
+    def test_version_lenta_no_borra_una_mas_nueva(self):
+        from . import artefactos
+        artefactos.obtener('prueba', 6, 'bin', lambda archivo: archivo.write(b'v6'))
+        artefactos.obtener('prueba', 8, 'bin', lambda archivo: archivo.write(b'v8'))
+        # Un request lento termina la v7 después de que otro generó la v8
+        artefactos.obtener('prueba', 7, 'bin', lambda archivo: archivo.write(b'v7'))
+        self.assertEqual(sorted(os.listdir(self.dir.name)), ['prueba-v7.bin', 'prueba-v8.bin'])
+
+    def test_archivo_borrado_antes_de_abrir_se_regenera(self):
+        from unittest import mock
+        from . import artefactos
+        real = artefactos.obtener
+        llamadas = []
+
+        def obtener_y_perder(*args):
+            ruta = real(*args)
+            if not llamadas:
+                ruta.unlink()
+            llamadas.append(ruta)
+            return ruta
+
+        with mock.patch.object(artefactos, 'obtener', side_effect=obtener_y_perder):
+            resp = artefactos.respuesta('prueba', 3, 'bin', lambda archivo: archivo.write(b'ok'), 'p.bin',
+                                        'application/octet-stream')
+        self.assertEqual(b''.join(resp.streaming_content), b'ok')
+        self.assertEqual(len(llamadas), 2)
+
+
+# ==================== TESTS: QR EN CACHÉ Y CREDENCIALES ====================
+class TestQRCredenciales(TestCase):
+    """QR cacheado con ETag y hoja de credenciales del torneo"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.ajustes = override_settings(ARTEFACTOS_ROOT=self.dir.name)
+        self.ajustes.enable()
+        from . import qr
+        qr.png.cache_clear()
+        User.objects.create_superuser(username='adm_qr', password='x')
+        self.client.login(username='adm_qr', password='x')
+        self.torneo = Torneo.objects.create(nombre='T QR', direccion='D', fecha=date(2025,12,14), categoria='ADULTO', cupos_max=20)
+        self.jugadores = []
+        for i in range(9):
+            j = Jugador.objects.create(nombre=f'Q{i}', apellido='Credencial', categoria='AMATEUR', licencia=f'QR-{i}')
+            Inscripcion.objects.create(torneo=self.torneo, jugador=j)
+            self.jugadores.append(j)
+
+    def tearDown(self):
+        self.ajustes.disable()
+        self.dir.cleanup()
+
+    def test_qr_etag_y_cache_control(self):
+        url = reverse('jugador_qr', args=[self.jugadores[0].id])
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('max-age', resp['Cache-Control'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=resp['ETag']).status_code, 304)
+        self.assertEqual(len(os.listdir(os.path.join(self.dir.name, 'qr'))), 1)
+        self.jugadores[0].delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=resp['ETag']).status_code, 404)
+
+    def test_lote_en_paralelo_igual_a_secuencial(self):
+        from unittest import mock
+        from . import qr
+        textos = [f'https://ejemplo.cl/public/jugador/{i}/' for i in range(4)]
+        with mock.patch.object(qr, 'MINIMO_PARALELO', 2):
+            lote = qr.png_lote(textos, procesos=2)
+        self.assertEqual(lote[textos[0]], qr.codificar_png(textos[0]))
+        self.assertEqual(len(os.listdir(os.path.join(self.dir.name, 'qr'))), 4)
+
+    def test_hoja_credenciales_multipagina(self):
+        resp = self.client.get(reverse('credenciales_torneo', args=[self.torneo.id]))
+        self.assertEqual(resp.status_code, 200)
+        pdf = b''.join(resp.streaming_content)
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertEqual(pdf.count(b'/Type /Page\n'), 2)
+
+
+# ==================== TESTS: RUT CANÓNICO ====================
+class TestRutCanonico(TestCase):
+    """rut_canonico: sincronizado en save, único y usado para detectar duplicados"""
+
+    def test_save_sincroniza_canonico(self):
+        j = Jugador.objects.create(nombre='Can', apellido='Onico', categoria='AMATEUR', rut='7.654.321-6')
+        self.assertEqual(j.rut_canonico, '76543216')
+        j.rut = '12.345.678-5'
+        j.save(update_fields=['rut'])
+        j.refresh_from_db()
+        self.assertEqual(j.rut_canonico, '123456785')
+
+    def test_duplicado_con_otro_formato(self):
+        Jugador.objects.create(nombre='Uno', apellido='A', categoria='AMATEUR', rut='12.345.678-5')
+        otro = Jugador(nombre='Dos', apellido='B', categoria='AMATEUR', rut='12345678-5')
+        with self.assertRaises(ValidationError):
+            otro.full_clean()
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                otro.save()
+
+    def test_duplicado_heredado_sigue_editable(self):
+        """Los duplicados que la migración dejó con rut_canonico NULL se pueden editar."""
+        from . import importacion
+        from .forms import FormJugador
+        Jugador.objects.create(nombre='Uno', apellido='A', categoria='AMATEUR', rut='12.345.678-5')
+        heredado = Jugador.objects.create(nombre='Dos', apellido='B', categoria='AMATEUR', licencia='HER-1')
+        Jugador.objects.filter(pk=heredado.pk).update(rut='12345678-5', rut_canonico=None)
+        heredado = Jugador.objects.get(pk=heredado.pk)
+        form = FormJugador({'nombre': 'Dos', 'apellido': 'Editado', 'categoria': 'AMATEUR', 'rut': '12345678-5'},
+                           instance=heredado)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        heredado.refresh_from_db()
+        self.assertEqual((heredado.apellido, heredado.rut_canonico), ('Editado', None))
+        # Cambiarlo a otro formato del mismo RUT sí es un duplicado
+        form = FormJugador({'nombre': 'Dos', 'apellido': 'B', 'categoria': 'AMATEUR', 'rut': '123456785'},
+                           instance=Jugador.objects.get(pk=heredado.pk))
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['rut'], ['El RUT ingresado ya está registrado.'])
+        # La importación por licencia tampoco choca con la unicidad
+        resultado = importacion.upsert_jugadores([(2, {'nombre': 'Dos', 'apellido': 'Csv', 'licencia': 'HER-1'})])
+        self.assertEqual(resultado['actualizados'], 1)
+        self.assertIsNone(Jugador.objects.get(pk=heredado.pk).rut_canonico)
+
+    def test_validacion_por_lotes(self):
+        from .models import validar_ruts_chilenos
+        errores = validar_ruts_chilenos(['12.345.678-5', '123456785', '11.111.112-1', 'ABC', ''])
+        self.assertIsNone(errores['12.345.678-5'])
+        self.assertIsNone(errores['123456785'])
+        self.assertIn('dígito verificador', errores['11.111.112-1'])
+        self.assertIsNotNone(errores['ABC'])
+        self.assertIsNone(errores[''])
+
+    def test_importacion_detecta_formato_distinto(self):
+        from . import importacion
+        Jugador.objects.create(nombre='Ya', apellido='Existe', categoria='AMATEUR', rut='12345678-5')
+        filas = [(2, {'nombre': 'Rep', 'apellido': 'Puntos', 'categoria': 'AMATEUR', 'rut': '12.345.678-5'}),
+                 (3, {'nombre': 'Nue', 'apellido': 'Vo', 'categoria': 'AMATEUR', 'rut': '7654321-6'})]
+        creados, reporte = importacion.importar_jugadores(filas)
+        self.assertEqual(creados, 1)
+        self.assertEqual(reporte, ['Fila 2: RUT duplicado 12.345.678-5, omitido.'])
+        self.assertEqual(Jugador.objects.get(rut='7654321-6').rut_canonico, '76543216')
+
+
+# ==================== TESTS: SNAPSHOT NDJSON ====================
+class TestSnapshot(TestCase):
+    """Volcado gzip NDJSON completo e incremental (/api/v2/snapshot/)"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='adm_snap', password='x')
+        self.j1 = Jugador.objects.create(nombre='Snap', apellido='Uno', categoria='AMATEUR', rut='12.345.678-5')
+        self.j2 = Jugador.objects.create(nombre='Snap', apellido='Dos', categoria='AMATEUR', licencia='SNAP-2')
+        self.torneo = Torneo.objects.create(nombre='T Snap', direccion='D', fecha=date(2025,3,1), categoria='ADULTO')
+        Inscripcion.objects.create(torneo=self.torneo, jugador=self.j1)
+
+    def _lineas(self, resp):
+        import gzip
+        import json
+        return [json.loads(l) for l in gzip.decompress(b''.join(resp.streaming_content)).decode('utf-8').splitlines()]
+
+    def test_requiere_staff(self):
+        self.assertIn(self.client.get(reverse('api_snapshot')).status_code, (401, 403))
+
+    def test_volcado_completo(self):
+        self.client.force_login(self.admin)
+        resp = self.client.get(reverse('api_snapshot'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/gzip')
+        lineas = self._lineas(resp)
+        self.assertEqual(lineas[0]['modelo'], 'snapshot')
+        self.assertIsNone(lineas[0]['updated_since'])
+        modelos = [l['modelo'] for l in lineas[1:]]
+        self.assertEqual(modelos.count('jugador'), 2)
+        self.assertEqual(modelos.count('inscripcion'), 1)
+        torneo = next(l for l in lineas if l['modelo'] == 'torneo')
+        self.assertEqual(torneo['inscritos_count'], 1)
+        self.assertEqual(torneo['fecha'], '2025-03-01')
+
+    def test_incremental_y_fecha_invalida(self):
+        self.client.force_login(self.admin)
+        corte = timezone.now()
+        Jugador.objects.filter(pk=self.j2.pk).update(actualizado_en=corte + timedelta(seconds=1))
+        Jugador.objects.exclude(pk=self.j2.pk).update(actualizado_en=corte - timedelta(days=1))
+        Torneo.objects.update(actualizado_en=corte - timedelta(days=1))
+        Inscripcion.objects.update(actualizado_en=corte - timedelta(days=1))
+        resp = self.client.get(reverse('api_snapshot'), {'updated_since': corte.isoformat()})
+        lineas = self._lineas(resp)
+        self.assertEqual([(l['modelo'], l['id']) for l in lineas[1:]], [('jugador', self.j2.id)])
+        self.assertEqual(self.client.get(reverse('api_snapshot'), {'updated_since': 'ayer'}).status_code, 400)
+
+    def test_incremental_margen_y_membresias(self):
+        """Filas marcadas poco antes del corte y grupos que solo cambian de jugadores."""
+        from . import snapshot
+        grupo = Grupo.objects.create(torneo=self.torneo, nombre='A')
+        grupo.jugadores.add(self.j1)
+        corte = timezone.now()
+        for modelo in (Jugador, Torneo, Inscripcion, Grupo):
+            modelo.objects.update(actualizado_en=corte - timedelta(days=1))
+        # Marcada antes del corte pero confirmada después (transacción en curso al generar)
+        Jugador.objects.filter(pk=self.j2.pk).update(actualizado_en=corte - snapshot.MARGEN / 2)
+        self.j2.grupos.add(grupo)
+        modelos = [(f['modelo'], f.get('jugador_id')) for f in snapshot.filas(corte)]
+        self.assertIn(('jugador', None), modelos)
+        self.assertEqual(sorted(j for m, j in modelos if m == 'grupo_jugador'), [self.j1.id, self.j2.id])
+        self.assertIn(('grupo', None), modelos)
+
+    def test_comando_a_archivo(self):
+        import gzip
+        from django.core.management import call_command
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = os.path.join(tmp, 'snap.ndjson.gz')
+            call_command('snapshot', salida=ruta, stdout=io.StringIO())
+            with gzip.open(ruta, 'rt', encoding='utf-8') as f:
+                self.assertEqual(len(f.read().splitlines()), 1 + 2 + 1 + 1)
+
+
+# ==================== TESTS: API V2 KEYSET / FILTROS ====================
+class TestAPIV2Keyset(TestCase):
+    """Paginación por cursor, filtros y ?fields= en los ViewSets de /api/v2/"""
+
+    def setUp(self):
+        self.torneo = Torneo.objects.create(nombre='T Key', direccion='D', fecha=date(2025,5,1), categoria='ADULTO')
+        self.otro = Torneo.objects.create(nombre='T Otro', direccion='D', fecha=date(2025,6,1), categoria='ADULTO')
+        js = [Jugador.objects.create(nombre=f'K{i}', apellido='Key', categoria='AMATEUR', licencia=f'KEY-{i}') for i in range(6)]
+        for i in range(0, 6, 2):
+            Partido.objects.create(torneo=self.torneo, ronda=1 + i // 2, jugador_a=js[i], jugador_b=js[i + 1])
+        Partido.objects.create(torneo=self.otro, ronda=1, jugador_a=js[0], jugador_b=js[1], ganador=js[0])
+        for j in js:
+            Ranking.objects.create(jugador=j, puntos=5)
+
+    def test_cursor_recorre_sin_repetir(self):
+        vistos, url = [], '/api/v2/ranking/?limit=4'
+        while url:
+            datos = self.client.get(url).json()
+            self.assertLessEqual(len(datos['results']), 4)
+            vistos += [r['id'] for r in datos['results']]
+            url = datos['next']
+        self.assertEqual(sorted(vistos), sorted(Ranking.objects.values_list('id', flat=True)))
+        self.assertEqual(len(vistos), len(set(vistos)))
+
+    def test_limite_con_tope(self):
+        from unittest import mock
+        from .paginacion import PaginacionKeyset
+        with mock.patch.object(PaginacionKeyset, 'maximo', 3):
+            datos = self.client.get('/api/v2/jugadores/?limit=1000').json()
+        self.assertEqual(len(datos['results']), 3)
+        self.assertIsNotNone(datos['next'])
+
+    def test_filtros_y_campos(self):
+        resp = self.client.get('/api/v2/partidos/', {'torneo': self.torneo.id, 'pendiente': '1',
+                                                     'fields': 'id,ronda,jugadorA'})
+        datos = resp.json()['results']
+        self.assertEqual([p['ronda'] for p in datos], [1, 2, 3])
+        self.assertEqual(set(datos[0]), {'id', 'ronda', 'jugadorA'})
+        jugador = Partido.objects.filter(torneo=self.otro).get().jugador_b_id
+        self.assertEqual(len(self.client.get('/api/v2/partidos/', {'jugador': jugador}).json()['results']), 2)
+        self.assertEqual(self.client.get('/api/v2/partidos/', {'torneo': 'abc'}).status_code, 400)
+
+
+# ==================== TESTS: GET CONDICIONAL ====================
+class TestGetCondicional(TestCase):
+    """ETag / Last-Modified desde ContadorVersion en endpoints móviles y públicos"""
+
+    def setUp(self):
+        self.torneo = Torneo.objects.create(nombre='T Cond', direccion='D', fecha=date(2025,7,1), categoria='ADULTO')
+        self.a = Jugador.objects.create(nombre='Con', apellido='A', categoria='AMATEUR', licencia='COND-A')
+        self.b = Jugador.objects.create(nombre='Con', apellido='B', categoria='AMATEUR', licencia='COND-B')
+        self.partido = Partido.objects.create(torneo=self.torneo, ronda=1, jugador_a=self.a, jugador_b=self.b)
+
+    def test_304_sin_tocar_tablas(self):
+        url = reverse('mobile_tournament_matches', args=[self.torneo.id])
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('Last-Modified', resp)
+        etag = resp['ETag']
+        # Solo la lectura de versiones
+        with self.assertNumQueries(1):
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_escrituras_cambian_etag(self):
+        url = reverse('mobile_tournament_matches', args=[self.torneo.id])
+        etag = self.client.get(url)['ETag']
+        self.partido.sets_a = 1
+        self.partido.save()
+        nuevo = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(nuevo.status_code, 200)
+        # Otro torneo no invalida este
+        Torneo.objects.create(nombre='Otro', direccion='D', fecha=date(2025,7,2), categoria='ADULTO')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=nuevo['ETag']).status_code, 304)
+        # Operaciones masivas sin señales también versionan
+        from . import generador
+        generador.generar_ronda(self.torneo, [self.a, self.b], 2)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=nuevo['ETag']).status_code, 200)
+
+    def test_ranking_publico_y_api(self):
+        Ranking.objects.create(jugador=self.a, puntos=3)
+        for nombre in ('api_ranking', 'ranking_public'):
+            etag = self.client.get(reverse(nombre))['ETag']
+            self.assertEqual(self.client.get(reverse(nombre), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        etag = self.client.get(reverse('api_ranking'))['ETag']
+        self.a.nombre = 'Renombrado'
+        self.a.save()
+        self.assertEqual(self.client.get(reverse('api_ranking'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+# ==================== TESTS: SYNC MÓVIL ====================
+class TestSyncMovil(TestCase):
+    """/api/sync/: cambios desde un token y tombstones de eliminados"""
+
+    def setUp(self):
+        self.torneo = Torneo.objects.create(nombre='T Sync', direccion='D', fecha=date(2025,8,1), categoria='ADULTO')
+        self.a = Jugador.objects.create(nombre='Syn', apellido='A', categoria='AMATEUR', licencia='SYNC-A')
+        self.b = Jugador.objects.create(nombre='Syn', apellido='B', categoria='AMATEUR', licencia='SYNC-B')
+        self.partido = Partido.objects.create(torneo=self.torneo, ronda=1, jugador_a=self.a, jugador_b=self.b)
+        Inscripcion.objects.create(torneo=self.torneo, jugador=self.a)
+
+    def _envejecer(self):
+        """Simula que todo lo actual ocurrió antes del token (evita depender del reloj)."""
+        from . import sincronizacion
+        viejo = timezone.now() - sincronizacion.MARGEN - timedelta(minutes=1)
+        for modelo in (Torneo, Jugador, Partido, Inscripcion, Ranking):
+            modelo.objects.update(actualizado_en=viejo)
+        from .models import Eliminacion
+        Eliminacion.objects.update(eliminado_en=viejo)
+
+    def test_completo_y_luego_vacio(self):
+        datos = self.client.get(reverse('mobile_sync')).json()
+        self.assertTrue(datos['full'])
+        self.assertEqual(len(datos['players']), 2)
+        self.assertEqual(datos['matches'][0]['tournamentId'], str(self.torneo.id))
+        self.assertEqual(datos['registrations'][0]['status'], 'INSCRITO')
+        self._envejecer()
+        vacio = self.client.get(reverse('mobile_sync'), {'since': datos['token']}).json()
+        self.assertFalse(vacio['full'])
+        self.assertEqual([vacio[k] for k in ('tournaments', 'players', 'matches', 'registrations')], [[], [], [], []])
+        self.assertEqual(self.client.get(reverse('mobile_sync'), {'since': 'x'}).status_code, 400)
+
+    def test_cambios_y_eliminados(self):
+        token = self.client.get(reverse('mobile_sync')).json()['token']
+        self._envejecer()
+        self.partido.sets_a = 1
+        self.partido.save()
+        Ranking.objects.create(jugador=self.b, puntos=7)
+        otro = Torneo.objects.create(nombre='Borrar', direccion='D', fecha=date(2025,8,2), categoria='ADULTO')
+        otro_id = otro.id
+        otro.delete()
+        Inscripcion.objects.get(jugador=self.a).delete()
+        datos = self.client.get(reverse('mobile_sync'), {'since': token}).json()
+        self.assertEqual([m['id'] for m in datos['matches']], [str(self.partido.id)])
+        self.assertEqual([(p['id'], p['points']) for p in datos['players']], [(str(self.b.id), 7)])
+        self.assertIn(str(otro_id), datos['deleted']['tournaments'])
+        self.assertEqual(len(datos['deleted']['registrations']), 1)
+        # El torneo vigente viaja porque cambió su contador de inscritos
+        self.assertEqual([t['id'] for t in datos['tournaments']], [str(self.torneo.id)])
+
+    def test_token_fuera_de_retencion_y_poda(self):
+        from . import sincronizacion
+        from .models import Eliminacion
+        Torneo.objects.create(nombre='Borrar', direccion='D', fecha=date(2025,8,2), categoria='ADULTO').delete()
+        vencido = timezone.now() - sincronizacion.RETENCION - timedelta(days=1)
+        Eliminacion.objects.update(eliminado_en=vencido)
+        datos = self.client.get(reverse('mobile_sync'),
+                                {'since': sincronizacion.codificar_token(vencido)}).json()
+        self.assertTrue(datos['full'])
+        self.assertEqual(len(datos['players']), 2)
+        self.assertEqual(sincronizacion.podar_eliminaciones(), 1)
+        self.assertFalse(Eliminacion.objects.exists())
+
+    def test_importacion_larga_se_marca_al_confirmar(self):
+        """Una importación en una sola transacción deja sus filas con la hora del commit."""
+        from types import SimpleNamespace
+        from unittest import mock
+        from . import importacion, sincronizacion
+        token = self.client.get(reverse('mobile_sync')).json()['token']
+        self._envejecer()
+        ahora = timezone.now
+        # Las filas se marcan una hora antes del commit, como en una transacción lenta;
+        # solo remarcar ve el reloj real
+        with mock.patch('django.utils.timezone.now', return_value=ahora() - timedelta(hours=1)), \
+                mock.patch.object(sincronizacion, 'timezone', SimpleNamespace(now=ahora)):
+            filas = [(2, {'nombre': 'Imp', 'apellido': 'Sync', 'categoria': 'AMATEUR', 'rut': '7654321-6'})]
+            creados, _ = importacion.importar_jugadores(filas)
+        self.assertEqual(creados, 1)
+        datos = self.client.get(reverse('mobile_sync'), {'since': token}).json()
+        # remarcar también alcanza a los jugadores envejecidos dentro de esa hora: solo se repiten
+        self.assertIn('Imp Sync', [p['name'] for p in datos['players']])
+
+
+# ==================== TESTS: BUNDLE DE TORNEO ====================
+class TestBundleTorneo(TestCase):
+    """/api/tournaments/<id>/bundle/: una respuesta y consultas fijas"""
+
+    def _torneo(self, n):
+        from . import generador
+        torneo = Torneo.objects.create(nombre=f'T Bundle {n}', direccion='D', fecha=date(2025,9,1),
+                                       categoria='ADULTO', cupos_max=n)
+        for i in range(n):
+            j = Jugador.objects.create(nombre=f'B{n}-{i}', apellido='Bun', categoria='AMATEUR', licencia=f'BUN-{n}-{i}')
+            Ranking.objects.create(jugador=j, puntos=i * 10)
+            Inscripcion.objects.create(torneo=torneo, jugador=j)
+        generador.generar_grupos(torneo)
+        return torneo
+
+    def test_consultas_fijas(self):
+        chico, grande = self._torneo(4), self._torneo(12)
+        # versiones + torneo + partidos + inscritos con posición + grupos + tablas
+        for torneo in (chico, grande):
+            with self.assertNumQueries(6):
+                resp = self.client.get(reverse('mobile_tournament_bundle', args=[torneo.id]))
+            self.assertEqual(resp.status_code, 200)
+        datos = resp.json()
+        self.assertEqual(datos['tournament']['maxPlayers'], 12)
+        self.assertEqual(len(datos['players']), 12)
+        self.assertEqual(sum(len(f['matches']) for f in datos['phases']), Partido.objects.filter(torneo=grande).count())
+        self.assertTrue(datos['groups'] and datos['groups'][0]['standings'])
+
+    def test_posiciones_en_una_consulta(self):
+        torneo = self._torneo(4)
+        sin_ranking = Jugador.objects.create(nombre='Sin', apellido='Rank', categoria='AMATEUR', licencia='BUN-SR')
+        torneo.cupos_max = 5
+        torneo.save()
+        Inscripcion.objects.create(torneo=torneo, jugador=sin_ranking)
+        # versiones + inscritos; el torneo solo se consulta si la lista sale vacía
+        with self.assertNumQueries(2):
+            datos = self.client.get(reverse('mobile_tournament_players', args=[torneo.id])).json()
+        rangos = {p['name']: p['rank'] for p in datos}
+        self.assertEqual(rangos['B4-3'], 1)
+        self.assertEqual(rangos['B4-0'], 4)
+        self.assertEqual(rangos['Sin'], 0)
+
+
+# ==================== TESTS: PROYECCIONES MÓVILES ====================
+
+class TestProyeccionesContrato(TestCase):
+    """Las proyecciones values() producen el mismo JSON, byte a byte, que los serializers"""
+
+    def setUp(self):
+        self.torneo = Torneo.objects.create(nombre='Contrato', direccion='Dir', fecha=date(2025,10,1),
+                                            categoria='ADULTO', cupos_max=8, total_rondas=3)
+        Torneo.objects.create(nombre='Otro', direccion='Dir', fecha=date(2025,11,1), categoria='AMATEUR')
+        self.jugadores = []
+        for i, origen in enumerate(['Club Ñuñoa', None, 'Club B']):
+            j = Jugador.objects.create(nombre=f'Con{i}', apellido='Trato', categoria='AMATEUR',
+                                       licencia=f'CON-{i}', origen=origen)
+            if i:  # Con0 queda sin ranking
+                Ranking.objects.create(jugador=j, puntos=i * 10)
+            Inscripcion.objects.create(torneo=self.torneo, jugador=j)
+            self.jugadores.append(j)
+        a, b, c = self.jugadores
+        Partido.objects.create(torneo=self.torneo, ronda=1, jugador_a=a, jugador_b=b, sets_a=2, sets_b=1, ganador=a)
+        Partido.objects.create(torneo=self.torneo, ronda=2, jugador_a=b, jugador_b=c, sets_a=1)
+        Partido.objects.create(torneo=self.torneo, ronda=5, jugador_a=c, jugador_b=a)
+        Resultado.objects.create(torneo=self.torneo, jugador1=a, jugador2=b, marcador_j1=3, marcador_j2=1)
+
+    def _bytes(self, proyectado, serializado):
+        """(JSON de la proyección sin camelize, JSON del serializer con CamelCaseJSONRenderer)"""
+        from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+        from rest_framework.renderers import JSONRenderer
+        return JSONRenderer().render(proyectado), CamelCaseJSONRenderer().render(serializado)
+
+    def assertMismoJSON(self, serializer, proyeccion, qs):
+        self.assertEqual(*self._bytes(proyeccion.lista(qs), serializer(qs, many=True).data))
+
+    def test_endpoints_de_lectura(self):
+        from django.db.models.functions import Coalesce
+        from . import mobile_serializers as ms, proyecciones as pr
+        self.assertMismoJSON(ms.MobileTournamentSerializer, pr.TORNEOS, Torneo.objects.order_by('-fecha', 'id'))
+        self.assertMismoJSON(ms.MobilePlayerSerializer, pr.JUGADORES,
+                             Jugador.objects.annotate(puntos=Coalesce('ranking__puntos', 0)).order_by('id'))
+        self.assertMismoJSON(ms.MobileMatchSerializer, pr.PARTIDOS, Partido.objects.order_by('ronda', 'id'))
+        self.assertMismoJSON(ms.MobileResultSerializer, pr.RESULTADOS, Resultado.objects.order_by('-id'))
+        # Inscritos: el serializer recibe jugadores; la posición se calcula sin anotar
+        jugadores = [i.jugador for i in Inscripcion.objects.filter(torneo=self.torneo).order_by('fecha_inscripcion', 'id')]
+        inscritos = Inscripcion.objects.filter(torneo=self.torneo).order_by('fecha_inscripcion', 'id')
+        self.assertEqual(*self._bytes(pr.INSCRITOS.lista(inscritos),
+                                      ms.MobileTournamentPlayerSerializer(jugadores, many=True).data))
+
+    def test_detalle_y_vistas(self):
+        from . import mobile_serializers as ms
+        self.torneo.refresh_from_db()
+        # Armado como lo hacía la vista antes de las proyecciones
+        detalle = ms.MobileTournamentSerializer(self.torneo).data
+        detalle.update({'description': 'Torneo de categoría ADULTO', 'maxPlayers': 8, 'currentRound': 3})
+        resp = self.client.get(reverse('mobile_tournament_detail', args=[self.torneo.id]))
+        self.assertEqual(resp.content, self._bytes(None, detalle)[1])
+        for nombre in ('mobile_tournament_detail', 'mobile_tournament_matches', 'mobile_tournament_players'):
+            self.assertEqual(self.client.get(reverse(nombre, args=[9999])).status_code, 404)
+        vacio = Torneo.objects.create(nombre='Vacío', direccion='Dir', fecha=date(2025,12,1), categoria='AMATEUR')
+        self.assertEqual(self.client.get(reverse('mobile_tournament_matches', args=[vacio.id])).json(), [])
+
+
+# ==================== TESTS: CACHÉ DE RESPUESTAS ====================
+
+class TestCacheRespuestas(TestCase):
+    """Caché de respuestas con clave por versión: invalidación por torneo y ratio de aciertos"""
+
+    def setUp(self):
+        from . import cache_respuestas
+        cache_respuestas.cache().clear()
+        self.a = Jugador.objects.create(nombre='Cache', apellido='A', categoria='AMATEUR', licencia='CACHE-A')
+        self.b = Jugador.objects.create(nombre='Cache', apellido='B', categoria='AMATEUR', licencia='CACHE-B')
+        self.torneos = []
+        for i in range(2):
+            torneo = Torneo.objects.create(nombre=f'T Cache {i}', direccion='D', fecha=date(2025,8,1 + i), categoria='ADULTO')
+            Partido.objects.create(torneo=torneo, ronda=1, jugador_a=self.a, jugador_b=self.b)
+            self.torneos.append(torneo)
+
+    def test_acierto_sin_consultar_tablas(self):
+        url = reverse('mobile_tournament_matches', args=[self.torneos[0].id])
+        primera = self.client.get(url)
+        # Solo la lectura de versiones
+        with self.assertNumQueries(1):
+            segunda = self.client.get(url)
+        self.assertEqual(segunda.content, primera.content)
+        self.assertEqual(segunda['Content-Type'], 'application/json')
+        self.assertEqual(segunda['ETag'], primera['ETag'])
+
+    def test_resultado_invalida_solo_su_torneo(self):
+        urls = [reverse('mobile_tournament_matches', args=[t.id]) for t in self.torneos]
+        for url in urls:
+            self.client.get(url)
+        partido = Partido.objects.get(torneo=self.torneos[0])
+        partido.sets_a, partido.sets_b, partido.ganador = 2, 0, self.a
+        partido.save()
+        self.assertEqual(self.client.get(urls[0]).json()[0]['status'], 'finished')
+        with self.assertNumQueries(1):
+            self.client.get(urls[1])
+
+    def test_estadisticas(self):
+        import json
+        url = reverse('api_jugadores')
+        for _ in range(3):
+            # En streaming la respuesta se guarda al terminar de enviarla
+            resp = self.client.get(url)
+            if resp.streaming:
+                b''.join(resp.streaming_content)
+        Jugador.objects.create(nombre='Nuevo', apellido='C', categoria='AMATEUR', licencia='CACHE-C')
+        self.assertEqual(len(json.loads(b''.join(self.client.get(url).streaming_content))['jugadores']), 3)
+        self.assertEqual(self.client.get(reverse('api_cache')).status_code, 403)
+        User.objects.create_superuser(username='cache', password='x', email='c@test.com')
+        self.client.login(username='cache', password='x')
+        datos = self.client.get(reverse('api_cache')).json()
+        self.assertEqual(datos['vistas']['api_jugadores'], {'aciertos': 2, 'fallos': 2, 'ratio': 0.5})
+        self.assertIn('mobile_tournament_matches', datos['vistas'])
+
+    def test_clave_solo_con_parametros_de_la_vista(self):
+        from . import cache_respuestas
+        url = reverse('mobile_players')
+        self.client.get(url, {'category': 'amateur', 'limit': 1})
+        # Mismos parámetros en otro orden: acierto
+        with self.assertNumQueries(1):
+            self.client.get(f'{url}?limit=1&category=amateur')
+        # Un parámetro que la vista no lee no se cachea ni se sirve de la caché
+        antes = len(cache_respuestas.cache()._cache)
+        for i in range(3):
+            self.assertEqual(self.client.get(url, {'category': 'amateur', 'limit': 1, 'x': i}).status_code, 200)
+        self.assertEqual(len(cache_respuestas.cache()._cache), antes)
+
+
+# ==================== TESTS: JSON EN STREAMING ====================
+
+class TestListasJSONStreaming(TestCase):
+    """api_jugadores / api_torneos / api_ranking en streaming, con el mismo JSON que JsonResponse"""
+
+    def setUp(self):
+        from . import cache_respuestas
+        cache_respuestas.cache().clear()
+        for i in range(5):
+            j = Jugador.objects.create(nombre=f'Ñandú{i}', apellido='Streaming', categoria='AMATEUR',
+                                       licencia=f'STR-{i}', origen=None if i % 2 else 'Club')
+            Ranking.objects.create(jugador=j, puntos=i)
+        Torneo.objects.create(nombre='T Stream', direccion='D', fecha=date(2025,9,9), categoria='ADULTO')
+
+    def test_bloques_identicos_a_jsonresponse(self):
+        from django.http import JsonResponse
+        from . import streaming
+        filas = list(Jugador.objects.values('id', 'nombre', 'origen'))
+        esperado = JsonResponse({'jugadores': filas}).content
+        bloques = list(streaming.lista_json('jugadores', iter(filas), tamano_bloque=40))
+        self.assertGreater(len(bloques), 2)
+        self.assertEqual(b''.join(bloques), esperado)
+        self.assertEqual(b''.join(streaming.lista_json('vacia', iter([]))), JsonResponse({'vacia': []}).content)
+
+    def test_vistas(self):
+        from django.http import JsonResponse
+        consultas = {
+            'api_jugadores': ('jugadores', Jugador.objects.values('id','nombre','apellido','categoria','rut','origen')),
+            'api_torneos': ('torneos', Torneo.objects.values('id','nombre','fecha','categoria','estado','cupos_max')),
+            'api_ranking': ('ranking', Ranking.objects.order_by('-puntos').values('jugador__nombre','jugador__apellido','puntos')),
+        }
+        for nombre, (clave, qs) in consultas.items():
+            resp = self.client.get(reverse(nombre))
+            self.assertTrue(resp.streaming)
+            self.assertEqual(resp['Content-Type'], 'application/json')
+            self.assertEqual(b''.join(resp.streaming_content), JsonResponse({clave: list(qs)}).content)
+
+    def test_cache_solo_si_cabe(self):
+        url = reverse('api_jugadores')
+        completo = b''.join(self.client.get(url).streaming_content)
+        cacheada = self.client.get(url)
+        self.assertFalse(cacheada.streaming)
+        self.assertEqual(cacheada.content, completo)
+        Jugador.objects.create(nombre='Otro', apellido='S', categoria='AMATEUR', licencia='STR-X')
+        with self.settings(CACHE_RESPUESTAS_MAX_BYTES=100):
+            for _ in range(2):
+                resp = self.client.get(url)
+                self.assertTrue(resp.streaming)
+                b''.join(resp.streaming_content)
+
+
+# ==================== TESTS: LOTE DE RESULTADOS ====================
+
+class TestLoteResultados(TestCase):
+    """/api/matches/finish/batch/: idempotencia por clave, estado por ítem y consultas fijas"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.torneo = Torneo.objects.create(nombre='T Lote', direccion='D', fecha=date(2025,10,10), categoria='ADULTO')
+        self.partidos = []
+        for i in range(10):
+            a = Jugador.objects.create(nombre=f'LoteA{i}', apellido='X', categoria='AMATEUR', licencia=f'LOTE-A{i}')
+            b = Jugador.objects.create(nombre=f'LoteB{i}', apellido='X', categoria='AMATEUR', licencia=f'LOTE-B{i}')
+            self.partidos.append(Partido.objects.create(torneo=self.torneo, ronda=1, jugador_a=a, jugador_b=b))
+
+    def _enviar(self, items):
+        return self.client.post(reverse('mobile_finish_batch'), {'results': items}, format='json')
+
+    def _item(self, clave, partido, ganador=None, score='3-1'):
+        return {'key': clave, 'matchId': str(partido.id), 'winner': ganador or partido.jugador_a.nombre, 'score': score}
+
+    def test_estado_por_item(self):
+        a, b = self.partidos[:2]
+        resp = self._enviar([
+            self._item('k1', a),
+            self._item('k2', b, ganador=b.jugador_b.nombre, score='1-3'),
+            self._item('k3', self.partidos[2], ganador='Nadie'),
+            {'key': 'k4', 'matchId': '999999', 'winner': 'X', 'score': '3-0'},
+            {'key': 'k5', 'matchId': str(a.id), 'winner': 'X', 'score': 'tres'},
+            {'matchId': str(a.id), 'winner': 'X', 'score': '3-0'},
+        ])
+        self.assertEqual(resp.status_code, 200)
+        datos = resp.json()
+        self.assertEqual([r['status'] for r in datos['results']],
+                         ['applied', 'applied', 'invalid', 'not_found', 'invalid', 'invalid'])
+        self.assertEqual(datos['applied'], 2)
+        a.refresh_from_db()
+        b.refresh_from_db()
+        self.assertEqual((a.sets_a, a.sets_b, a.ganador_id), (3, 1, a.jugador_a_id))
+        self.assertEqual(b.ganador_id, b.jugador_b_id)
+        # Ronda 1 de eliminación: 3 + 1 al ganador, 1 al perdedor
+        self.assertEqual(Ranking.objects.get(jugador=a.jugador_a).puntos, 4)
+        self.assertEqual(Ranking.objects.get(jugador=a.jugador_b).puntos, 1)
+
+    def test_reenvio_idempotente(self):
+        from .models import ContadorVersion
+        partido = self.partidos[0]
+        self._enviar([self._item('tab-1', partido)])
+        version = ContadorVersion.actual(ContadorVersion.de_torneo(self.torneo.id))
+        resp = self._enviar([self._item('tab-1', partido), self._item('tab-1', partido, score='3-0')])
+        self.assertEqual([r['status'] for r in resp.json()['results']], ['duplicate', 'conflict'])
+        self.assertEqual(RankingEvent.objects.filter(partido=partido).count(), 2)
+        self.assertEqual(Ranking.objects.get(jugador=partido.jugador_a).puntos, 4)
+        self.assertEqual(ContadorVersion.actual(ContadorVersion.de_torneo(self.torneo.id)), version)
+        # Misma clave repetida dentro de un lote nuevo: se aplica una sola vez
+        otro = self.partidos[1]
+        resp = self._enviar([self._item('tab-2', otro), self._item('tab-2', otro)])
+        self.assertEqual([r['status'] for r in resp.json()['results']], ['applied', 'duplicate'])
+
+    def test_dos_claves_mismo_partido(self):
+        from .models import EnvioResultado
+        partido = self.partidos[0]
+        resp = self._enviar([self._item('p-1', partido),
+                             self._item('p-2', partido, ganador=partido.jugador_b.nombre, score='0-3')])
+        self.assertEqual([r['status'] for r in resp.json()['results']], ['applied', 'conflict'])
+        partido.refresh_from_db()
+        self.assertEqual((partido.sets_a, partido.ganador_id), (3, partido.jugador_a_id))
+        self.assertEqual(list(EnvioResultado.objects.values_list('clave', flat=True)), ['p-1'])
+        # Reenviada sola, la segunda clave se aplica como corrección
+        resp = self._enviar([self._item('p-2', partido, ganador=partido.jugador_b.nombre, score='0-3')])
+        self.assertEqual(resp.json()['results'][0]['status'], 'applied')
+        self.assertEqual(Ranking.objects.get(jugador=partido.jugador_a).puntos, 1)
+
+    def test_consultas_fijas(self):
+        def consultas(partidos, prefijo):
+            from django.db import connection
+            from django.test.utils import CaptureQueriesContext
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self._enviar([self._item(f'{prefijo}{i}', p) for i, p in enumerate(partidos)])
+            self.assertEqual(resp.json()['applied'], len(partidos))
+            return len(ctx)
+        self.assertEqual(consultas(self.partidos[:2], 'c'), consultas(self.partidos[2:], 'd'))
+
+    def test_partido_de_grupo_actualiza_tabla(self):
+        from . import generador
+        jugadores = []
+        for i in range(4):
+            j = Jugador.objects.create(nombre=f'LoteG{i}', apellido='G', categoria='AMATEUR', licencia=f'LOTE-G{i}')
+            Inscripcion.objects.create(torneo=self.torneo, jugador=j)
+            jugadores.append(j)
+        generador.generar_grupos(self.torneo)
+        partido = Partido.objects.filter(torneo=self.torneo, etapa='GRUPOS').first()
+        self._enviar([self._item('g1', partido, score='2-0')])
+        fila = GrupoStanding.objects.get(jugador=partido.jugador_a)
+        self.assertEqual((fila.pj, fila.pg, fila.sa, fila.sb), (1, 1, 2, 0))
+
+    def test_cuerpo_invalido(self):
+        self.assertEqual(self._enviar([]).status_code, 400)
+        self.assertEqual(self.client.post(reverse('mobile_finish_batch'), {'x': 1}, format='json').status_code, 400)
+        self.assertEqual(self._enviar([self._item(f'm{i}', self.partidos[0]) for i in range(201)]).status_code, 400)
+
+
 # ==================== RUNNER DE TESTS ====================
 
 def suite():
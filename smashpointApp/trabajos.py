@@ -0,0 +1,109 @@
+"""
+Cola de trabajos en base de datos para importaciones largas.
+Las vistas encolan un TrabajoImportacion y responden de inmediato; el comando
+`procesar_trabajos` los reclama con un UPDATE condicional (sin broker externo) y los
+ejecuta en un pool de hilos o procesos. La importación se confirma por lotes y el avance
+(con el latido del worker) se guarda entre lotes, fuera de la transacción de datos, así
+que la página de estado lo ve en vivo y la fila del trabajo no queda bloqueada.
+Si un trabajo se reencola tras caer su worker, volver a importar es seguro: el upsert
+CSV es idempotente y la importación Excel omite los RUT ya creados.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from . import importacion
+from .models import TrabajoImportacion
+
+MAX_REPORTE = 500
+# Filas por commit (y por actualización de avance)
+LOTE = importacion.TAMANO_LOTE
+
+
+def es_asincrono(archivo):
+    """Los archivos sobre IMPORTACION_UMBRAL_ASINCRONO se procesan en segundo plano."""
+    return archivo.size > getattr(settings, 'IMPORTACION_UMBRAL_ASINCRONO', 2 * 1024 * 1024)
+
+
+def encolar(tipo, archivo, usuario=None):
+    return TrabajoImportacion.objects.create(
+        tipo=tipo, archivo=archivo, usuario=usuario if usuario and usuario.is_authenticated else None)
+
+
+def reclamar_siguiente():
+    """Toma el trabajo PENDIENTE más antiguo; el UPDATE condicional evita que dos workers tomen el mismo."""
+    while True:
+        trabajo_id = (TrabajoImportacion.objects.filter(estado='PENDIENTE').order_by('creado_en', 'id')
+                      .values_list('id', flat=True).first())
+        if trabajo_id is None:
+            return None
+        ahora = timezone.now()
+        tomado = TrabajoImportacion.objects.filter(pk=trabajo_id, estado='PENDIENTE').update(
+            estado='EN_CURSO', iniciado_en=ahora, latido_en=ahora)
+        if tomado:
+            return trabajo_id
+
+
+def liberar_colgados(minutos=10):
+    """Devuelve a PENDIENTE los trabajos EN_CURSO sin latido en los últimos `minutos` (worker caído).
+
+    Un worker vivo renueva latido_en con cada lote confirmado, así que no se reencola.
+    """
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return TrabajoImportacion.objects.filter(estado='EN_CURSO', latido_en__lt=limite).update(
+        estado='PENDIENTE', iniciado_en=None, latido_en=None, filas_procesadas=0, rechazados=0, reporte=[])
+
+
+def registrar_avance(trabajo_id, filas, reporte):
+    """Guarda el avance y los rechazos hasta ahora y renueva el latido.
+
+    Se llama fuera de la transacción de la importación; cada línea del reporte es una fila rechazada.
+    """
+    TrabajoImportacion.objects.filter(pk=trabajo_id).update(
+        filas_procesadas=filas, rechazados=len(reporte), reporte=reporte[:MAX_REPORTE], latido_en=timezone.now())
+
+
+def procesar(trabajo, filas):
+    """Ejecuta la importación del tipo del trabajo, confirmando por lotes, y devuelve los campos de resultado."""
+    def al_confirmar(leidas, reporte):
+        registrar_avance(trabajo.pk, leidas, reporte)
+
+    if trabajo.tipo == 'JUGADORES_EXCEL':
+        creados, reporte = importacion.importar_jugadores(filas, tamano_lote=LOTE, al_confirmar=al_confirmar)
+        return {'creados': creados, 'rechazados': len(reporte), 'reporte': reporte}
+    resultado = importacion.upsert_jugadores(filas, tamano_lote=LOTE, al_confirmar=al_confirmar)
+    return {'creados': resultado['creados'], 'actualizados': resultado['actualizados'],
+            'rechazados': resultado['rechazados'], 'reporte': resultado['reporte']}
+
+
+def ejecutar(trabajo_id):
+    """Procesa un trabajo ya reclamado. Pensado para correr en un hilo o proceso del pool."""
+    trabajo = TrabajoImportacion.objects.get(pk=trabajo_id)
+    try:
+        with trabajo.archivo.open('rb') as archivo:
+            lector = importacion.filas_excel if trabajo.tipo == 'JUGADORES_EXCEL' else importacion.filas_csv
+            resultado = procesar(trabajo, lector(archivo))
+        resultado['reporte'] = resultado['reporte'][:MAX_REPORTE]
+        TrabajoImportacion.objects.filter(pk=trabajo.pk).update(
+            estado='COMPLETADO', terminado_en=timezone.now(), **resultado)
+    except Exception as e:
+        TrabajoImportacion.objects.filter(pk=trabajo.pk).update(
+            estado='ERROR', error=str(e), terminado_en=timezone.now())
+    return trabajo_id
+
+
+def ejecutar_en_hilo(trabajo_id):
+    """Punto de entrada para ThreadPoolExecutor: cada hilo cierra la conexión que abrió."""
+    try:
+        return ejecutar(trabajo_id)
+    finally:
+        connection.close()
+
+
+def ejecutar_en_proceso(trabajo_id):
+    """Punto de entrada para ProcessPoolExecutor: el proceso hijo inicializa Django."""
+    import django
+    django.setup()
+    return ejecutar_en_hilo(trabajo_id)
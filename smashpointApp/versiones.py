@@ -0,0 +1,70 @@
+"""
+GET condicional (ETag / Last-Modified) a partir de los contadores de ContadorVersion.
+Cada escritura sube el contador de la tabla (y del torneo afectado) vía señales, o
+explícitamente en las operaciones masivas que no las disparan. Las vistas declaran de
+qué contadores dependen: con una sola consulta a ContadorVersion se decide si responder
+304 antes de ejecutar las consultas y la serialización de la vista. Con la misma versión
+se arma la clave de la caché de respuestas (cache_respuestas.py).
+"""
+from functools import wraps
+
+from django.views.decorators.http import condition
+
+from . import cache_respuestas
+from .models import ContadorVersion
+
+JUGADORES = 'jugadores'
+TORNEOS = 'torneos'
+RESULTADOS = 'resultados'
+RANKING = 'ranking'
+# 'torneo:<id>': partidos, inscripciones y datos del torneo
+torneo = ContadorVersion.de_torneo
+
+
+def estado(request, nombres, por_usuario=False):
+    """(etag, last_modified) de los contadores; se calcula una vez por request."""
+    clave = (tuple(nombres), por_usuario)
+    memo = request.__dict__.setdefault('_versiones', {})
+    if clave not in memo:
+        versiones = ContadorVersion.varios(nombres)
+        partes = [f'{n}.{versiones[n][0]}' for n in nombres]
+        if por_usuario:
+            # La página incluye la barra de navegación según el usuario
+            partes.append(f'u{request.user.pk or 0}')
+        fechas = [v[1] for v in versiones.values() if v[1] is not None]
+        memo[clave] = ('"' + '-'.join(partes) + '"', max(fechas) if fechas else None)
+    return memo[clave]
+
+
+def condicional(nombres, por_usuario=False, cachear=True, parametros=()):
+    """Decorador: ETag/Last-Modified de los contadores devueltos por nombres(request, **kwargs).
+
+    Un If-None-Match o If-Modified-Since vigente responde 304 sin ejecutar la vista; si no,
+    y cachear es True, se busca la respuesta en la caché con esa misma versión.
+    `parametros`: los de la query string que lee la vista (ver cache_respuestas).
+    """
+    def decorador(vista):
+        def version(request, *args, **kwargs):
+            return estado(request, nombres(request, *args, **kwargs), por_usuario)
+
+        def etag(request, *args, **kwargs):
+            return version(request, *args, **kwargs)[0]
+
+        def ultima_modificacion(request, *args, **kwargs):
+            return version(request, *args, **kwargs)[1]
+
+        if cachear:
+            vista_cacheada = cache_respuestas.cacheada(vista, version, parametros)
+        else:
+            vista_cacheada = vista
+        condicionada = condition(etag_func=etag, last_modified_func=ultima_modificacion)(vista_cacheada)
+
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            response = condicionada(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD') and not response.has_header('Cache-Control'):
+                # El cliente puede guardar la respuesta, pero debe revalidarla en cada uso
+                response['Cache-Control'] = 'private, no-cache'
+            return response
+        return envoltura
+    return decorador
@@ -1,7 +1,9 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.http import FileResponse, Http404, JsonResponse, HttpResponse
+from django.views.decorators.http import condition
 from django.db import models
-import io
+import tempfile
+import time
 try:
     import qrcode
 except ImportError:
@@ -11,10 +13,9 @@ from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib import messages
 from django.contrib.auth.models import Group, User
 
-from .models import Jugador, Torneo, Resultado, Inscripcion, Partido, Ranking, Grupo
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from .models import Jugador, Torneo, Resultado, Inscripcion, Partido, Ranking, Grupo, GrupoStanding, TrabajoImportacion, ContadorVersion, normalizar_rut
 import openpyxl
+from . import artefactos, calendario, exportaciones, generador, importacion, inscripciones, qr, streaming, trabajos, versiones
 from .forms import FormJugador, FormTorneo, FormResultado, FormContacto, FormInscripcion, FormPartido, BulkJugadorImportForm
 
 # Create your views here.
@@ -86,46 +87,14 @@ def importar_jugadores_excel(request):
     reporte = []
     if request.method == 'POST' and form.is_valid():
         archivo = form.cleaned_data['archivo']
-        from openpyxl import load_workbook
+        if trabajos.es_asincrono(archivo):
+            trabajo = trabajos.encolar('JUGADORES_EXCEL', archivo, request.user)
+            return redirect('detalle_trabajo', trabajo_id=trabajo.id)
         try:
-            wb = load_workbook(filename=archivo, data_only=True)
-        except Exception as e:
-            messages.error(request, f"Error leyendo Excel: {e}")
-            return render(request, 'jugadores/importar.html', {'form': form})
-        ws = wb.active
-        headers = [c.value for c in next(ws.iter_rows(min_row=1, max_row=1))]
-        # Normalizar headers
-        mapa = {h.lower(): idx for idx, h in enumerate(headers) if h}
-        requeridos = ['nombre','apellido','categoria','rut']
-        faltan = [r for r in requeridos if r not in mapa]
-        if faltan:
-            messages.error(request, f"Faltan columnas requeridas: {', '.join(faltan)}")
+            creados, reporte = importacion.importar_jugadores(importacion.filas_excel(archivo))
+        except importacion.ErrorFormato as e:
+            messages.error(request, str(e))
             return render(request, 'jugadores/importar.html', {'form': form})
-        creados = 0
-        for row in ws.iter_rows(min_row=2):
-            valores = [c.value for c in row]
-            nombre = (valores[mapa['nombre']] or '').strip()
-            apellido = (valores[mapa['apellido']] or '').strip()
-            categoria = (valores[mapa['categoria']] or 'AMATEUR').strip().upper()
-            rut = (valores[mapa['rut']] or '').strip()
-            if not nombre or not apellido or not rut:
-                reporte.append(f"Fila {row[0].row}: datos incompletos, omitida.")
-                continue
-            # Validar categoría
-            if categoria not in ['AMATEUR','FEDERADO']:
-                categoria = 'AMATEUR'
-            # Verificar duplicado rut
-            if Jugador.objects.filter(rut__iexact=rut).exists():
-                reporte.append(f"Fila {row[0].row}: RUT duplicado {rut}, omitido.")
-                continue
-            # Crear jugador (validador rut en modelo puede lanzar excepción)
-            try:
-                jugador = Jugador(nombre=nombre, apellido=apellido, categoria=categoria, rut=rut)
-                jugador.full_clean()
-                jugador.save()
-                creados += 1
-            except Exception as e:
-                reporte.append(f"Fila {row[0].row}: error RUT {rut} -> {e}")
         messages.success(request, f"Importación finalizada. Jugadores creados: {creados}")
         if not reporte:
             reporte.append("Sin incidencias.")
@@ -182,59 +151,12 @@ def generar_grupos(request, torneo_id):
     # No regenerar si ya existen grupos
     if Grupo.objects.filter(torneo=torneo).exists():
         return redirect('lista_grupos', torneo_id=torneo.id)
-    inscritos_ids = list(Inscripcion.objects.filter(torneo=torneo, estado='INSCRITO').values_list('jugador_id', flat=True))
-    jugadores = list(Jugador.objects.filter(id__in=inscritos_ids))
+    jugadores = generador.jugadores_inscritos(torneo)
     if len(jugadores) == 0:
         messages.error(request, 'No hay jugadores inscritos.')
         return redirect('lista_torneos')
-    
-    # Calcular número óptimo de grupos para que el bracket sea potencia de 2
-    # Tomamos los 2 mejores de cada grupo, entonces jugadores_bracket = num_grupos * 2
-    # Necesitamos que sea potencia de 2 (2, 4, 8, 16, 32, 64, etc.)
-    def potencia_2_cercana(n):
-        """Encuentra la potencia de 2 más cercana menor o igual a n"""
-        import math
-        if n <= 2:
-            return 2
-        return 2 ** math.floor(math.log2(n))
-    
-    # Calcular cuántos jugadores pueden avanzar (potencia de 2)
-    max_bracket_size = potencia_2_cercana(len(jugadores))
-    
-    # Calcular número de grupos (cada grupo manda 2 jugadores)
-    num_grupos = max_bracket_size // 2
-    
-    # No truncamos jugadores: todos deben jugar grupos; clasificarán los mejores 2 de cada grupo
-    jugadores = sorted(jugadores, key=lambda x: x.id)
-    tamaño_grupo = (len(jugadores) + num_grupos - 1) // num_grupos  # Tamaño promedio
-    
-    # Distribuir jugadores en grupos
-    grupos_creados = []
-    for g_idx in range(num_grupos):
-        g = Grupo.objects.create(torneo=torneo, nombre=chr(65 + g_idx))
-        grupos_creados.append(g)
-    
-    # Asignar jugadores de forma equitativa
-    for idx, j in enumerate(jugadores):
-        g = grupos_creados[idx % num_grupos]
-        g.jugadores.add(j)
-    
-    # Generar partidos: todos contra todos dentro de cada grupo
-    for g in grupos_creados:
-        grp_players = list(g.jugadores.all())
-        for i in range(len(grp_players)):
-            for k in range(i+1, len(grp_players)):
-                Partido.objects.create(
-                    torneo=torneo,
-                    ronda=1,
-                    etapa='GRUPOS',
-                    grupo=g.nombre,
-                    jugador_a=grp_players[i],
-                    jugador_b=grp_players[k],
-                    best_of=3
-                )
-    torneo.estado = 'EN_CURSO'
-    torneo.save()
+    # Todos juegan grupos; clasifican los 2 mejores de cada grupo a un bracket potencia de 2
+    num_grupos = generador.generar_grupos(torneo, jugadores)
     bracket_size = num_grupos * 2
     messages.success(request, f'Grupos generados: {num_grupos} grupos. Bracket: {bracket_size} mejores jugadores.')
     return redirect('lista_grupos', torneo_id=torneo.id)
@@ -243,14 +165,19 @@ def generar_grupos(request, torneo_id):
 @login_required
 def lista_grupos(request, torneo_id):
     torneo = get_object_or_404(Torneo, id=torneo_id)
-    grupos = Grupo.objects.filter(torneo=torneo).order_by('nombre')
+    grupos = list(Grupo.objects.filter(torneo=torneo).order_by('nombre'))
+    tablas = GrupoStanding.tablas(g.id for g in grupos)
+    partidos_por_grupo = {}
+    partidos = (Partido.objects.filter(torneo=torneo, etapa='GRUPOS')
+                .select_related('jugador_a', 'jugador_b', 'ganador').order_by('ronda', 'id'))
+    for p in partidos:
+        partidos_por_grupo.setdefault(p.grupo, []).append(p)
     data = []
     for g in grupos:
-        partidos = Partido.objects.filter(grupo=g.nombre, torneo=torneo, etapa='GRUPOS').order_by('ronda', 'id')
         data.append({
             'grupo': g,
-            'tabla': g.estadisticas(),
-            'partidos': partidos
+            'tabla': tablas.get(g.id, []),
+            'partidos': partidos_por_grupo.get(g.nombre, [])
         })
     return render(request, 'grupos/lista.html', {'torneo': torneo, 'grupos_data': data})
 
@@ -267,26 +194,11 @@ def generar_bracket(request, torneo_id):
     if Partido.objects.filter(torneo=torneo, etapa='GRUPOS', ganador__isnull=True).exists():
         messages.error(request, 'Aún hay partidos de grupos sin resultado.')
         return redirect('lista_grupos', torneo_id=torneo.id)
-    # Reunir clasificados (top 2 por grupo)
-    clasificados = []
-    for g in grupos:
-        stats = g.estadisticas()
-        clasificados.extend([s['jugador'] for s in stats[:2]])
     # Evitar regenerar si ya hay eliminación
     if Partido.objects.filter(torneo=torneo, etapa__in=['ELIMINACION','FINAL']).exists():
         return redirect('lista_partidos', torneo_id=torneo.id)
-    # Crear primera ronda eliminación
-    ronda = 1
-    for i in range(0, len(clasificados), 2):
-        if i+1 < len(clasificados):
-            Partido.objects.create(
-                torneo=torneo,
-                ronda=ronda,
-                etapa='ELIMINACION',
-                jugador_a=clasificados[i],
-                jugador_b=clasificados[i+1],
-                best_of=3
-            )
+    # Crear primera ronda eliminación con los 2 mejores de cada grupo
+    generador.generar_bracket(torneo)
     messages.success(request, 'Bracket de eliminación generado.')
     return redirect('lista_partidos', torneo_id=torneo.id)
 
@@ -304,7 +216,7 @@ def generar_eliminacion_siguiente(request, torneo_id):
     if ronda_partidos.filter(ganador__isnull=True).exists():
         messages.error(request, 'Aún hay partidos sin ganador en la ronda actual.')
         return redirect('lista_partidos', torneo_id=torneo.id)
-    ganadores = [p.ganador for p in ronda_partidos]
+    ganadores = [p.ganador for p in ronda_partidos.select_related('ganador').order_by('id')]
     if len(ganadores) == 1:
         # Ya hay campeón
         torneo.estado = 'FINALIZADO'
@@ -312,18 +224,7 @@ def generar_eliminacion_siguiente(request, torneo_id):
         messages.success(request, f'Torneo finalizado. Campeón: {ganadores[0]}')
         return redirect('lista_partidos', torneo_id=torneo.id)
     nueva_ronda = max_ronda + 1
-    etapa = 'FINAL' if len(ganadores) == 2 else 'ELIMINACION'
-    bo = 5 if etapa == 'FINAL' else 3
-    for i in range(0, len(ganadores), 2):
-        if i+1 < len(ganadores):
-            Partido.objects.create(
-                torneo=torneo,
-                ronda=nueva_ronda,
-                etapa=etapa,
-                jugador_a=ganadores[i],
-                jugador_b=ganadores[i+1],
-                best_of=bo
-            )
+    generador.generar_ronda(torneo, ganadores, nueva_ronda)
     messages.success(request, f'Ronda {nueva_ronda} de eliminación generada.')
     return redirect('lista_partidos', torneo_id=torneo.id)
 
@@ -416,7 +317,7 @@ def contacto(request):
 def inscribir_jugador(request, torneo_id):
     torneo = get_object_or_404(Torneo, id=torneo_id)
     jugadores = Jugador.objects.all().order_by('nombre','apellido')
-    inscritos_actuales = Inscripcion.objects.filter(torneo=torneo, estado='INSCRITO').count()
+    inscritos_actuales = torneo.inscritos_count
     cupos_disponibles = torneo.cupos_max - inscritos_actuales
 
     if request.method == 'POST':
@@ -424,51 +325,23 @@ def inscribir_jugador(request, torneo_id):
         if not ids:
             messages.error(request, 'Selecciona al menos un jugador.')
         else:
-            # Contar cuántos nuevos se intentarán inscribir (no contar los ya inscritos)
-            nuevos = 0
-            creados = 0
-            repetidos = 0
-            excedentes = []
-            
-            for jid in ids:
-                try:
-                    jugador = Jugador.objects.get(id=jid)
-                except Jugador.DoesNotExist:
-                    continue
-                
-                # Verificar si ya está inscrito
-                if Inscripcion.objects.filter(torneo=torneo, jugador=jugador).exists():
-                    repetidos += 1
-                else:
-                    nuevos += 1
-                    if nuevos > cupos_disponibles:
-                        excedentes.append(f"{jugador.nombre} {jugador.apellido}")
-            
+            reporte = inscripciones.inscribir_jugadores(torneo, ids)
+            cupos_disponibles = reporte['cupos_disponibles']
+            excedentes = [f"{j.nombre} {j.apellido}" for j in reporte['sin_cupo']]
+
             # Validar que no se exceda cupo
-            if nuevos > cupos_disponibles:
-                msg = f'Cupos insuficientes. Disponibles: {cupos_disponibles}, intentados: {nuevos}.'
-                if excedentes:
-                    msg += f' No se pueden inscribir: {", ".join(excedentes[:3])}'
-                    if len(excedentes) > 3:
-                        msg += f' y {len(excedentes)-3} más.'
+            if excedentes:
+                intentados = cupos_disponibles + len(excedentes)
+                msg = f'Cupos insuficientes. Disponibles: {cupos_disponibles}, intentados: {intentados}.'
+                msg += f' No se pueden inscribir: {", ".join(excedentes[:3])}'
+                if len(excedentes) > 3:
+                    msg += f' y {len(excedentes)-3} más.'
                 messages.error(request, msg)
             else:
-                # Proceder con inscripciones
-                for jid in ids:
-                    try:
-                        jugador = Jugador.objects.get(id=jid)
-                    except Jugador.DoesNotExist:
-                        continue
-                    insc, created = Inscripcion.objects.get_or_create(torneo=torneo, jugador=jugador)
-                    if created:
-                        creados += 1
-                    else:
-                        repetidos += 1
-                
-                if creados:
-                    messages.success(request, f'Inscripciones creadas: {creados}.')
-                if repetidos:
-                    messages.info(request, f'Ya estaban inscritos: {repetidos}.')
+                if reporte['creados']:
+                    messages.success(request, f"Inscripciones creadas: {len(reporte['creados'])}.")
+                if reporte['duplicados']:
+                    messages.info(request, f"Ya estaban inscritos: {len(reporte['duplicados'])}.")
                 return redirect('lista_inscripciones', torneo_id=torneo.id)
 
     return render(request, 'inscripciones/inscribir.html', {
@@ -493,23 +366,11 @@ def lista_inscripciones(request, torneo_id):
 @permission_required('smashpointApp.add_partido', raise_exception=True)
 def generar_fixture(request, torneo_id):
     torneo = get_object_or_404(Torneo, id=torneo_id)
-    inscritos = list(Inscripcion.objects.filter(torneo=torneo, estado='INSCRITO').values_list('jugador_id', flat=True))
-    jugadores = list(Jugador.objects.filter(id__in=inscritos))
     # Si ya existen partidos no regenerar
     if Partido.objects.filter(torneo=torneo).exists():
         return redirect('lista_partidos', torneo_id=torneo.id)
     # Generar emparejamientos simples secuenciales
-    for i in range(0, len(jugadores), 2):
-        if i+1 < len(jugadores):
-            Partido.objects.create(
-                torneo=torneo,
-                ronda=1,
-                jugador_a=jugadores[i],
-                jugador_b=jugadores[i+1]
-            )
-    torneo.estado = 'EN_CURSO'
-    torneo.calcular_total_rondas()
-    torneo.save()
+    generador.generar_fixture(torneo)
     return redirect('lista_partidos', torneo_id=torneo.id)
 
 @login_required
@@ -525,14 +386,31 @@ def lista_partidos(request, torneo_id):
         # Mostrar solo partidos de la ronda máxima (actual)
         partidos = Partido.objects.filter(torneo=torneo, etapa__in=['ELIMINACION', 'FINAL'], ronda=max_ronda).order_by('id')
     else:
-        # Si no hay eliminación, mostrar todos (grupos)
-        partidos = Partido.objects.filter(torneo=torneo).order_by('ronda', 'id')
+        # Si no hay eliminación, mostrar todos (grupos) en orden de programación
+        partidos = calendario.orden_programado(Partido.objects.filter(torneo=torneo))
     
     return render(request, 'partidos/lista.html', {
         'torneo': torneo,
         'partidos': partidos
     })
 
+@login_required
+@permission_required('smashpointApp.change_partido', raise_exception=True)
+def programar_partidos(request, torneo_id):
+    torneo = get_object_or_404(Torneo, id=torneo_id)
+    if request.method == 'POST':
+        try:
+            mesas = int(request.POST.get('mesas', 4))
+            descanso = int(request.POST.get('descanso', 1))
+            if mesas < 1 or descanso < 0:
+                raise ValueError
+        except ValueError:
+            messages.error(request, 'Cantidad de mesas o descanso inválidos.')
+            return redirect('lista_partidos', torneo_id=torneo.id)
+        makespan, total = calendario.programar_torneo(torneo, mesas, descanso)
+        messages.success(request, f'{total} partidos programados en {mesas} mesas: {makespan} turnos.')
+    return redirect('lista_partidos', torneo_id=torneo.id)
+
 @login_required
 def lista_bracket(request, torneo_id):
     torneo = get_object_or_404(Torneo, id=torneo_id)
@@ -584,23 +462,9 @@ def generar_ronda_siguiente(request, torneo_id):
         messages.error(request, f'Aún hay {count} partido(s) sin ganador. Completa todos antes de avanzar.')
         return redirect('lista_partidos', torneo_id=torneo.id)
     
-    ganadores = [p.ganador for p in actuales]
+    ganadores = [p.ganador for p in actuales.select_related('ganador').order_by('id')]
     nueva_ronda = max_ronda + 1
-    
-    # Determinar la etapa según la cantidad de ganadores
-    etapa = 'FINAL' if len(ganadores) == 2 else 'ELIMINACION'
-    best_of = 5 if etapa == 'FINAL' else 3
-    
-    for i in range(0, len(ganadores), 2):
-        if i+1 < len(ganadores):
-            Partido.objects.create(
-                torneo=torneo,
-                ronda=nueva_ronda,
-                etapa=etapa,
-                jugador_a=ganadores[i],
-                jugador_b=ganadores[i+1],
-                best_of=best_of
-            )
+    generador.generar_ronda(torneo, ganadores, nueva_ronda)
     if len(ganadores) == 1:
         torneo.estado = 'FINALIZADO'
         torneo.save()
@@ -614,6 +478,7 @@ def generar_ronda_siguiente(request, torneo_id):
 # Scoreboard deshabilitado: usaba el modelo Resultado obsoleto.
 # Se mantiene solo el ranking actualizado por puntos.
 
+@versiones.condicional(lambda request: [versiones.RANKING], por_usuario=True)
 def ranking_public(request):
     ranking = Ranking.objects.select_related('jugador').order_by('-puntos')
     return render(request, 'public/ranking.html', {'ranking': ranking})
@@ -637,7 +502,7 @@ def registro_jugador(request):
             messages.error(request, f'El usuario "{username}" ya está registrado. Por favor elige otro nombre de usuario.')
             return render(request, 'public/registro.html')
         
-        if rut and Jugador.objects.filter(rut__iexact=rut).exists():
+        if rut and Jugador.objects.filter(rut_canonico=normalizar_rut(rut)).exists():
             messages.error(request, 'El RUT ingresado ya está registrado.')
             return render(request, 'public/registro.html')
         
@@ -691,84 +556,119 @@ def jugador_public(request, jugador_id):
         'ranking': rk
     })
 
+def url_publica_jugador(request, jugador_id):
+    return request.build_absolute_uri(f'/public/jugador/{jugador_id}/')
+
+def etag_qr(request, jugador_id):
+    # Sin ETag para un jugador inexistente: la vista responde 404 en vez de 304
+    if not Jugador.objects.filter(id=jugador_id).exists():
+        return None
+    return qr.clave(url_publica_jugador(request, jugador_id))
+
+@condition(etag_func=etag_qr)
 def jugador_qr(request, jugador_id):
+    """PNG del QR desde la caché (memoria + disco); solo depende del id y del host."""
     jugador = get_object_or_404(Jugador, id=jugador_id)
     if not qrcode:
         return HttpResponse('QR library not installed', status=500)
-    url = request.build_absolute_uri(f'/public/jugador/{jugador.id}/')
-    img = qrcode.make(url)
-    buf = io.BytesIO()
-    img.save(buf, format='PNG')
-    return HttpResponse(buf.getvalue(), content_type='image/png')
+    response = HttpResponse(qr.png(url_publica_jugador(request, jugador.id)), content_type='image/png')
+    response['Cache-Control'] = 'public, max-age=2592000'
+    return response
+
+@login_required
+def credenciales_torneo(request, torneo_id):
+    """PDF de credenciales con QR para todos los inscritos del torneo."""
+    torneo = get_object_or_404(Torneo, id=torneo_id)
+    if not qrcode:
+        return HttpResponse('QR library not installed', status=500)
+    archivo = tempfile.TemporaryFile()
+    exportaciones.escribir_credenciales(torneo, lambda jid: url_publica_jugador(request, jid), archivo)
+    archivo.seek(0)
+    return FileResponse(archivo, as_attachment=True, filename=f'credenciales_torneo_{torneo.id}.pdf',
+                        content_type='application/pdf')
 
 
 # ------------ EXPORTACIÓN CSV ------------
-import csv
 
 @login_required
 def export_jugadores_csv(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="jugadores.csv"'
-    writer = csv.writer(response)
-    writer.writerow(['id','nombre','apellido','categoria','rut','origen'])
-    for j in Jugador.objects.all():
-        writer.writerow([j.id,j.nombre,j.apellido,j.categoria,j.rut,j.origen])
-    return response
+    """CSV en streaming. Filtros: ?categoria=, ?torneo= (inscritos), ?gzip=1."""
+    qs = Jugador.objects.order_by('id')
+    if request.GET.get('categoria'):
+        qs = qs.filter(categoria=request.GET['categoria'])
+    if request.GET.get('torneo', '').isdigit():
+        qs = qs.filter(inscripcion__torneo_id=request.GET['torneo'])
+    return streaming.respuesta_csv(request, 'jugadores', ['id','nombre','apellido','categoria','rut','origen'],
+                                   qs, ['id','nombre','apellido','categoria','rut','origen'])
 
 @login_required
 def export_torneos_csv(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="torneos.csv"'
-    writer = csv.writer(response)
-    writer.writerow(['id','nombre','direccion','fecha','categoria','cupos_max','estado'])
-    for t in Torneo.objects.all():
-        writer.writerow([t.id,t.nombre,t.direccion,t.fecha,t.categoria,t.cupos_max,t.estado])
-    return response
+    """CSV en streaming. Filtros: ?desde=&hasta= (fecha), ?estado=, ?gzip=1."""
+    qs = Torneo.objects.filter(**streaming.filtro_fechas(request, 'fecha')).order_by('id')
+    if request.GET.get('estado'):
+        qs = qs.filter(estado=request.GET['estado'])
+    return streaming.respuesta_csv(request, 'torneos', ['id','nombre','direccion','fecha','categoria','cupos_max','estado'],
+                                   qs, ['id','nombre','direccion','fecha','categoria','cupos_max','estado'])
 
 @login_required
 def export_resultados_csv(request):
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="resultados.csv"'
-    writer = csv.writer(response)
-    writer.writerow(['id','torneo','j1','j2','m_j1','m_j2'])
-    for r in Resultado.objects.all():
-        writer.writerow([r.id,r.torneo_id,r.jugador1_id,r.jugador2_id,r.marcador_j1,r.marcador_j2])
-    return response
+    """CSV en streaming. Filtros: ?torneo=, ?desde=&hasta= (fecha del torneo), ?gzip=1."""
+    qs = Resultado.objects.filter(**streaming.filtro_fechas(request, 'torneo__fecha')).order_by('id')
+    if request.GET.get('torneo', '').isdigit():
+        qs = qs.filter(torneo_id=request.GET['torneo'])
+    return streaming.respuesta_csv(request, 'resultados', ['id','torneo','j1','j2','m_j1','m_j2'],
+                                   qs, ['id','torneo_id','jugador1_id','jugador2_id','marcador_j1','marcador_j2'])
 
 @login_required
 def import_jugadores_csv(request):
     if request.method == 'POST' and request.FILES.get('file'):
-        f = request.FILES['file']
-        decoded = f.read().decode('utf-8').splitlines()
-        reader = csv.DictReader(decoded)
-        creados = 0
-        for row in reader:
-            lic = row.get('licencia') or row.get('license')
-            if lic and not Jugador.objects.filter(licencia=lic).exists():
-                Jugador.objects.create(
-                    nombre=row.get('nombre',''),
-                    apellido=row.get('apellido',''),
-                    categoria=row.get('categoria','AMATEUR'),
-                    licencia=lic
-                )
-                creados += 1
-        messages.success(request, f"Importación completa. Jugadores creados: {creados}")
+        if trabajos.es_asincrono(request.FILES['file']):
+            trabajo = trabajos.encolar('JUGADORES_CSV', request.FILES['file'], request.user)
+            return redirect('detalle_trabajo', trabajo_id=trabajo.id)
+        inicio = time.perf_counter()
+        resultado = importacion.upsert_jugadores(importacion.filas_csv(request.FILES['file']))
+        duracion = max(time.perf_counter() - inicio, 1e-6)
+        messages.success(request, f"Importación completa. Jugadores creados: {resultado['creados']}, "
+                                  f"actualizados: {resultado['actualizados']}, rechazados: {resultado['rechazados']} "
+                                  f"({resultado['filas'] / duracion:.0f} filas/s)")
+        for linea in resultado['reporte'][:20]:
+            messages.warning(request, linea)
+        if len(resultado['reporte']) > 20:
+            messages.warning(request, f"... y {len(resultado['reporte']) - 20} filas rechazadas más.")
         return redirect('lista_jugadores')
     return render(request, 'import/jugadores.html')
 
 
+
+# ------------ TRABAJOS EN SEGUNDO PLANO ------------
+def trabajo_visible(request, trabajo_id):
+    """El trabajo lo ve quien lo encoló o quien puede crear jugadores."""
+    trabajo = get_object_or_404(TrabajoImportacion, id=trabajo_id)
+    if trabajo.usuario_id != request.user.id and not request.user.has_perm('smashpointApp.add_jugador'):
+        raise Http404
+    return trabajo
+
+@login_required
+def detalle_trabajo(request, trabajo_id):
+    return render(request, 'trabajos/detalle.html', {'trabajo': trabajo_visible(request, trabajo_id)})
+
+@login_required
+def estado_trabajo(request, trabajo_id):
+    """Avance en JSON para que la página del trabajo haga polling."""
+    return JsonResponse(trabajo_visible(request, trabajo_id).como_dict())
+
 # ------------ API JSON SIMPLE ------------
+@versiones.condicional(lambda request: [versiones.JUGADORES])
 def api_jugadores(request):
-    data = list(Jugador.objects.values('id','nombre','apellido','categoria','rut','origen'))
-    return JsonResponse({'jugadores': data})
+    return streaming.respuesta_json('jugadores', Jugador.objects.all(), ['id','nombre','apellido','categoria','rut','origen'])
 
+@versiones.condicional(lambda request: [versiones.TORNEOS])
 def api_torneos(request):
-    data = list(Torneo.objects.values('id','nombre','fecha','categoria','estado','cupos_max'))
-    return JsonResponse({'torneos': data})
+    return streaming.respuesta_json('torneos', Torneo.objects.all(), ['id','nombre','fecha','categoria','estado','cupos_max'])
 
+@versiones.condicional(lambda request: [versiones.RANKING])
 def api_ranking(request):
-    data = list(Ranking.objects.select_related('jugador').order_by('-puntos').values('jugador__nombre','jugador__apellido','puntos'))
-    return JsonResponse({'ranking': data})
+    return streaming.respuesta_json('ranking', Ranking.objects.order_by('-puntos'), ['jugador__nombre','jugador__apellido','puntos'])
 
 
 # ------------ OFFLINE / MANIFEST ------------
@@ -777,38 +677,24 @@ def offline(request):
 
 
 # ------------ EXPORT RANKING PDF / EXCEL ------------
+def etag_ranking(request):
+    return artefactos.etag('ranking', ContadorVersion.actual('ranking'))
+
 @login_required
+@condition(etag_func=etag_ranking)
 def export_ranking_pdf(request):
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="ranking.pdf"'
-    c = canvas.Canvas(response, pagesize=letter)
-    width, height = letter
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(50, height - 50, "Ranking SmashPoint")
-    c.setFont("Helvetica", 12)
-    y = height - 90
-    for rk in Ranking.objects.select_related('jugador').order_by('-puntos'):
-        c.drawString(50, y, f"{rk.jugador.nombre} {rk.jugador.apellido} - {rk.puntos} pts")
-        y -= 18
-        if y < 60:
-            c.showPage()
-            c.setFont("Helvetica", 12)
-            y = height - 50
-    c.save()
-    return response
+    """Servido desde la caché de artefactos; se regenera solo cuando cambia la versión del ranking."""
+    return artefactos.respuesta('ranking', ContadorVersion.actual('ranking'), 'pdf', exportaciones.escribir_ranking_pdf,
+                                'ranking.pdf', 'application/pdf')
 
 @login_required
+@condition(etag_func=etag_ranking)
 def export_ranking_excel(request):
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = 'Ranking'
-    ws.append(['Nombre','Apellido','Puntos'])
-    for rk in Ranking.objects.select_related('jugador').order_by('-puntos'):
-        ws.append([rk.jugador.nombre, rk.jugador.apellido, rk.puntos])
-    from openpyxl.utils import get_column_letter
-    for col in range(1,4):
-        ws.column_dimensions[get_column_letter(col)].width = 20
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename="ranking.xlsx"'
-    wb.save(response)
-    return response
+    return artefactos.respuesta('ranking', ContadorVersion.actual('ranking'), 'xlsx', exportaciones.escribir_ranking_xlsx,
+                                'ranking.xlsx', exportaciones.CONTENT_TYPE_XLSX)
+
+@login_required
+def export_torneo_excel(request, torneo_id):
+    """Libro del torneo: inscripciones, grupos (tabla + partidos) y rondas del bracket."""
+    torneo = get_object_or_404(Torneo, id=torneo_id)
+    return exportaciones.respuesta_xlsx(exportaciones.libro_torneo(torneo), f'torneo_{torneo.id}.xlsx')